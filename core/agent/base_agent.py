@@ -16,7 +16,7 @@ class AgentState(Enum):
     WAITING = "waiting"
     ERROR = "error"
 
-@dataclass
+@dataclass(slots=True)
 class AgentContext:
     """Context information for the agent."""
     memory: Dict[str, Any]
@@ -69,8 +69,8 @@ class BaseAgent(ABC):
             self.context.state = AgentState.IDLE
             return result
             
-        except Exception as e:
-            self.logger.error(f"Error in agent execution: {e}")
+        except Exception:
+            self.logger.exception("Error in agent execution")
             self.context.state = AgentState.ERROR
             raise
     
@@ -3,22 +3,69 @@ Action executor module for executing planned tasks.
 """
 
 import logging
-from typing import Dict, List, Optional, Any, Union, Callable
+from typing import Dict, List, Optional, Any, Union, Callable, AsyncIterator, Tuple
 import json
 from datetime import datetime
 import asyncio
+import collections
+import concurrent.futures
+import functools
 import importlib
 import inspect
+import itertools
+import os
+import re
+import sys
+import time
+import types
 from pathlib import Path
 
+# Modules and public tool functions shared across executor instances
+_MODULE_CACHE: Dict[str, types.ModuleType] = {}
+_TOOL_FN_CACHE: Dict[str, Dict[str, Callable]] = {}
+
+# Synchronous tools run here so they don't block the event loop; shared by
+# all executors so instances don't each hold idle worker threads
+_TOOL_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=(os.cpu_count() or 1) * 2,
+    thread_name_prefix='tool'
+)
+
+# Step tokenizers for the "action k1: v1, k2: v2" text format
+_ACTION_RE = re.compile(r'^\s*(\S+)\s*(.*)$', re.DOTALL)
+_PARAM_RE = re.compile(r'\s*([^\s,:]+)\s*:\s*([^,]+?)\s*(?:,|$)')
+
+def _cached_import(name: str) -> types.ModuleType:
+    """Import a module, reusing already-loaded modules."""
+    module = _MODULE_CACHE.get(name)
+    if module is None:
+        module = sys.modules.get(name)
+        if module is None:
+            module = importlib.import_module(name)
+        _MODULE_CACHE[name] = module
+    return module
+
 class ActionExecutor:
     """Executes planned actions and manages tool execution."""
     
-    def __init__(self, tools: List[str]):
+    def __init__(
+        self,
+        tools: List[str],
+        max_parallel: int = 4,
+        history_cap: int = 10_000,
+        batch_size: int = 16
+    ):
         """Initialize action executor with available tools."""
         self.logger = logging.getLogger(__name__)
+        self._is_async: Dict[str, bool] = {}
+        self._accepts_context: Dict[str, bool] = {}
+        self._allowed_kwargs: Dict[str, Optional[frozenset]] = {}
+        self._batch_funcs: Dict[str, Callable] = {}
         self.tools = self._load_tools(tools)
-        self.execution_history: List[Dict[str, Any]] = []
+        self.execution_history: collections.deque = collections.deque(maxlen=history_cap)
+        self.max_parallel = max(1, max_parallel)
+        self._sem = asyncio.Semaphore(self.max_parallel)
+        self.batch_size = max(1, batch_size)
     
     def _load_tools(self, tool_names: List[str]) -> Dict[str, Callable]:
         """Load tool modules and their functions."""
@@ -27,24 +74,82 @@ class ActionExecutor:
             
             for tool_name in tool_names:
                 try:
-                    # Import tool module
-                    module = importlib.import_module(f"core.agent.tools.{tool_name}")
+                    functions = _TOOL_FN_CACHE.get(tool_name)
+                    if functions is None:
+                        # Import tool module
+                        module = _cached_import(f"core.agent.tools.{tool_name}")
+                        
+                        # Get all callable functions from the module
+                        functions = {
+                            name: obj
+                            for name, obj in inspect.getmembers(module)
+                            if inspect.isfunction(obj) and not name.startswith('_')
+                        }
+                        _TOOL_FN_CACHE[tool_name] = functions
                     
-                    # Get all callable functions from the module
-                    for name, obj in inspect.getmembers(module):
-                        if inspect.isfunction(obj) and not name.startswith('_'):
-                            tools[name] = obj
+                    tools.update(functions)
                     
                 except Exception as e:
-                    self.logger.error(f"Failed to load tool {tool_name}: {e}")
+                    self.logger.error("Failed to load tool %s: %s", tool_name, e)
                     continue
             
+            # Precompute per-tool dispatch information
+            for name, obj in tools.items():
+                parameters = inspect.signature(obj).parameters
+                self._is_async[name] = asyncio.iscoroutinefunction(obj)
+                var_keyword = any(
+                    p.kind is inspect.Parameter.VAR_KEYWORD
+                    for p in parameters.values()
+                )
+                self._accepts_context[name] = 'context' in parameters or var_keyword
+                
+                # None means the tool takes **kwargs and accepts any parameter
+                self._allowed_kwargs[name] = None if var_keyword else frozenset(
+                    p.name for p in parameters.values()
+                    if p.name not in ('self', 'context') and p.kind in (
+                        inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                        inspect.Parameter.KEYWORD_ONLY
+                    )
+                )
+                
+                # Async tools may expose a batched variant as execute_batch
+                batch_func = getattr(obj, 'execute_batch', None)
+                if asyncio.iscoroutinefunction(batch_func):
+                    self._batch_funcs[name] = batch_func
+            
             return tools
             
-        except Exception as e:
-            self.logger.error(f"Failed to load tools: {e}")
+        except Exception:
+            self.logger.exception("Failed to load tools")
             raise
     
+    async def execute_plan_stream(
+        self,
+        plan: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Execute a plan, yielding step results as each phase completes.
+        
+        Steps update ``context`` in place. Execution stops after the first
+        phase containing a failed step.
+        """
+        ctx = {} if context is None else context
+        
+        # Steps within a phase are independent and run concurrently
+        for phase in self._build_phases(plan):
+            phase_results = await self._run_phase(
+                [plan['steps'][i] for i in phase],
+                ctx
+            )
+            
+            failed = False
+            for step_result in phase_results:
+                yield step_result
+                failed = failed or not step_result['success']
+            
+            if failed:
+                return
+    
     async def execute_plan(
         self,
         plan: Dict[str, Any],
@@ -52,28 +157,28 @@ class ActionExecutor:
     ) -> Dict[str, Any]:
         """Execute a planned sequence of actions."""
         try:
+            # Steps update this context in place
+            ctx = {} if context is None else context
             results = {
                 'success': True,
                 'steps': [],
                 'errors': [],
-                'context': context or {}
+                'started_ns': time.monotonic_ns()
             }
             
-            # Execute each step
-            for step in plan['steps']:
-                step_result = await self.execute_step(step, results['context'])
+            async for step_result in self.execute_plan_stream(plan, ctx):
                 results['steps'].append(step_result)
                 
-                # Update context with step results
-                results['context'].update(step_result.get('context', {}))
-                
                 # Check for errors
                 if not step_result['success']:
                     results['success'] = False
                     results['errors'].append(step_result['error'])
-                    break
+            
+            # Snapshot the final context
+            results['context'] = dict(ctx)
             
             # Add execution metadata
+            results['elapsed_ns'] = time.monotonic_ns() - results['started_ns']
             results['execution_time'] = datetime.now().isoformat()
             results['plan'] = plan
             
@@ -82,20 +187,154 @@ class ActionExecutor:
             
             return results
             
-        except Exception as e:
-            self.logger.error(f"Failed to execute plan: {e}")
+        except Exception:
+            self.logger.exception("Failed to execute plan")
             raise
     
+    def _build_phases(self, plan: Dict[str, Any]) -> List[List[int]]:
+        """Group step indices into phases of mutually independent steps.
+        
+        ``plan['dependencies']`` maps a step index to the indices it depends
+        on. Without it every step gets its own phase, i.e. the plan runs
+        sequentially.
+        """
+        steps = plan['steps']
+        dependencies = plan.get('dependencies')
+        if not dependencies:
+            return [[i] for i in range(len(steps))]
+        
+        depends_on = {i: set() for i in range(len(steps))}
+        for step, deps in dependencies.items():
+            depends_on[int(step)].update(int(dep) for dep in deps)
+        
+        phases = []
+        done: set = set()
+        while len(done) < len(steps):
+            phase = [
+                i for i in range(len(steps))
+                if i not in done and depends_on[i] <= done
+            ]
+            if not phase:
+                raise ValueError("Plan dependencies contain a cycle")
+            phases.append(phase)
+            done.update(phase)
+        
+        return phases
+    
+    async def _run_phase(
+        self,
+        steps: List[str],
+        context: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Execute independent steps concurrently, returning results in order.
+        
+        Steps for an action with an execute_batch variant are sent to it
+        together, in chunks of at most batch_size; other steps run one by one.
+        """
+        step_results: List[Optional[Dict[str, Any]]] = [None] * len(steps)
+        batches: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        jobs = []
+        slots: List[List[int]] = []
+        
+        for i, step in enumerate(steps):
+            try:
+                action, params = self._parse_step(step)
+            except Exception as e:
+                step_results[i] = self._failed_step(step, e)
+                continue
+            
+            if action in self._batch_funcs:
+                batches.setdefault(action, []).append((i, params))
+            else:
+                jobs.append(self._run_with_sem(step, action, params, context))
+                slots.append([i])
+        
+        for action, items in batches.items():
+            for start in range(0, len(items), self.batch_size):
+                chunk = items[start:start + self.batch_size]
+                jobs.append(self._execute_batch(
+                    action,
+                    [(steps[i], params) for i, params in chunk],
+                    context
+                ))
+                slots.append([i for i, _ in chunk])
+        
+        outcomes = await asyncio.gather(*jobs, return_exceptions=True)
+        
+        # Restore plan order
+        for slot, outcome in zip(slots, outcomes):
+            if isinstance(outcome, BaseException):
+                outcome = [self._failed_step(steps[i], outcome) for i in slot]
+            elif isinstance(outcome, dict):
+                outcome = [outcome]
+            for i, step_result in zip(slot, outcome):
+                step_results[i] = step_result
+        
+        return step_results
+    
+    async def _run_with_sem(
+        self,
+        step: str,
+        action: str,
+        params: Dict[str, Any],
+        context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Execute a parsed step while holding the concurrency semaphore."""
+        async with self._sem:
+            return await self._execute_parsed(step, action, params, context)
+    
+    async def _execute_batch(
+        self,
+        action: str,
+        items: List[Tuple[str, Dict[str, Any]]],
+        context: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Execute (step, params) items of one action through execute_batch.
+        
+        execute_batch takes the list of parameter dicts and a context
+        keyword, and returns one result dict, or the exception raised, per
+        item. The batch holds a single semaphore slot.
+        """
+        params_list = [self._tool_kwargs(action, params) for _, params in items]
+        async with self._sem:
+            outcomes = await self._batch_funcs[action](params_list, context=context)
+        
+        if len(outcomes) != len(items):
+            raise ValueError(
+                f"Batched action {action} returned {len(outcomes)} results "
+                f"for {len(items)} steps"
+            )
+        
+        return [
+            self._failed_step(step, outcome)
+            if isinstance(outcome, BaseException)
+            else self._applied_step(step, action, params, outcome, context)
+            for (step, params), outcome in zip(items, outcomes)
+        ]
+    
     async def execute_step(
         self,
         step: str,
         context: Dict[str, Any]
     ) -> Dict[str, Any]:
-        """Execute a single step from the plan."""
+        """Execute a single step from the plan, updating context in place."""
         try:
             # Parse step into action and parameters
             action, params = self._parse_step(step)
-            
+        except Exception as e:
+            return self._failed_step(step, e)
+        
+        return await self._execute_parsed(step, action, params, context)
+    
+    async def _execute_parsed(
+        self,
+        step: str,
+        action: str,
+        params: Dict[str, Any],
+        context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Execute a parsed step, updating context in place."""
+        try:
             # Check if action exists
             if action not in self.tools:
                 raise ValueError(f"Unknown action: {action}")
@@ -103,55 +342,76 @@ class ActionExecutor:
             # Execute action
             result = await self._execute_action(action, params, context)
             
-            return {
-                'step': step,
-                'action': action,
-                'parameters': params,
-                'success': True,
-                'result': result,
-                'context': result.get('context', {})
-            }
+            return self._applied_step(step, action, params, result, context)
             
         except Exception as e:
-            self.logger.error(f"Failed to execute step: {e}")
-            return {
-                'step': step,
-                'success': False,
-                'error': str(e)
-            }
+            return self._failed_step(step, e)
+    
+    def _applied_step(
+        self,
+        step: str,
+        action: str,
+        params: Dict[str, Any],
+        result: Dict[str, Any],
+        context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Apply a step's context changes in place and build its result."""
+        delta = result.get('context', {})
+        context.update(delta)
+        
+        return {
+            'step': step,
+            'action': action,
+            'parameters': params,
+            'success': True,
+            'result': result,
+            'delta': delta
+        }
+    
+    def _failed_step(self, step: str, error: BaseException) -> Dict[str, Any]:
+        """Log a failed step and build its result."""
+        self.logger.error("Failed to execute step: %s", error)
+        return {
+            'step': step,
+            'success': False,
+            'error': str(error)
+        }
     
     def _parse_step(self, step: str) -> tuple[str, Dict[str, Any]]:
         """Parse a step string into action and parameters."""
         try:
             # Try to parse as JSON first
-            try:
-                data = json.loads(step)
-                if isinstance(data, dict):
-                    action = data.pop('action', '')
-                    return action, data
-            except json.JSONDecodeError:
-                pass
+            if step.lstrip().startswith('{'):
+                try:
+                    data = json.loads(step)
+                    if isinstance(data, dict):
+                        action = data.pop('action', '')
+                        return action, data
+                except json.JSONDecodeError:
+                    pass
             
             # Parse as text
-            parts = step.split(' ', 1)
-            action = parts[0]
+            match = _ACTION_RE.match(step)
+            if not match:
+                raise ValueError(f"Empty step: {step!r}")
+            action, rest = match.groups()
             params = {}
             
-            if len(parts) > 1:
+            if rest:
                 # Try to parse parameters as JSON
-                try:
-                    params = json.loads(parts[1])
-                except json.JSONDecodeError:
+                if rest[0] in '{[':
+                    try:
+                        params = json.loads(rest)
+                    except json.JSONDecodeError:
+                        params = dict(_PARAM_RE.findall(rest))
+                else:
                     # Parse as key-value pairs
-                    for param in parts[1].split(','):
-                        if ':' in param:
-                            key, value = param.split(':', 1)
-                            params[key.strip()] = value.strip()
+                    params = dict(_PARAM_RE.findall(rest))
             
             return action, params
             
-        except Exception as e:
-            self.logger.error(f"Failed to parse step: {e}")
+        except Exception:
+            self.logger.exception("Failed to parse step")
             raise
     
     async def _execute_action(
@@ -165,26 +425,42 @@ class ActionExecutor:
             # Get action function
             action_func = self.tools[action]
             
-            # Check if function is async
-            if inspect.iscoroutinefunction(action_func):
-                result = await action_func(**params, context=context)
+            # Drop parameters the tool does not accept; only pass context
+            # to tools that take it
+            params = self._tool_kwargs(action, params)
+            if self._accepts_context[action]:
+                params = {**params, 'context': context}
+            
+            if self._is_async[action]:
+                result = await action_func(**params)
             else:
-                result = action_func(**params, context=context)
+                result = await asyncio.get_running_loop().run_in_executor(
+                    _TOOL_POOL,
+                    functools.partial(action_func, **params)
+                )
             
             return result
             
-        except Exception as e:
-            self.logger.error(f"Failed to execute action {action}: {e}")
+        except Exception:
+            self.logger.exception("Failed to execute action %s", action)
             raise
     
+    def _tool_kwargs(self, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop parameters the action's tool does not accept."""
+        allowed = self._allowed_kwargs[action]
+        if allowed is None:
+            return params
+        return {k: v for k, v in params.items() if k in allowed}
+    
     def get_execution_history(
         self,
         limit: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """Get execution history."""
         if limit is None:
-            return self.execution_history
-        return self.execution_history[-limit:]
+            return list(self.execution_history)
+        start = max(0, len(self.execution_history) - limit)
+        return list(itertools.islice(self.execution_history, start, None))
     
     def clear_execution_history(self) -> None:
         """Clear execution history."""
@@ -203,5 +479,5 @@ class ActionExecutor:
             return inspect.getdoc(self.tools[action])
             
         except Exception as e:
-            self.logger.error(f"Failed to get action help: {e}")
+            self.logger.error("Failed to get action help: %s", e)
             return None 
\ No newline at end of file
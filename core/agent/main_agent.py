@@ -2,16 +2,61 @@
 Main agent that coordinates the use of various tools.
 """
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
+import collections
+import functools
 import logging
+import re
 from .base_agent import BaseAgent, AgentState
 from ..tools.web_tools import WebSearchTool, WeatherTool, NewsTool
 from ..tools.system_tools import SystemInfoTool, FileSystemTool, ProcessTool
 from ..brain.llm_decision_maker import LLMDecisionMaker, ToolDescription
 
+@functools.lru_cache(maxsize=1)
+def _shared_tools() -> Dict[str, Any]:
+    """Create the tool instances shared by all main agents."""
+    return {
+        "web_search": WebSearchTool(),
+        "weather": WeatherTool(),
+        "news": NewsTool(),
+        "system_info": SystemInfoTool(),
+        "file_system": FileSystemTool(),
+        "process": ProcessTool()
+    }
+
+@functools.lru_cache(maxsize=1)
+def _shared_tool_descriptions() -> Tuple[ToolDescription, ...]:
+    """Describe the shared tools for the LLM decision maker."""
+    return tuple(
+        ToolDescription(
+            name=tool.name,
+            description=tool.description,
+            parameters=tool.parameters
+        )
+        for tool in _shared_tools().values()
+    )
+
 class MainAgent(BaseAgent):
     """Main agent that coordinates the use of various tools."""
     
+    # Keyword routing for the rule-based fallback, in priority order
+    _FALLBACK_RE = re.compile(
+        r'\b(weather|news|system|cpu|memory|file|directory|process|task)\b',
+        re.IGNORECASE
+    )
+    _FALLBACK_MAP = {
+        'weather': 'weather',
+        'news': 'news',
+        'system': 'system_info',
+        'cpu': 'system_info',
+        'memory': 'system_info',
+        'file': 'file_system',
+        'directory': 'file_system',
+        'process': 'process',
+        'task': 'process'
+    }
+    _FALLBACK_PRIORITY = ('weather', 'news', 'system_info', 'file_system', 'process')
+    
     def __init__(self):
         """Initialize the main agent."""
         super().__init__(
@@ -19,15 +64,11 @@ class MainAgent(BaseAgent):
             description="Main agent that coordinates the use of various tools"
         )
         
-        # Initialize tools
-        self.tools = {
-            "web_search": WebSearchTool(),
-            "weather": WeatherTool(),
-            "news": NewsTool(),
-            "system_info": SystemInfoTool(),
-            "file_system": FileSystemTool(),
-            "process": ProcessTool()
-        }
+        # Tool usage statistics, exposed through get_memory("tool_usage")
+        self._tool_usage: collections.Counter = collections.Counter()
+        
+        # Tools are shared across agents; their execute methods are async-safe
+        self.tools = _shared_tools()
         
         # Add tools to agent
         for tool in self.tools.values():
@@ -37,12 +78,8 @@ class MainAgent(BaseAgent):
         self.decision_maker = LLMDecisionMaker()
         
         # Add tool descriptions to decision maker
-        for tool in self.tools.values():
-            self.decision_maker.add_tool(ToolDescription(
-                name=tool.name,
-                description=tool.description,
-                parameters=tool.parameters
-            ))
+        for description in _shared_tool_descriptions():
+            self.decision_maker.add_tool(description)
     
     async def think(self, input_data: Any) -> Dict[str, Any]:
         """Process input and decide on next action using LLM."""
@@ -51,22 +88,29 @@ class MainAgent(BaseAgent):
             decision = await self.decision_maker.decide(str(input_data))
             
             # Log the decision
-            self.logger.info(f"LLM decision: {decision}")
+            self.logger.info("LLM decision: %s", decision)
             
             return decision
             
         except Exception as e:
-            self.logger.error(f"Error in decision making: {e}")
+            self.logger.error("Error in decision making: %s", e)
             # Fallback to simple rule-based approach
             return self._fallback_decision(input_data)
     
     def _fallback_decision(self, input_data: Any) -> Dict[str, Any]:
         """Fallback decision making when LLM fails."""
         if isinstance(input_data, str):
-            input_data = input_data.lower()
+            # Collect the first match for every tool mentioned in the input
+            matches = {}
+            for match in self._FALLBACK_RE.finditer(input_data):
+                tool = self._FALLBACK_MAP[match.group(1).lower()]
+                matches.setdefault(tool, match)
             
-            if "weather" in input_data:
-                location = input_data.replace("weather", "").strip()
+            tool = next((t for t in self._FALLBACK_PRIORITY if t in matches), None)
+            
+            if tool == "weather":
+                match = matches[tool]
+                location = (input_data[:match.start()] + input_data[match.end():]).strip()
                 if not location:
                     location = "current location"
                 return {
@@ -74,20 +118,21 @@ class MainAgent(BaseAgent):
                     "parameters": {"location": location}
                 }
             
-            elif "news" in input_data:
-                topic = input_data.replace("news", "").strip()
+            elif tool == "news":
+                match = matches[tool]
+                topic = (input_data[:match.start()] + input_data[match.end():]).strip()
                 return {
                     "tool": "news",
                     "parameters": {"topic": topic if topic else None}
                 }
             
-            elif "system" in input_data or "cpu" in input_data or "memory" in input_data:
+            elif tool == "system_info":
                 return {
                     "tool": "system_info",
                     "parameters": {"info_type": "all"}
                 }
             
-            elif "file" in input_data or "directory" in input_data:
+            elif tool == "file_system":
                 return {
                     "tool": "file_system",
                     "parameters": {
@@ -96,7 +141,7 @@ class MainAgent(BaseAgent):
                     }
                 }
             
-            elif "process" in input_data or "task" in input_data:
+            elif tool == "process":
                 return {
                     "tool": "process",
                     "parameters": {
@@ -119,6 +164,7 @@ class MainAgent(BaseAgent):
         """Execute the decided action."""
         tool_name = action["tool"]
         parameters = action["parameters"]
+        self.context.last_action = tool_name
         
         # Get the tool
         tool = self.tools.get(tool_name)
@@ -138,11 +184,15 @@ class MainAgent(BaseAgent):
         self.update_memory("last_result", result)
         
         # Log the result
-        self.logger.info(f"Action completed with result: {result}")
+        self.logger.info("Action completed with result: %s", result)
         
         # Update tool usage statistics
-        tool_usage = self.get_memory("tool_usage", {})
-        if not isinstance(tool_usage, dict):
-            tool_usage = {}
-        tool_usage["total"] = tool_usage.get("total", 0) + 1
-        self.update_memory("tool_usage", tool_usage) 
\ No newline at end of file
+        self._tool_usage["total"] += 1
+        if self.context.last_action:
+            self._tool_usage[self.context.last_action] += 1
+    
+    def get_memory(self, key: str, default: Any = None) -> Any:
+        """Retrieve a value from the agent's memory."""
+        if key == "tool_usage":
+            return dict(self._tool_usage)
+        return super().get_memory(key, default) 
\ No newline at end of file
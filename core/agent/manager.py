@@ -3,7 +3,7 @@ Agent Manager for handling agent-based task execution.
 """
 
 import logging
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
 
 from core.llm.manager import LLMManager
 from core.memory.manager import MemoryManager
@@ -25,6 +25,23 @@ class AgentManager:
     async def process_input(self, user_input: str, context: Optional[str] = None) -> str:
         """Process user input and return response."""
         return await self.llm_manager.generate_response(user_input, context)
+    
+    async def process_batch(
+        self,
+        user_inputs: List[str],
+        contexts: Optional[List[Optional[str]]] = None
+    ) -> List[str]:
+        """Process several user inputs in one batched model call."""
+        return await self.llm_manager.generate_batch(user_inputs, contexts)
+    
+    async def process_input_stream(
+        self,
+        user_input: str,
+        context: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Process user input and stream the response as it is generated."""
+        async for chunk in self.llm_manager.generate_stream(user_input, context):
+            yield chunk
         
     async def shutdown(self):
         """Clean up resources."""
@@ -3,25 +3,90 @@ Task planner module for the agent system.
 """
 
 import logging
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, Tuple
+import collections
+import copy
+import hashlib
 import json
+import re
 from datetime import datetime
 import asyncio
 from ..llm.model_manager import ModelManager
 from ..llm.prompt_templates import PromptTemplates
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+# JSON block inside a markdown code fence
+_JSON_FENCE = re.compile(r'```json\s*\n(.*?)\n\s*```', re.DOTALL)
+
+# Section headers of the structured-text plan format
+_PLAN_HEADERS = {
+    'task': 'task',
+    'steps': 'steps',
+    'constraints': 'constraints',
+    'expected outcome': 'expected_outcome'
+}
+_PLAN_SECTION_RE = re.compile(
+    r'^[ \t]*(?P<header>task|steps|constraints|expected outcome):(?P<value>.*)$',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Section headers of the structured-text resource estimate format
+_RESOURCE_HEADERS = {
+    'time estimate': 'time_estimate',
+    'required tools': 'required_tools',
+    'dependencies': 'dependencies',
+    'potential risks': 'potential_risks'
+}
+_RESOURCE_SECTION_RE = re.compile(
+    r'^[ \t]*(?P<header>time estimate|required tools|dependencies|potential risks):(?P<value>.*)$',
+    re.IGNORECASE | re.MULTILINE
+)
+
+def _iter_sections(pattern: re.Pattern, text: str):
+    """Yield (header, inline value, body lines) for each section header."""
+    anchors = list(pattern.finditer(text))
+    for i, match in enumerate(anchors):
+        end = anchors[i + 1].start() if i + 1 < len(anchors) else len(text)
+        yield (
+            match.group('header').lower(),
+            match.group('value').strip(),
+            text[match.end():end].split('\n')
+        )
+
+def _pretty(plan: Dict[str, Any]) -> str:
+    """Serialize a plan as indented JSON for prompts."""
+    if orjson is not None:
+        return orjson.dumps(
+            plan,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ).decode()
+    return json.dumps(plan, indent=2)
+
 class TaskPlanner:
     """Plans and decomposes tasks into actionable steps."""
     
     def __init__(
         self,
         model_manager: ModelManager,
-        prompt_templates: PromptTemplates
+        prompt_templates: PromptTemplates,
+        plan_cache_size: int = 512
     ):
         """Initialize task planner with components."""
         self.logger = logging.getLogger(__name__)
         self.model_manager = model_manager
         self.prompt_templates = prompt_templates
+        
+        # Parsed plans and validation errors keyed on the response digest
+        self.plan_cache_size = plan_cache_size
+        self._plan_cache: collections.OrderedDict[
+            bytes, Tuple[Dict[str, Any], Optional[str]]
+        ] = collections.OrderedDict()
     
     async def create_plan(
         self,
@@ -46,32 +111,54 @@ class TaskPlanner:
                 system_prompt=system_prompt
             )
             
-            # Parse plan
-            plan = self._parse_plan(response)
-            
-            # Validate plan
-            self._validate_plan(plan)
+            # Parse and validate plan
+            return self._parse_and_validate(response)
             
-            return plan
-            
-        except Exception as e:
-            self.logger.error(f"Failed to create plan: {e}")
+        except Exception:
+            self.logger.exception("Failed to create plan")
             raise
     
+    def _parse_and_validate(self, response: str) -> Dict[str, Any]:
+        """Parse and validate a plan response, memoized on its hash."""
+        key = hashlib.blake2b(response.encode(), digest_size=16).digest()
+        cached = self._plan_cache.get(key)
+        
+        if cached is None:
+            plan = self._parse_plan(response)
+            try:
+                self._validate_plan(plan)
+                error = None
+            except ValueError as e:
+                error = str(e)
+            
+            cached = (plan, error)
+            self._plan_cache[key] = cached
+            if len(self._plan_cache) > self.plan_cache_size:
+                self._plan_cache.popitem(last=False)
+        else:
+            self._plan_cache.move_to_end(key)
+        
+        plan, error = cached
+        if error is not None:
+            raise ValueError(error)
+        
+        # Callers may mutate the plan, so never hand out the cached copy
+        return copy.deepcopy(plan)
+    
     def _parse_plan(self, response: str) -> Dict[str, Any]:
         """Parse the LLM response into a structured plan."""
         try:
             # Try to parse as JSON first
             try:
-                return json.loads(response)
+                return _json_loads(response)
             except json.JSONDecodeError:
                 pass
             
             # Try to extract JSON from text
-            json_match = re.search(r'```json\n(.*?)\n```', response, re.DOTALL)
+            json_match = _JSON_FENCE.search(response)
             if json_match:
                 try:
-                    return json.loads(json_match.group(1))
+                    return _json_loads(json_match.group(1))
                 except json.JSONDecodeError:
                     pass
             
@@ -83,30 +170,24 @@ class TaskPlanner:
                 'expected_outcome': ''
             }
             
-            current_section = None
-            for line in response.split('\n'):
-                line = line.strip()
-                if not line:
+            for header, value, body in _iter_sections(_PLAN_SECTION_RE, response):
+                section = _PLAN_HEADERS[header]
+                if section in ('task', 'expected_outcome'):
+                    plan[section] = value
                     continue
                 
-                if line.lower().startswith('task:'):
-                    plan['task'] = line[5:].strip()
-                elif line.lower().startswith('steps:'):
-                    current_section = 'steps'
-                elif line.lower().startswith('constraints:'):
-                    current_section = 'constraints'
-                elif line.lower().startswith('expected outcome:'):
-                    plan['expected_outcome'] = line[16:].strip()
-                elif current_section == 'steps' and line.startswith('-'):
-                    plan['steps'].append(line[1:].strip())
-                elif current_section == 'constraints' and ':' in line:
-                    key, value = line.split(':', 1)
-                    plan['constraints'][key.strip()] = value.strip()
+                for line in body:
+                    line = line.strip()
+                    if section == 'steps' and line.startswith('-'):
+                        plan['steps'].append(line[1:].strip())
+                    elif section == 'constraints' and ':' in line:
+                        key, item = line.split(':', 1)
+                        plan['constraints'][key.strip()] = item.strip()
             
             return plan
             
-        except Exception as e:
-            self.logger.error(f"Failed to parse plan: {e}")
+        except Exception:
+            self.logger.exception("Failed to parse plan")
             raise
     
     def _validate_plan(self, plan: Dict[str, Any]) -> None:
@@ -134,8 +215,8 @@ class TaskPlanner:
             if not plan['expected_outcome']:
                 raise ValueError("Expected outcome cannot be empty")
             
-        except Exception as e:
-            self.logger.error(f"Failed to validate plan: {e}")
+        except Exception:
+            self.logger.exception("Failed to validate plan")
             raise
     
     async def refine_plan(
@@ -145,30 +226,28 @@ class TaskPlanner:
     ) -> Dict[str, Any]:
         """Refine a plan based on feedback."""
         try:
+            # Serialize plan once for prompt and context
+            plan_str = _pretty(plan)
+            
             # Prepare system prompt
             system_prompt = self.prompt_templates.get_prompt(
                 "plan_refinement",
-                plan=json.dumps(plan, indent=2),
+                plan=plan_str,
                 feedback=feedback
             )
             
             # Generate refined plan
             response = await self.model_manager.generate_response(
                 input_text=feedback,
-                context=json.dumps(plan, indent=2),
+                context=plan_str,
                 system_prompt=system_prompt
             )
             
-            # Parse refined plan
-            refined_plan = self._parse_plan(response)
-            
-            # Validate refined plan
-            self._validate_plan(refined_plan)
-            
-            return refined_plan
+            # Parse and validate refined plan
+            return self._parse_and_validate(response)
             
-        except Exception as e:
-            self.logger.error(f"Failed to refine plan: {e}")
+        except Exception:
+            self.logger.exception("Failed to refine plan")
             raise
     
     async def estimate_resources(
@@ -177,16 +256,19 @@ class TaskPlanner:
     ) -> Dict[str, Any]:
         """Estimate resources needed to execute a plan."""
         try:
+            # Serialize plan once for prompt and context
+            plan_str = _pretty(plan)
+            
             # Prepare system prompt
             system_prompt = self.prompt_templates.get_prompt(
                 "resource_estimation",
-                plan=json.dumps(plan, indent=2)
+                plan=plan_str
             )
             
             # Generate resource estimation
             response = await self.model_manager.generate_response(
                 input_text="Estimate resources needed for this plan",
-                context=json.dumps(plan, indent=2),
+                context=plan_str,
                 system_prompt=system_prompt
             )
             
@@ -202,25 +284,19 @@ class TaskPlanner:
                     'potential_risks': []
                 }
                 
-                current_section = None
-                for line in response.split('\n'):
-                    line = line.strip()
-                    if not line:
+                for header, value, body in _iter_sections(_RESOURCE_SECTION_RE, response):
+                    section = _RESOURCE_HEADERS[header]
+                    if section == 'time_estimate':
+                        resources[section] = value
                         continue
                     
-                    if line.lower().startswith('time estimate:'):
-                        resources['time_estimate'] = line[14:].strip()
-                    elif line.lower().startswith('required tools:'):
-                        current_section = 'required_tools'
-                    elif line.lower().startswith('dependencies:'):
-                        current_section = 'dependencies'
-                    elif line.lower().startswith('potential risks:'):
-                        current_section = 'potential_risks'
-                    elif current_section and line.startswith('-'):
-                        resources[current_section].append(line[1:].strip())
+                    for line in body:
+                        line = line.strip()
+                        if line.startswith('-'):
+                            resources[section].append(line[1:].strip())
                 
                 return resources
                 
-        except Exception as e:
-            self.logger.error(f"Failed to estimate resources: {e}")
+        except Exception:
+            self.logger.exception("Failed to estimate resources")
             raise 
\ No newline at end of file
@@ -4,9 +4,63 @@ Calculator tool implementation for the agent.
 
 import logging
 from typing import Union, Dict, Any
+import ast
+import functools
 import math
 import operator
 
+# Functions callable from calculator expressions
+_FUNCTIONS = {
+    'sqrt': math.sqrt,
+    'sin': math.sin,
+    'cos': math.cos,
+    'tan': math.tan,
+    'log': math.log,
+    'log10': math.log10,
+    'exp': math.exp
+}
+
+# AST nodes allowed in calculator expressions
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load,
+    ast.Constant, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod,
+    ast.FloorDiv, ast.UAdd, ast.USub
+)
+
+class _Validator(ast.NodeVisitor):
+    """
+    Rejects any expression node outside the arithmetic whitelist.
+    
+    Integer constants are rewritten as floats, so results overflow instead
+    of growing without bound (e.g. 9**9**9**9).
+    """
+    
+    def generic_visit(self, node: ast.AST) -> None:
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported expression element: {type(node).__name__}")
+        super().generic_visit(node)
+    
+    def visit_Constant(self, node: ast.Constant) -> None:
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ValueError(f"Unsupported constant: {node.value!r}")
+        node.value = float(node.value)
+    
+    def visit_Name(self, node: ast.Name) -> None:
+        if node.id not in _FUNCTIONS:
+            raise ValueError(f"Unsupported name: {node.id}")
+    
+    def visit_Call(self, node: ast.Call) -> None:
+        if not isinstance(node.func, ast.Name) or node.keywords:
+            raise ValueError("Only plain function calls are supported")
+        self.generic_visit(node)
+
+@functools.lru_cache(maxsize=1024)
+def _compile_expr(expression: str):
+    """Validate and compile an expression, caching the code object."""
+    tree = ast.parse(expression.strip(), mode='eval')
+    _Validator().visit(tree)
+    return compile(tree, '<calc>', 'eval')
+
 class CalculatorTool:
     """Tool for performing mathematical calculations."""
     
@@ -29,6 +83,9 @@ class CalculatorTool:
             'log10': math.log10,
             'exp': math.exp
         }
+        
+        # Namespace for evaluating compiled expressions
+        self._eval_env = dict(_FUNCTIONS)
     
     def calculate(self, expression: str) -> Union[float, int]:
         """
@@ -41,23 +98,10 @@ class CalculatorTool:
             The result of the calculation
         """
         try:
-            # TODO: Implement proper expression parsing
-            # This is a simple implementation that only handles basic operations
-            parts = expression.split()
-            if len(parts) != 3:
-                raise ValueError("Expression must be in format: number operator number")
-            
-            num1 = float(parts[0])
-            op = parts[1]
-            num2 = float(parts[2])
-            
-            if op not in self.operations:
-                raise ValueError(f"Unsupported operation: {op}")
-            
-            return self.operations[op](num1, num2)
+            return eval(_compile_expr(expression), {'__builtins__': {}}, self._eval_env)
             
-        except Exception as e:
-            self.logger.error(f"Calculation failed: {e}")
+        except Exception:
+            self.logger.exception("Calculation failed")
             raise
     
     def evaluate_function(self, func_name: str, *args: float) -> float:
@@ -77,6 +121,6 @@ class CalculatorTool:
             
             return self.operations[func_name](*args)
             
-        except Exception as e:
-            self.logger.error(f"Function evaluation failed: {e}")
+        except Exception:
+            self.logger.exception("Function evaluation failed")
             raise 
\ No newline at end of file
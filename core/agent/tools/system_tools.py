@@ -2,13 +2,40 @@
 System tools implementation for the agent.
 """
 
+import asyncio
+import functools
 import logging
 import os
 import platform
+import stat
+import sys
 import psutil
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
 import subprocess
 import shutil
+import time
+
+try:
+    import pwd
+except ImportError:
+    pwd = None
+
+@functools.lru_cache(maxsize=256)
+def _username(uid: int) -> Optional[str]:
+    """Resolve a user id to a user name."""
+    if pwd is None:
+        return None
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except KeyError:
+        return str(uid)
+
+def _format_bytes(n: int) -> str:
+    """Format a byte count with a binary unit suffix."""
+    for unit in ('B', 'KiB', 'MiB', 'GiB', 'TiB'):
+        if n < 1024 or unit == 'TiB':
+            return f"{n} {unit}" if unit == 'B' else f"{n:.1f} {unit}"
+        n /= 1024
 
 class SystemTools:
     """Tools for interacting with the system."""
@@ -16,6 +43,18 @@ class SystemTools:
     def __init__(self):
         """Initialize the system tools."""
         self.logger = logging.getLogger(__name__)
+        
+        # Platform details never change while the process runs
+        self._static = {
+            'platform': platform.system(),
+            'platform_version': platform.version(),
+            'architecture': platform.machine(),
+            'processor': platform.processor(),
+            'python_version': platform.python_version()
+        }
+        
+        # Previous CPU time samples (ticks, monotonic time) per pid
+        self._proc_times: Dict[int, Tuple[int, float]] = {}
     
     def get_system_info(self) -> Dict[str, Any]:
         """
@@ -25,29 +64,110 @@ class SystemTools:
             Dictionary containing system information
         """
         try:
+            raw = self.get_system_info_raw()
+            disk_size = raw['disk_used'] + raw['disk_free']
+            
             return {
-                'platform': platform.system(),
-                'platform_version': platform.version(),
-                'architecture': platform.machine(),
-                'processor': platform.processor(),
-                'python_version': platform.python_version(),
+                **self._static,
                 'memory': {
-                    'total': psutil.virtual_memory().total,
-                    'available': psutil.virtual_memory().available,
-                    'used': psutil.virtual_memory().used,
-                    'percent': psutil.virtual_memory().percent
+                    'total': raw['memory_total'],
+                    'available': raw['memory_available'],
+                    'used': raw['memory_used'],
+                    'percent': raw['memory_percent']
                 },
                 'disk': {
-                    'total': psutil.disk_usage('/').total,
-                    'used': psutil.disk_usage('/').used,
-                    'free': psutil.disk_usage('/').free,
-                    'percent': psutil.disk_usage('/').percent
+                    'total': raw['disk_total'],
+                    'used': raw['disk_used'],
+                    'free': raw['disk_free'],
+                    'percent': round(raw['disk_used'] * 100 / disk_size, 1) if disk_size else 0.0
                 }
             }
         except Exception as e:
             self.logger.error(f"Failed to get system info: {e}")
             raise
     
+    def get_system_info_raw(self, path: str = '/') -> Dict[str, Any]:
+        """
+        Get memory and disk usage as plain numbers.
+        
+        Disk usage comes from a single os.statvfs call where available.
+        Nothing is formatted; use format_system_info for display.
+        
+        Args:
+            path: Path of the filesystem to report on
+            
+        Returns:
+            Dictionary of byte counts (and the memory percentage)
+        """
+        try:
+            vm = psutil.virtual_memory()
+            
+            if hasattr(os, 'statvfs'):
+                sv = os.statvfs(path)
+                disk_total = sv.f_frsize * sv.f_blocks
+                disk_used = sv.f_frsize * (sv.f_blocks - sv.f_bfree)
+                disk_free = sv.f_frsize * sv.f_bavail
+            else:
+                du = psutil.disk_usage(path)
+                disk_total, disk_used, disk_free = du.total, du.used, du.free
+            
+            return {
+                'memory_total': vm.total,
+                'memory_available': vm.available,
+                'memory_used': vm.used,
+                'memory_percent': vm.percent,
+                'disk_total': disk_total,
+                'disk_used': disk_used,
+                'disk_free': disk_free
+            }
+        except Exception as e:
+            self.logger.error(f"Failed to get raw system info: {e}")
+            raise
+    
+    @staticmethod
+    def format_system_info(raw: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Format raw system info for display.
+        
+        Args:
+            raw: Dictionary returned by get_system_info_raw
+            
+        Returns:
+            Dictionary mapping the same keys to human-readable strings
+        """
+        return {
+            key: f"{value:.1f}%" if key.endswith('_percent') else _format_bytes(value)
+            for key, value in raw.items()
+        }
+    
+    def iter_process_info(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over information about running processes.
+        
+        Each process's attributes are read inside proc.oneshot(), so psutil
+        fetches its /proc files once per process instead of once per attribute.
+        
+        Yields:
+            Dictionary containing process information
+        """
+        try:
+            for proc in psutil.process_iter():
+                try:
+                    with proc.oneshot():
+                        info = {
+                            'pid': proc.pid,
+                            'name': proc.name(),
+                            'username': proc.username(),
+                            'cpu_percent': proc.cpu_percent(None),
+                            'memory_percent': proc.memory_percent()
+                        }
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    continue
+                yield info
+        except Exception as e:
+            self.logger.error(f"Failed to get process info: {e}")
+            raise
+    
     def get_process_info(self) -> List[Dict[str, Any]]:
         """
         Get information about running processes.
@@ -55,13 +175,78 @@ class SystemTools:
         Returns:
             List of dictionaries containing process information
         """
+        return list(self.iter_process_info())
+    
+    def get_process_info_fast(self) -> List[Dict[str, Any]]:
+        """
+        Get information about running processes by reading /proc directly.
+        
+        Each process costs one stat of its /proc directory and one read of
+        its stat file. Falls back to get_process_info on non-Linux systems.
+        
+        Returns:
+            List of dictionaries containing process information
+        """
+        if not sys.platform.startswith('linux'):
+            return self.get_process_info()
+        
         try:
+            page_size = os.sysconf('SC_PAGE_SIZE')
+            clock_ticks = os.sysconf('SC_CLK_TCK')
+            total_memory = psutil.virtual_memory().total
+            now = time.monotonic()
+            
             processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'username', 'cpu_percent', 'memory_percent']):
-                try:
-                    processes.append(proc.info)
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    pass
+            proc_times = {}
+            with os.scandir('/proc') as entries:
+                for entry in entries:
+                    if not entry.name.isdigit():
+                        continue
+                    
+                    pid = int(entry.name)
+                    try:
+                        uid = entry.stat().st_uid
+                        fd = os.open(f'/proc/{pid}/stat', os.O_RDONLY)
+                        try:
+                            data = os.read(fd, 4096)
+                        finally:
+                            os.close(fd)
+                    except OSError:
+                        # Process exited or is inaccessible
+                        continue
+                    
+                    # Format: pid (comm) state ... ; comm may contain spaces
+                    try:
+                        open_paren = data.find(b'(')
+                        close_paren = data.rfind(b')')
+                        if open_paren < 0 or close_paren < open_paren:
+                            continue
+                        fields = data[close_paren + 2:].split()
+                        ticks = int(fields[11]) + int(fields[12])
+                        rss = int(fields[21]) * page_size
+                    except (ValueError, IndexError):
+                        # Truncated or malformed read of an exiting process
+                        continue
+                    
+                    previous = self._proc_times.get(pid)
+                    cpu_percent = 0.0
+                    if previous is not None and now > previous[1]:
+                        cpu_percent = round(
+                            (ticks - previous[0]) / clock_ticks / (now - previous[1]) * 100,
+                            1
+                        )
+                    proc_times[pid] = (ticks, now)
+                    
+                    processes.append({
+                        'pid': pid,
+                        'name': data[open_paren + 1:close_paren].decode(errors='replace'),
+                        'username': _username(uid),
+                        'cpu_percent': cpu_percent,
+                        'memory_percent': rss / total_memory * 100
+                    })
+            
+            # Only keep samples for live processes
+            self._proc_times = proc_times
             return processes
         except Exception as e:
             self.logger.error(f"Failed to get process info: {e}")
@@ -95,6 +280,73 @@ class SystemTools:
             self.logger.error(f"Failed to execute command: {e}")
             raise
     
+    async def execute_command_async(
+        self,
+        command: Union[str, List[str]],
+        shell: bool = False,
+        max_bytes: int = 8 << 20
+    ) -> Dict[str, Any]:
+        """
+        Execute a system command without blocking the event loop.
+        
+        Args:
+            command: Argument list, or a command string run through the shell
+            shell: Run the command through the shell even if it is a list
+            max_bytes: Maximum bytes kept from each of stdout and stderr
+            
+        Returns:
+            Dictionary containing command output and status
+        """
+        try:
+            if isinstance(command, list) and not shell:
+                proc = await asyncio.create_subprocess_exec(
+                    *command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+            else:
+                if isinstance(command, list):
+                    command = subprocess.list2cmdline(command)
+                proc = await asyncio.create_subprocess_shell(
+                    command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+            
+            (stdout, stdout_truncated), (stderr, stderr_truncated) = await asyncio.gather(
+                self._read_capped(proc.stdout, max_bytes),
+                self._read_capped(proc.stderr, max_bytes)
+            )
+            returncode = await proc.wait()
+            
+            return {
+                'stdout': stdout.decode(errors='replace'),
+                'stderr': stderr.decode(errors='replace'),
+                'returncode': returncode,
+                'success': returncode == 0,
+                'truncated': stdout_truncated or stderr_truncated
+            }
+        except Exception as e:
+            self.logger.error(f"Failed to execute command: {e}")
+            raise
+    
+    @staticmethod
+    async def _read_capped(stream: asyncio.StreamReader, max_bytes: int) -> Tuple[bytes, bool]:
+        """Read a stream to EOF, keeping at most max_bytes of it."""
+        buffer = bytearray()
+        truncated = False
+        while True:
+            chunk = await stream.read(64 * 1024)
+            if not chunk:
+                break
+            # Keep draining past the cap so the child never blocks on a full pipe
+            room = max_bytes - len(buffer)
+            if room > 0:
+                buffer += chunk[:room]
+            if len(chunk) > room:
+                truncated = True
+        return bytes(buffer), truncated
+    
     def get_file_info(self, path: str) -> Dict[str, Any]:
         """
         Get information about a file or directory.
@@ -106,25 +358,45 @@ class SystemTools:
             Dictionary containing file information
         """
         try:
-            if not os.path.exists(path):
+            try:
+                stats = os.stat(path)
+            except FileNotFoundError:
                 raise FileNotFoundError(f"Path does not exist: {path}")
             
-            stats = os.stat(path)
-            
             return {
                 'path': path,
                 'size': stats.st_size,
                 'created': stats.st_ctime,
                 'modified': stats.st_mtime,
                 'accessed': stats.st_atime,
-                'is_file': os.path.isfile(path),
-                'is_dir': os.path.isdir(path),
+                'is_file': stat.S_ISREG(stats.st_mode),
+                'is_dir': stat.S_ISDIR(stats.st_mode),
                 'permissions': oct(stats.st_mode)[-3:]
             }
         except Exception as e:
             self.logger.error(f"Failed to get file info: {e}")
             raise
     
+    def _file_info_from_entry(self, entry: os.DirEntry) -> Dict[str, Any]:
+        """
+        Build file information from a directory entry.
+        
+        Symlinks are followed, as in get_file_info. The entry caches its stat
+        result and type, so each entry costs at most one stat call.
+        """
+        stats = entry.stat()
+        
+        return {
+            'path': entry.path,
+            'size': stats.st_size,
+            'created': stats.st_ctime,
+            'modified': stats.st_mtime,
+            'accessed': stats.st_atime,
+            'is_file': entry.is_file(),
+            'is_dir': entry.is_dir(),
+            'permissions': oct(stats.st_mode)[-3:]
+        }
+    
     def get_directory_contents(self, path: str) -> List[Dict[str, Any]]:
         """
         Get contents of a directory.
@@ -139,12 +411,8 @@ class SystemTools:
             if not os.path.isdir(path):
                 raise NotADirectoryError(f"Path is not a directory: {path}")
             
-            contents = []
-            for item in os.listdir(path):
-                item_path = os.path.join(path, item)
-                contents.append(self.get_file_info(item_path))
-            
-            return contents
+            with os.scandir(path) as entries:
+                return [self._file_info_from_entry(entry) for entry in entries]
         except Exception as e:
             self.logger.error(f"Failed to get directory contents: {e}")
             raise 
\ No newline at end of file
@@ -2,17 +2,66 @@
 Web search tool implementation for the agent.
 """
 
+import asyncio
 import logging
-from typing import List, Dict, Any
-import requests
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple, Union
+import aiohttp
 from bs4 import BeautifulSoup
 
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# aiohttp only decodes brotli when a brotli package is installed
+try:
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = 'br, gzip, deflate'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _ACCEPT_ENCODING = 'br, gzip, deflate'
+    except ImportError:
+        _ACCEPT_ENCODING = 'gzip, deflate'
+
+# Failures worth retrying: the connection, not the server's answer
+_RETRYABLE_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
 class WebSearchTool:
     """Tool for performing web searches and retrieving information."""
     
-    def __init__(self):
-        """Initialize the web search tool."""
+    def __init__(self, max_retries: int = 2, cache_size: int = 256):
+        """
+        Initialize the web search tool.
+        
+        Args:
+            max_retries: Retries for requests that fail to connect or time out
+            cache_size: Number of pages kept for conditional GET revalidation
+        """
         self.logger = logging.getLogger(__name__)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.max_retries = max_retries
+        
+        # url -> (validators, extracted text) for If-None-Match/If-Modified-Since
+        self.cache_size = cache_size
+        self._page_cache: "OrderedDict[str, Tuple[Dict[str, str], str]]" = OrderedDict()
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32),
+                timeout=aiohttp.ClientTimeout(total=10),
+                headers={'Accept-Encoding': _ACCEPT_ENCODING}
+            )
+        return self._session
+    
+    async def aclose(self) -> None:
+        """Close the shared HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
     
     def search(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
         """
@@ -39,7 +88,7 @@ class WebSearchTool:
             self.logger.error(f"Web search failed: {e}")
             raise
     
-    def extract_content(self, url: str) -> str:
+    async def extract_content(self, url: str) -> str:
         """
         Extract main content from a webpage.
         
@@ -50,22 +99,161 @@ class WebSearchTool:
             Extracted text content
         """
         try:
-            response = requests.get(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            cached = self._page_cache.get(url)
+            headers = cached[0] if cached is not None else None
             
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-                
-            # Get text content
-            text = soup.get_text()
+            status, validators, html = await self._fetch(url, headers)
+            if status == 304 and cached is not None:
+                self._page_cache.move_to_end(url)
+                self.logger.debug(f"Content cache hit (304 Not Modified): {url}")
+                return cached[1]
+            
+            text = self._extract_text(html)
             
-            # Clean up text
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = ' '.join(chunk for chunk in chunks if chunk)
+            if validators and self.cache_size > 0:
+                self._page_cache[url] = (validators, text)
+                self._page_cache.move_to_end(url)
+                if len(self._page_cache) > self.cache_size:
+                    self._page_cache.popitem(last=False)
             
             return text
         except Exception as e:
             self.logger.error(f"Content extraction failed: {e}")
-            raise 
\ No newline at end of file
+            raise
+    
+    async def _fetch(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Fetch a URL, retrying connection failures and timeouts.
+        
+        Args:
+            url: The URL to fetch
+            headers: Extra request headers (conditional GET validators)
+            
+        Returns:
+            Tuple of (status, conditional GET validators, body bytes)
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._get_session().get(
+                    url,
+                    allow_redirects=True,
+                    headers=headers
+                ) as response:
+                    if response.status == 304:
+                        return 304, {}, b''
+                    response.raise_for_status()
+                    
+                    validators = {}
+                    if 'ETag' in response.headers:
+                        validators['If-None-Match'] = response.headers['ETag']
+                    if 'Last-Modified' in response.headers:
+                        validators['If-Modified-Since'] = response.headers['Last-Modified']
+                    
+                    return response.status, validators, await response.read()
+            except _RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                self.logger.warning(f"Fetching {url} failed ({e!r}), retrying")
+                await asyncio.sleep(0.5 * 2 ** attempt)
+    
+    def _extract_text(self, html: bytes) -> str:
+        """
+        Extract visible text from an HTML document.
+        
+        Args:
+            html: Raw HTML bytes
+            
+        Returns:
+            Text content with whitespace collapsed
+        """
+        if LexborHTMLParser is not None:
+            tree = LexborHTMLParser(html)
+            
+            # Remove script and style elements
+            for node in tree.css('script, style'):
+                node.decompose()
+            
+            # Get text content
+            root = tree.body if tree.body is not None else tree.root
+            text = root.text(separator=' ', strip=True) if root is not None else ''
+        else:
+            soup = BeautifulSoup(html, 'html.parser')
+            
+            # Remove script and style elements
+            for script in soup(["script", "style"]):
+                script.decompose()
+            
+            # Get text content
+            text = soup.get_text(separator=' ')
+        
+        # Collapse whitespace in a single C-level pass
+        return ' '.join(text.split())
+    
+    async def extract_content_many(
+        self,
+        urls: List[str],
+        concurrency: int = 16
+    ) -> List[Union[str, BaseException]]:
+        """
+        Extract content from several webpages concurrently.
+        
+        Args:
+            urls: The URLs to extract content from
+            concurrency: Maximum number of simultaneous requests
+            
+        Returns:
+            Extracted text per URL, or the exception raised for that URL
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def extract(url: str) -> str:
+            async with semaphore:
+                return await self.extract_content(url)
+        
+        return await asyncio.gather(
+            *(extract(url) for url in urls),
+            return_exceptions=True
+        )
+
+# Shared instance behind the module-level functions the executor loads
+_web_search = WebSearchTool()
+
+async def extract_content(url: str) -> Dict[str, Any]:
+    """
+    Extract main content from a webpage.
+    
+    Args:
+        url: The URL to extract content from
+        
+    Returns:
+        Dictionary with the extracted text under "content"
+    """
+    return {'content': await _web_search.extract_content(url)}
+
+async def _extract_content_batch(
+    params_list: List[Dict[str, Any]],
+    context: Optional[Dict[str, Any]] = None
+) -> List[Union[Dict[str, Any], BaseException]]:
+    """
+    Extract content for several extract_content steps concurrently.
+    
+    Args:
+        params_list: Parameters of each step
+        context: Execution context (unused)
+        
+    Returns:
+        Result dict per step, or the exception raised for that step
+    """
+    texts = await _web_search.extract_content_many(
+        [params.get('url') for params in params_list]
+    )
+    return [
+        text if isinstance(text, BaseException) else {'content': text}
+        for text in texts
+    ]
+
+extract_content.execute_batch = _extract_content_batch
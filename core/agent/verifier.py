@@ -5,11 +5,39 @@ Result verifier module for validating execution results.
 import logging
 from typing import Dict, List, Optional, Any, Union
 import json
+import re
 from datetime import datetime
 import asyncio
 from ..llm.model_manager import ModelManager
 from ..llm.prompt_templates import PromptTemplates
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+def _dumps(obj: Any) -> str:
+    """Serialize an object as indented JSON for prompts."""
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ).decode()
+    return json.dumps(obj, indent=2)
+
+# JSON block inside a markdown code fence
+_JSON_BLOCK_RE = re.compile(r'```json\s*\n(.*?)\n```', re.DOTALL)
+
+# Section headers of the structured-text verification format
+_VERIFICATION_HEADERS = {
+    'verification': 'verification',
+    'success': 'success',
+    'issues': 'issues',
+    'suggestions': 'suggestions'
+}
+
 class ResultVerifier:
     """Validates and verifies execution results."""
     
@@ -23,12 +51,27 @@ class ResultVerifier:
         self.model_manager = model_manager
         self.prompt_templates = prompt_templates
     
+    def _render_prompt(self, template_name: str, **kwargs: Any) -> str:
+        """Render a prompt, formatting only the variable part of the template.
+        
+        The split is memoized by PromptTemplates and dropped when the
+        template is replaced or deleted.
+        """
+        if self.prompt_templates.get_template(template_name) is None:
+            return self.prompt_templates.get_prompt(template_name, **kwargs)
+        prefix, body = self.prompt_templates.split_template(template_name)
+        return prefix + body.render(**kwargs)
+    
     async def verify_results(
         self,
         results: Dict[str, Any],
         expected_outcome: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Verify execution results against expected outcome."""
+        """Verify execution results against expected outcome.
+        
+        When suggestions are needed as well, verify_and_suggest gets both
+        from a single generation.
+        """
         try:
             # Prepare verification data
             verification_data = {
@@ -37,17 +80,20 @@ class ResultVerifier:
                 'verification_time': datetime.now().isoformat()
             }
             
+            # Serialize results once for prompt and context
+            results_json = _dumps(results)
+            
             # Generate verification prompt
-            system_prompt = self.prompt_templates.get_prompt(
+            system_prompt = self._render_prompt(
                 "result_verification",
-                results=json.dumps(results, indent=2),
+                results=results_json,
                 expected_outcome=expected_outcome
             )
             
             # Generate verification
             response = await self.model_manager.generate_response(
                 input_text="Verify these execution results",
-                context=json.dumps(results, indent=2),
+                context=results_json,
                 system_prompt=system_prompt
             )
             
@@ -59,24 +105,96 @@ class ResultVerifier:
             
             return verification
             
-        except Exception as e:
-            self.logger.error(f"Failed to verify results: {e}")
+        except Exception:
+            self.logger.exception("Failed to verify results")
+            raise
+    
+    async def verify_and_suggest(
+        self,
+        results: Dict[str, Any],
+        expected_outcome: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Verify results and suggest improvements in one LLM call.
+        
+        Returns a dict with 'verification' (shaped like verify_results) and
+        'suggestions' (shaped like suggest_improvements).
+        """
+        try:
+            verification_time = datetime.now().isoformat()
+            
+            # Serialize results once for prompt and context
+            results_json = _dumps(results)
+            
+            # Generate fused prompt
+            system_prompt = self._render_prompt(
+                "verify_and_suggest",
+                results=results_json,
+                expected_outcome=expected_outcome
+            )
+            
+            # Generate verification and suggestions together
+            response = await self.model_manager.generate_response(
+                input_text="Verify these execution results and suggest improvements",
+                context=results_json,
+                system_prompt=system_prompt
+            )
+            
+            # Split the combined output
+            combined = self._parse_combined(response)
+            verification = combined['verification']
+            suggestions = combined['suggestions']
+            
+            # Add verification data
+            verification.update({
+                'results': results,
+                'expected_outcome': expected_outcome,
+                'verification_time': verification_time
+            })
+            
+            return {
+                'verification': verification,
+                'suggestions': suggestions
+            }
+            
+        except Exception:
+            self.logger.exception("Failed to verify and suggest")
             raise
     
+    def _parse_combined(self, response: str) -> Dict[str, Any]:
+        """Parse a fused verification response into its two halves."""
+        parsed = self._parse_verification(response)
+        
+        # JSON output: {"verification": {...}, "suggestions": [...]}
+        if isinstance(parsed.get('verification'), dict):
+            suggestions = parsed.get('suggestions', [])
+            return {
+                'verification': parsed['verification'],
+                'suggestions': suggestions if isinstance(suggestions, list) else [suggestions]
+            }
+        
+        # Structured text: suggestions come from the "Suggestions:" section
+        return {
+            'verification': parsed,
+            'suggestions': [
+                suggestion if isinstance(suggestion, dict) else {'title': suggestion}
+                for suggestion in parsed.get('suggestions', [])
+            ]
+        }
+    
     def _parse_verification(self, response: str) -> Dict[str, Any]:
         """Parse the LLM response into a structured verification."""
         try:
             # Try to parse as JSON first
             try:
-                return json.loads(response)
+                return _json_loads(response)
             except json.JSONDecodeError:
                 pass
             
             # Try to extract JSON from text
-            json_match = re.search(r'```json\n(.*?)\n```', response, re.DOTALL)
+            json_match = _JSON_BLOCK_RE.search(response)
             if json_match:
                 try:
-                    return json.loads(json_match.group(1))
+                    return _json_loads(json_match.group(1))
                 except json.JSONDecodeError:
                     pass
             
@@ -89,26 +207,27 @@ class ResultVerifier:
             }
             
             current_section = None
-            for line in response.split('\n'):
+            for line in response.splitlines():
                 line = line.strip()
                 if not line:
                     continue
                 
-                if line.lower().startswith('verification:'):
-                    verification['verification'] = line[12:].strip()
-                elif line.lower().startswith('success:'):
-                    verification['success'] = line[7:].strip().lower() == 'true'
-                elif line.lower().startswith('issues:'):
-                    current_section = 'issues'
-                elif line.lower().startswith('suggestions:'):
-                    current_section = 'suggestions'
+                head, sep, value = line.partition(':')
+                header = _VERIFICATION_HEADERS.get(head.lower()) if sep else None
+                
+                if header == 'verification':
+                    verification['verification'] = value.strip()
+                elif header == 'success':
+                    verification['success'] = value.strip().lower() == 'true'
+                elif header:
+                    current_section = header
                 elif current_section and line.startswith('-'):
                     verification[current_section].append(line[1:].strip())
             
             return verification
             
-        except Exception as e:
-            self.logger.error(f"Failed to parse verification: {e}")
+        except Exception:
+            self.logger.exception("Failed to parse verification")
             raise
     
     async def verify_step(
@@ -125,17 +244,20 @@ class ResultVerifier:
                 'verification_time': datetime.now().isoformat()
             }
             
+            # Serialize step result once for prompt and context
+            step_result_json = _dumps(step_result)
+            
             # Generate verification prompt
-            system_prompt = self.prompt_templates.get_prompt(
+            system_prompt = self._render_prompt(
                 "step_verification",
-                step_result=json.dumps(step_result, indent=2),
+                step_result=step_result_json,
                 step_definition=step_definition
             )
             
             # Generate verification
             response = await self.model_manager.generate_response(
                 input_text="Verify this step execution result",
-                context=json.dumps(step_result, indent=2),
+                context=step_result_json,
                 system_prompt=system_prompt
             )
             
@@ -147,8 +269,8 @@ class ResultVerifier:
             
             return verification
             
-        except Exception as e:
-            self.logger.error(f"Failed to verify step: {e}")
+        except Exception:
+            self.logger.exception("Failed to verify step")
             raise
     
     async def suggest_improvements(
@@ -156,7 +278,11 @@ class ResultVerifier:
         results: Dict[str, Any],
         verification: Dict[str, Any]
     ) -> List[Dict[str, Any]]:
-        """Suggest improvements based on verification results."""
+        """Suggest improvements based on verification results.
+        
+        Use verify_and_suggest instead when no verification exists yet, to
+        avoid a second round-trip over the same results.
+        """
         try:
             # Prepare improvement data
             improvement_data = {
@@ -166,28 +292,28 @@ class ResultVerifier:
             }
             
             # Generate improvement prompt
-            system_prompt = self.prompt_templates.get_prompt(
+            system_prompt = self._render_prompt(
                 "improvement_suggestions",
-                results=json.dumps(results, indent=2),
-                verification=json.dumps(verification, indent=2)
+                results=_dumps(results),
+                verification=_dumps(verification)
             )
             
             # Generate suggestions
             response = await self.model_manager.generate_response(
                 input_text="Suggest improvements for these results",
-                context=json.dumps(improvement_data, indent=2),
+                context=_dumps(improvement_data),
                 system_prompt=system_prompt
             )
             
             # Parse suggestions
             try:
-                suggestions = json.loads(response)
+                suggestions = _json_loads(response)
             except json.JSONDecodeError:
                 # Parse as structured text
                 suggestions = []
                 current_suggestion = {}
                 
-                for line in response.split('\n'):
+                for line in response.splitlines():
                     line = line.strip()
                     if not line:
                         if current_suggestion:
@@ -199,15 +325,16 @@ class ResultVerifier:
                         if current_suggestion:
                             suggestions.append(current_suggestion)
                         current_suggestion = {'title': line}
-                    elif ':' in line:
-                        key, value = line.split(':', 1)
-                        current_suggestion[key.strip()] = value.strip()
+                    else:
+                        key, sep, value = line.partition(':')
+                        if sep:
+                            current_suggestion[key.strip()] = value.strip()
                 
                 if current_suggestion:
                     suggestions.append(current_suggestion)
             
             return suggestions
             
-        except Exception as e:
-            self.logger.error(f"Failed to suggest improvements: {e}")
+        except Exception:
+            self.logger.exception("Failed to suggest improvements")
             raise 
\ No newline at end of file
@@ -5,8 +5,14 @@ Handles the flow of information between components.
 
 import os
 import logging
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
 import asyncio
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 from core.llm.manager import LLMManager
 from core.memory.manager import MemoryManager
@@ -14,6 +20,15 @@ from core.rag.manager import RAGManager
 from core.agent.manager import AgentManager
 from core.tools.manager import ToolManager
 
+def _deep_merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """Recursively merge override into base, in place."""
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _deep_merge(base[key], value)
+        else:
+            base[key] = value
+    return base
+
 class JarvisBrain:
     """Core orchestration class for the Jarvis assistant."""
     
@@ -39,22 +54,15 @@ class JarvisBrain:
     
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """Load configuration from YAML file."""
-        import yaml
-        
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        with open(config_path, 'rb') as f:
+            config = yaml.load(f, Loader=SafeLoader)
         
         # Check for user config and override defaults
         user_config_path = os.path.join(os.path.dirname(config_path), "user_config.yaml")
         if os.path.exists(user_config_path):
-            with open(user_config_path, 'r') as f:
-                user_config = yaml.safe_load(f)
-                # Deep merge configs (simplistic version)
-                for key, value in user_config.items():
-                    if key in config and isinstance(value, dict) and isinstance(config[key], dict):
-                        config[key].update(value)
-                    else:
-                        config[key] = value
+            with open(user_config_path, 'rb') as f:
+                user_config = yaml.load(f, Loader=SafeLoader)
+            _deep_merge(config, user_config or {})
         
         return config
     
@@ -98,6 +106,55 @@ class JarvisBrain:
         
         return response
     
+    async def process_batch(self, user_inputs: List[str]) -> List[str]:
+        """
+        Process several user inputs and return their responses in order.
+        Same pipeline as process_input, but the model tokenizes and
+        generates for the whole batch at once.
+        """
+        self.logger.info(f"Processing batch of {len(user_inputs)} inputs")
+        
+        # 1. Update memory with the new inputs
+        for user_input in user_inputs:
+            await self.memory_manager.add_interaction(user_input)
+        
+        # 2. Use RAG to retrieve relevant information for each input
+        contexts = await asyncio.gather(
+            *(self.rag_manager.retrieve_relevant_context(text) for text in user_inputs)
+        )
+        
+        # 3. Use agent to generate all responses in one batch
+        responses = await self.agent_manager.process_batch(user_inputs, list(contexts))
+        
+        # 4. Update memory with the responses
+        for response in responses:
+            await self.memory_manager.add_interaction(response)
+        
+        return responses
+    
+    async def generate_stream(self, user_input: str) -> AsyncIterator[str]:
+        """
+        Process user input and stream the response as it is generated.
+        Same pipeline as process_input, but text chunks are yielded as soon
+        as they are decoded.
+        """
+        self.logger.info(f"Processing input (streaming): {user_input}")
+        
+        # 1. Update memory with new input
+        await self.memory_manager.add_interaction(user_input)
+        
+        # 2. Use RAG to retrieve relevant information
+        context = await self.rag_manager.retrieve_relevant_context(user_input)
+        
+        # 3. Stream the agent's response
+        chunks = []
+        async for chunk in self.agent_manager.process_input_stream(user_input, context):
+            chunks.append(chunk)
+            yield chunk
+        
+        # 4. Update memory with the full response
+        await self.memory_manager.add_interaction("".join(chunks).strip())
+    
     async def learn_from_document(self, document_path: str):
         """Process and learn from a new document."""
         self.logger.info(f"Learning from document: {document_path}")
@@ -111,11 +168,14 @@ class JarvisBrain:
         """Start the Jarvis assistant."""
         self.logger.info("Starting Jarvis...")
         
-        # Initialize any async components
-        await self.llm_manager.initialize()
-        await self.memory_manager.initialize()
-        await self.rag_manager.initialize()
-        await self.tool_manager.initialize()
+        # Initialize independent components concurrently; the agent manager
+        # depends on the others and starts last
+        await asyncio.gather(
+            self.llm_manager.initialize(),
+            self.memory_manager.initialize(),
+            self.rag_manager.initialize(),
+            self.tool_manager.initialize()
+        )
         await self.agent_manager.initialize()
         
         self.logger.info("Jarvis is ready.")
@@ -124,12 +184,26 @@ class JarvisBrain:
         """Properly shut down the Jarvis assistant."""
         self.logger.info("Shutting down Jarvis...")
         
-        # Clean up resources
-        await self.llm_manager.shutdown()
-        await self.memory_manager.shutdown()
-        await self.rag_manager.shutdown()
-        await self.tool_manager.shutdown()
-        await self.agent_manager.shutdown()
+        # Clean up resources, agent manager first since it uses the others
+        try:
+            await self.agent_manager.shutdown()
+        except Exception as e:
+            self.logger.error(f"Failed to shut down AgentManager: {e}")
+        
+        # A failing component must not keep the others from cleaning up
+        managers = [
+            self.llm_manager,
+            self.memory_manager,
+            self.rag_manager,
+            self.tool_manager
+        ]
+        results = await asyncio.gather(
+            *(manager.shutdown() for manager in managers),
+            return_exceptions=True
+        )
+        for manager, result in zip(managers, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Failed to shut down {type(manager).__name__}: {result}")
         
         self.logger.info("Jarvis shut down successfully.")
 
@@ -2,14 +2,33 @@
 LLM-based decision maker for the agent system.
 """
 
+import asyncio
 import os
-from typing import Any, Dict, List, Optional
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
 import logging
 from dataclasses import dataclass
 import json
-from transformers import AutoModelForCausalLM, AutoTokenizer
+from transformers import (
+    AutoModelForCausalLM,
+    AutoTokenizer,
+    BitsAndBytesConfig,
+    StoppingCriteria,
+    StoppingCriteriaList
+)
 import torch
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _dumps(obj: Any) -> str:
+    """Serialize an object as indented JSON for prompts."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
 @dataclass
 class ToolDescription:
     """Description of a tool for the LLM."""
@@ -17,15 +36,92 @@ class ToolDescription:
     description: str
     parameters: Dict[str, Any]
 
+class JSONObjectStoppingCriteria(StoppingCriteria):
+    """Stops generation once the first JSON object in the output is closed."""
+    
+    def __init__(self, tokenizer: Any, prompt_length: int):
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+    
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> bool:
+        if input_ids.shape[1] <= self.prompt_length:
+            return False
+        
+        # Only the newest token needs scanning
+        for char in self.tokenizer.decode(input_ids[0, -1:]):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"' and self.started:
+                self.in_string = True
+            elif char == "{":
+                self.depth += 1
+                self.started = True
+            elif char == "}" and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
 class LLMDecisionMaker:
     """Makes decisions using an LLM."""
     
-    def __init__(self, model_name: str = "meta-llama/Llama-3.3-70B-Instruct"):
-        """Initialize the decision maker."""
+    def __init__(
+        self,
+        model_name: str = "meta-llama/Llama-3.3-70B-Instruct",
+        quantization: Optional[str] = "4bit",
+        backend: str = "transformers",
+        compile_model: bool = False
+    ):
+        """Initialize the decision maker.
+        
+        quantization is "4bit" (NF4), "8bit" or None for fp16 weights.
+        Quantized loading needs CUDA and bitsandbytes; otherwise the model
+        is loaded in fp16. With backend="vllm" generation runs on a vLLM
+        engine, which batches concurrent decisions (quantization may then
+        be "awq" for AWQ checkpoints).
+        
+        The transformers backend uses FlashAttention-2 when flash-attn is
+        installed (default attention otherwise) and, with compile_model,
+        compiles the forward pass with torch.compile on CUDA. Compilation
+        is off by default: bitsandbytes-quantized weights and the dynamic
+        KV cache used by generate() make it recompile instead of speeding
+        up.
+        """
         self.model_name = model_name
+        self.quantization = quantization
+        self.backend = backend
         self.logger = logging.getLogger("brain.llm_decision_maker")
         self.tools: List[ToolDescription] = []
         
+        # System prompt prefix and its token ids, rebuilt when tools change
+        self._tools_version = 0
+        self._prompt_version = -1
+        self._cached_prompt_prefix = ""
+        self._cached_prefix_ids: Optional[torch.Tensor] = None
+        
+        # Schema-constrained JSON generator (outlines), rebuilt when tools change
+        self._json_generator = None
+        self._json_generator_version = -1
+        
+        self.engine = None
+        self.tokenizer = None
+        self.model = None
+        
+        if backend == "vllm":
+            self.logger.info(f"Starting vLLM engine for {model_name}...")
+            self.engine = self._create_vllm_engine()
+            self.logger.info("vLLM engine started")
+            return
+        
         # Load model and tokenizer
         self.logger.info(f"Loading model {model_name}...")
         self.tokenizer = AutoTokenizer.from_pretrained(
@@ -34,22 +130,115 @@ class LLMDecisionMaker:
         )
         self.model = AutoModelForCausalLM.from_pretrained(
             model_name,
-            torch_dtype=torch.float16,
             device_map="auto",
-            token=os.getenv("HUGGINGFACE_TOKEN")
+            token=os.getenv("HUGGINGFACE_TOKEN"),
+            **self._attention_kwargs(),
+            **self._quantization_kwargs()
         )
+        if compile_model:
+            self._compile_model()
         self.logger.info("Model loaded successfully")
     
+    def _create_vllm_engine(self):
+        """Create a vLLM async engine for the model."""
+        try:
+            from vllm import AsyncEngineArgs, AsyncLLMEngine
+        except ImportError:
+            self.logger.error("Failed to import vllm. Please install it.")
+            raise
+        
+        return AsyncLLMEngine.from_engine_args(AsyncEngineArgs(
+            model=self.model_name,
+            quantization="awq" if self.quantization == "awq" else None,
+            dtype="bfloat16",
+            max_model_len=4096
+        ))
+    
+    def _attention_kwargs(self) -> Dict[str, Any]:
+        """Pick the attention kernel for the model load.
+        
+        Uses the use_flash_attention_2 flag of the pinned transformers
+        release; attn_implementation only exists from 4.36 on.
+        """
+        if not torch.cuda.is_available():
+            return {}
+        
+        try:
+            import flash_attn  # noqa: F401
+        except ImportError:
+            self.logger.info("flash-attn is not installed, using default attention")
+            return {}
+        
+        return {"use_flash_attention_2": True}
+    
+    def _compile_model(self) -> None:
+        """Compile the model's forward pass with torch.compile.
+        
+        Only forward is compiled so generate() and outlines keep working on
+        the original model object. Failures leave the model in eager mode.
+        """
+        if not torch.cuda.is_available() or not hasattr(torch, "compile"):
+            return
+        
+        try:
+            self.model.forward = torch.compile(
+                self.model.forward,
+                mode="reduce-overhead",
+                fullgraph=False
+            )
+        except Exception as e:
+            self.logger.warning(f"torch.compile failed, using eager mode: {e}")
+    
+    def _quantization_kwargs(self) -> Dict[str, Any]:
+        """Build the weight-loading arguments for the configured quantization."""
+        if self.quantization not in ("4bit", "8bit"):
+            return {"torch_dtype": torch.float16}
+        
+        if not torch.cuda.is_available():
+            self.logger.warning("Quantized loading requires CUDA, using fp16 weights")
+            return {"torch_dtype": torch.float16}
+        
+        try:
+            import bitsandbytes  # noqa: F401
+        except ImportError:
+            self.logger.warning("bitsandbytes is not installed, using fp16 weights")
+            return {"torch_dtype": torch.float16}
+        
+        if self.quantization == "8bit":
+            config = BitsAndBytesConfig(load_in_8bit=True)
+        else:
+            config = BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_quant_type="nf4",
+                bnb_4bit_compute_dtype=torch.bfloat16,
+                bnb_4bit_use_double_quant=True
+            )
+        return {"quantization_config": config}
+    
     def add_tool(self, tool: ToolDescription) -> None:
         """Add a tool to the decision maker."""
         self.tools.append(tool)
+        self._tools_version += 1
+    
+    def _get_prompt_prefix(self) -> Tuple[str, torch.Tensor]:
+        """Get the system prompt and its token ids, rebuilding them if needed."""
+        if self._prompt_version != self._tools_version:
+            self._cached_prompt_prefix = self._create_system_prompt()
+            if self.model is not None:
+                self._cached_prefix_ids = self.tokenizer(
+                    self._cached_prompt_prefix,
+                    return_tensors="pt",
+                    padding=False
+                ).input_ids.to(self.model.device)
+            self._prompt_version = self._tools_version
+        return self._cached_prompt_prefix, self._cached_prefix_ids
     
     def _create_system_prompt(self) -> str:
-        """Create the system prompt for the LLM."""
+        """Create the system prompt for the LLM, up to the user turn."""
         tool_descriptions = "\n".join(
             f"Tool: {tool.name}\n"
             f"Description: {tool.description}\n"
-            f"Parameters: {json.dumps(tool.parameters, indent=2)}\n"
+            f"Parameters: {_dumps(tool.parameters)}\n"
             for tool in self.tools
         )
         
@@ -74,41 +263,114 @@ Respond with a JSON object in this format:
 }}
 <</SYS>>
 
-User: {{user_input}} [/INST]"""
+"""
+    
+    async def _generate(self, user_input: str) -> str:
+        """Generate the model's reply to the user input."""
+        prefix, prefix_ids = self._get_prompt_prefix()
+        user_turn = f"User: {user_input} [/INST]"
+        
+        if self.engine is not None:
+            from vllm import SamplingParams
+            
+            final = None
+            async for output in self.engine.generate(
+                prefix + user_turn,
+                SamplingParams(temperature=0, max_tokens=256),
+                request_id=uuid.uuid4().hex
+            ):
+                final = output
+            return final.outputs[0].text.strip() if final else ""
+        
+        # Only the user turn is tokenized per request
+        user_ids = self.tokenizer(
+            user_turn,
+            return_tensors="pt",
+            add_special_tokens=False,
+            padding=False
+        ).input_ids.to(self.model.device)
+        input_ids = torch.cat([prefix_ids, user_ids], dim=1)
+        
+        # Greedy decoding, stopped as soon as the JSON object is complete
+        prompt_length = input_ids.shape[1]
+        outputs = await asyncio.to_thread(
+            self.model.generate,
+            input_ids=input_ids,
+            attention_mask=torch.ones_like(input_ids),
+            max_new_tokens=256,
+            do_sample=False,
+            stopping_criteria=StoppingCriteriaList([
+                JSONObjectStoppingCriteria(self.tokenizer, prompt_length)
+            ]),
+            pad_token_id=self.tokenizer.eos_token_id
+        )
+        
+        return self.tokenizer.decode(
+            outputs[0, prompt_length:],
+            skip_special_tokens=True
+        ).strip()
+    
+    def _get_json_generator(self):
+        """Get an outlines generator constrained to the decision schema.
+        
+        Returns None when outlines is not installed or the vLLM backend is
+        used.
+        """
+        if self.model is None:
+            return None
+        
+        if self._json_generator_version != self._tools_version:
+            try:
+                from outlines import generate, models
+            except ImportError:
+                return None
+            
+            schema = {
+                "type": "object",
+                "properties": {
+                    "tool": {"enum": [tool.name for tool in self.tools]},
+                    "parameters": {"type": "object"},
+                    "reasoning": {"type": "string"}
+                },
+                "required": ["tool", "parameters"]
+            }
+            self._json_generator = generate.json(
+                models.Transformers(self.model, self.tokenizer),
+                json.dumps(schema)
+            )
+            self._json_generator_version = self._tools_version
+        
+        return self._json_generator
+    
+    def _extract_decision(self, response_text: str) -> Dict[str, Any]:
+        """Extract the JSON decision object from generated text."""
+        try:
+            # Find the first { and last }
+            start = response_text.find("{")
+            end = response_text.rfind("}") + 1
+            if start >= 0 and end > start:
+                return json.loads(response_text[start:end])
+            raise ValueError("No JSON object found in response")
+        except json.JSONDecodeError:
+            raise ValueError("Failed to parse JSON from response")
     
     async def decide(self, user_input: str) -> Dict[str, Any]:
         """Make a decision about which tool to use."""
         try:
-            # Create the system prompt
-            prompt = self._create_system_prompt().format(user_input=user_input)
-            
-            # Generate response
-            inputs = self.tokenizer(prompt, return_tensors="pt").to(self.model.device)
-            outputs = self.model.generate(
-                **inputs,
-                max_length=500,
-                temperature=0.7,
-                do_sample=True,
-                top_p=0.9,
-                pad_token_id=self.tokenizer.eos_token_id
-            )
-            
-            # Decode and parse the response
-            response_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            response_text = response_text.split("[/INST]")[-1].strip()
-            
-            # Extract JSON from response
-            try:
-                # Find the first { and last }
-                start = response_text.find("{")
-                end = response_text.rfind("}") + 1
-                if start >= 0 and end > start:
-                    json_str = response_text[start:end]
-                    decision = json.loads(json_str)
-                else:
-                    raise ValueError("No JSON object found in response")
-            except json.JSONDecodeError:
-                raise ValueError("Failed to parse JSON from response")
+            json_generator = self._get_json_generator()
+            if json_generator is not None:
+                # Output is guaranteed to match the decision schema; generation
+                # runs in a worker thread so the event loop stays responsive
+                prefix, _ = self._get_prompt_prefix()
+                decision = await asyncio.to_thread(
+                    json_generator,
+                    f"{prefix}User: {user_input} [/INST]",
+                    max_tokens=256
+                )
+            else:
+                # Generate response
+                response_text = await self._generate(user_input)
+                decision = self._extract_decision(response_text)
             
             # Validate the decision
             if "tool" not in decision or "parameters" not in decision:
@@ -129,6 +391,6 @@ User: {{user_input}} [/INST]"""
         return "\n\n".join(
             f"Tool: {tool.name}\n"
             f"Description: {tool.description}\n"
-            f"Parameters: {json.dumps(tool.parameters, indent=2)}"
+            f"Parameters: {_dumps(tool.parameters)}"
             for tool in self.tools
         ) 
\ No newline at end of file
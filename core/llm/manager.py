@@ -3,9 +3,29 @@ LLM Manager for handling language model interactions.
 """
 
 import os
+import uuid
+import asyncio
 import logging
-from typing import Dict, Any, Optional
-from transformers import pipeline
+import queue
+import threading
+from typing import AsyncIterator, Dict, Any, List, Optional
+import torch
+from transformers import (
+    AutoModelForCausalLM,
+    AutoTokenizer,
+    StoppingCriteria,
+    StoppingCriteriaList,
+    TextIteratorStreamer
+)
+
+class _EventStoppingCriteria(StoppingCriteria):
+    """Stops generation once an event is set, e.g. when the consumer goes away."""
+    
+    def __init__(self, event: threading.Event):
+        self.event = event
+    
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> bool:
+        return self.event.is_set()
 
 class LLMManager:
     """Manages interactions with the language model."""
@@ -15,52 +35,279 @@ class LLMManager:
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.model = None
+        self.tokenizer = None
+        self.engine = None
+        
+        # Token ids of the fixed prompt scaffolding, filled in by initialize
+        self._scaffold_ids: Dict[str, torch.Tensor] = {}
         
     async def initialize(self):
         """Initialize the language model."""
         self.logger.info("Initializing LLM manager...")
         try:
-            self.model = pipeline(
-                "text-generation",
-                model="distilgpt2",
-                device_map="auto"
-            )
-            self.logger.info("LLM initialized with model: distilgpt2")
+            if self.config.get("backend") == "vllm":
+                # vLLM batches concurrent requests with a paged KV cache
+                from vllm import AsyncEngineArgs, AsyncLLMEngine
+                model_name = self.config.get("model_name", "distilgpt2")
+                self.engine = AsyncLLMEngine.from_engine_args(
+                    AsyncEngineArgs(model=model_name)
+                )
+                self.logger.info(f"LLM initialized with vLLM model: {model_name}")
+                return
+            
+            model_name = self.config.get("model_name", "distilgpt2")
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+            self.model = AutoModelForCausalLM.from_pretrained(model_name).to(device).eval()
+            
+            # Batched prompts are left-padded so every row ends at the prompt
+            if self.tokenizer.pad_token is None:
+                self.tokenizer.pad_token = self.tokenizer.eos_token
+            self.tokenizer.padding_side = "left"
+            
+            # Tokenize the prompt scaffolding once
+            self._scaffold_ids = {
+                name: self._tokenize(text)
+                for name, text in (
+                    ("context", "Context:"),
+                    ("question_after_context", "\n\nQuestion:"),
+                    ("question", "Question:"),
+                    ("answer", "\n\nAnswer:")
+                )
+            }
+            self.logger.info(f"LLM initialized with model: {model_name}")
         except Exception as e:
             self.logger.error(f"Failed to initialize LLM: {str(e)}")
             raise
         
     async def generate_response(self, prompt: str, context: Optional[str] = None) -> str:
         """Generate a response from the language model."""
-        if not self.model:
+        if not self.model and not self.engine:
             raise RuntimeError("LLM not initialized")
             
         try:
-            # Prepare the input
-            if context:
-                full_prompt = f"Context: {context}\n\nQuestion: {prompt}\n\nAnswer:"
-            else:
-                full_prompt = f"Question: {prompt}\n\nAnswer:"
-                
             # Generate response
-            outputs = self.model(
-                full_prompt,
-                max_length=512,
-                num_return_sequences=1,
-                temperature=0.7,
-                do_sample=True
-            )
+            if self.engine:
+                from vllm import SamplingParams
+                
+                final = None
+                async for output in self.engine.generate(
+                    self._build_prompt(prompt, context),
+                    SamplingParams(
+                        temperature=0.7,
+                        max_tokens=self.config.get("max_length", 512)
+                    ),
+                    request_id=uuid.uuid4().hex
+                ):
+                    final = output
+                return final.outputs[0].text.strip() if final else ""
+            
+            input_ids = self._build_input_ids(prompt, context)
+            input_len = input_ids.shape[1]
+            
+            with torch.inference_mode():
+                outputs = self.model.generate(
+                    input_ids,
+                    attention_mask=torch.ones_like(input_ids),
+                    max_new_tokens=self.config.get("max_new_tokens", 128),
+                    do_sample=True,
+                    temperature=0.7,
+                    pad_token_id=self.tokenizer.eos_token_id,
+                    use_cache=True
+                )
             
-            # Extract response
-            response = outputs[0]['generated_text']
-            return response.split("Answer:")[-1].strip()
+            # Decode only the generated continuation
+            return self.tokenizer.decode(
+                outputs[0, input_len:],
+                skip_special_tokens=True
+            ).strip()
             
         except Exception as e:
             self.logger.error(f"Error generating response: {str(e)}")
             return f"Error: {str(e)}"
     
+    async def generate_batch(
+        self,
+        prompts: List[str],
+        contexts: Optional[List[Optional[str]]] = None
+    ) -> List[str]:
+        """Generate responses for several prompts with one tokenize and generate call per batch."""
+        if not self.model and not self.engine:
+            raise RuntimeError("LLM not initialized")
+        
+        contexts = contexts or [None] * len(prompts)
+        if self.engine:
+            # vLLM already batches concurrent requests inside the engine
+            return list(await asyncio.gather(*(
+                self.generate_response(prompt, context)
+                for prompt, context in zip(prompts, contexts)
+            )))
+        
+        batch_size = max(1, self.config.get("max_batch_size", 8))
+        texts = [
+            self._build_prompt(prompt, context)
+            for prompt, context in zip(prompts, contexts)
+        ]
+        responses: List[str] = []
+        for start in range(0, len(texts), batch_size):
+            chunk = texts[start:start + batch_size]
+            try:
+                responses.extend(await asyncio.to_thread(self._generate_padded, chunk))
+            except Exception as e:
+                self.logger.error(f"Error generating batch responses: {str(e)}")
+                responses.extend(f"Error: {str(e)}" for _ in chunk)
+        return responses
+    
+    def _generate_padded(self, texts: List[str]) -> List[str]:
+        """Tokenize texts as one left-padded batch and decode each continuation."""
+        inputs = self.tokenizer(
+            texts,
+            return_tensors="pt",
+            padding=True,
+            add_special_tokens=False
+        ).to(self.model.device)
+        input_len = inputs.input_ids.shape[1]
+        
+        with torch.inference_mode():
+            outputs = self.model.generate(
+                inputs.input_ids,
+                attention_mask=inputs.attention_mask,
+                max_new_tokens=self.config.get("max_new_tokens", 128),
+                do_sample=True,
+                temperature=0.7,
+                pad_token_id=self.tokenizer.pad_token_id,
+                use_cache=True
+            )
+        
+        # Every row shares the padded prompt length
+        return [
+            text.strip()
+            for text in self.tokenizer.batch_decode(
+                outputs[:, input_len:],
+                skip_special_tokens=True
+            )
+        ]
+    
+    async def generate_stream(
+        self,
+        prompt: str,
+        context: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Generate a response, yielding text chunks as they are decoded."""
+        if not self.model and not self.engine:
+            raise RuntimeError("LLM not initialized")
+        
+        try:
+            if self.engine:
+                from vllm import SamplingParams
+                
+                # vLLM reports the cumulative text; yield only what is new
+                sent = 0
+                async for output in self.engine.generate(
+                    self._build_prompt(prompt, context),
+                    SamplingParams(
+                        temperature=0.7,
+                        max_tokens=self.config.get("max_length", 512)
+                    ),
+                    request_id=uuid.uuid4().hex
+                ):
+                    text = output.outputs[0].text
+                    if len(text) > sent:
+                        yield text[sent:]
+                        sent = len(text)
+                return
+            
+            input_ids = self._build_input_ids(prompt, context)
+            timeout = self.config.get("stream_timeout", 60.0)
+            streamer = TextIteratorStreamer(
+                self.tokenizer,
+                skip_prompt=True,
+                skip_special_tokens=True,
+                timeout=timeout
+            )
+            stop = threading.Event()
+            errors: List[Exception] = []
+            
+            def generate() -> None:
+                try:
+                    with torch.inference_mode():
+                        self.model.generate(
+                            input_ids,
+                            attention_mask=torch.ones_like(input_ids),
+                            max_new_tokens=self.config.get("max_new_tokens", 128),
+                            do_sample=True,
+                            temperature=0.7,
+                            pad_token_id=self.tokenizer.eos_token_id,
+                            use_cache=True,
+                            streamer=streamer,
+                            stopping_criteria=StoppingCriteriaList([
+                                _EventStoppingCriteria(stop)
+                            ])
+                        )
+                except Exception as e:
+                    errors.append(e)
+                finally:
+                    # Always release the consumer, even if generate() failed
+                    streamer.end()
+            
+            # Generation runs in a background thread feeding the streamer
+            thread = threading.Thread(target=generate, daemon=True)
+            thread.start()
+            
+            try:
+                chunks = iter(streamer)
+                while True:
+                    try:
+                        chunk = await asyncio.to_thread(next, chunks, None)
+                    except queue.Empty:
+                        raise TimeoutError(f"No output from the model for {timeout}s")
+                    if chunk is None:
+                        break
+                    if chunk:
+                        yield chunk
+            finally:
+                # Stop generating if the consumer stopped early or timed out
+                stop.set()
+            
+            await asyncio.to_thread(thread.join)
+            if errors:
+                raise errors[0]
+            
+        except Exception as e:
+            self.logger.error(f"Error streaming response: {str(e)}")
+            yield f"Error: {str(e)}"
+    
+    def _build_prompt(self, prompt: str, context: Optional[str] = None) -> str:
+        """Build the full prompt text."""
+        if context:
+            return f"Context: {context}\n\nQuestion: {prompt}\n\nAnswer:"
+        return f"Question: {prompt}\n\nAnswer:"
+    
+    def _build_input_ids(self, prompt: str, context: Optional[str] = None) -> torch.Tensor:
+        """Build the prompt token ids; only the variable parts are tokenized."""
+        if context:
+            parts = [
+                self._scaffold_ids["context"],
+                self._tokenize(f" {context}"),
+                self._scaffold_ids["question_after_context"]
+            ]
+        else:
+            parts = [self._scaffold_ids["question"]]
+        parts += [self._tokenize(f" {prompt}"), self._scaffold_ids["answer"]]
+        return torch.cat(parts, dim=1)
+    
+    def _tokenize(self, text: str) -> torch.Tensor:
+        """Tokenize text into a (1, n) tensor on the model's device."""
+        return self.tokenizer(
+            text,
+            return_tensors="pt",
+            add_special_tokens=False
+        ).input_ids.to(self.model.device)
+    
     async def shutdown(self):
         """Clean up resources."""
         self.logger.info("Shutting down LLM manager...")
-        if self.model:
-            del self.model 
\ No newline at end of file
+        self.model = None
+        self.tokenizer = None
+        self._scaffold_ids = {}
+        self.engine = None 
\ No newline at end of file
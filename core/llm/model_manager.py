@@ -2,22 +2,134 @@
 Model manager for handling LLM models.
 """
 
+import asyncio
+import copy
+import hashlib
 import logging
-from typing import Dict, Any, Optional, List
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Set, Tuple
 import json
 from pathlib import Path
 import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer
+from transformers import (
+    AutoConfig,
+    AutoModelForCausalLM,
+    AutoTokenizer,
+    BatchEncoding,
+    BitsAndBytesConfig
+)
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Models whose tokenizer is exactly a tiktoken encoding
+_TIKTOKEN_ENCODINGS = {
+    "gpt2": "gpt2",
+    "gpt2-medium": "gpt2",
+    "gpt2-large": "gpt2",
+    "gpt2-xl": "gpt2",
+    "distilgpt2": "gpt2",
+    "openai-community/gpt2": "gpt2",
+    "distilbert/distilgpt2": "gpt2"
+}
+
+class TiktokenTokenizer:
+    """Adapter exposing the HuggingFace tokenizer interface used here over tiktoken."""
+    
+    def __init__(self, encoding_name: str):
+        """
+        Initialize the adapter.
+        
+        Args:
+            encoding_name: Name of the tiktoken encoding
+        """
+        self.encoding = tiktoken.get_encoding(encoding_name)
+        self.eos_token = "<|endoftext|>"
+        self.eos_token_id = self.encoding.eot_token
+        self.pad_token: Optional[str] = None
+        self.padding_side = "right"
+    
+    @property
+    def pad_token_id(self) -> Optional[int]:
+        """Token id used for padding, if a pad token is set."""
+        if self.pad_token is None:
+            return None
+        return self.encoding.encode_single_token(self.pad_token)
+    
+    def encode(self, text: str, **kwargs: Any) -> List[int]:
+        """Encode text into token ids."""
+        return self.encoding.encode(text, allowed_special="all")
+    
+    def decode(self, token_ids: Any, skip_special_tokens: bool = False, **kwargs: Any) -> str:
+        """Decode token ids (list or tensor) into text."""
+        if hasattr(token_ids, "tolist"):
+            token_ids = token_ids.tolist()
+        if skip_special_tokens:
+            token_ids = [t for t in token_ids if t != self.eos_token_id]
+        return self.encoding.decode(token_ids)
+    
+    def __call__(
+        self,
+        text: Any,
+        padding: bool = False,
+        truncation: bool = False,
+        max_length: Optional[int] = None,
+        return_tensors: Optional[str] = None,
+        **kwargs: Any
+    ) -> BatchEncoding:
+        """Tokenize a string or a list of strings."""
+        batched = not isinstance(text, str)
+        ids = self.encoding.encode_batch(
+            list(text) if batched else [text],
+            allowed_special="all"
+        )
+        
+        if truncation and max_length:
+            ids = [seq[:max_length] for seq in ids]
+        masks = [[1] * len(seq) for seq in ids]
+        
+        if padding:
+            if self.pad_token_id is None:
+                raise ValueError("Padding requires a pad token")
+            width = max(map(len, ids), default=0)
+            for seq, mask in zip(ids, masks):
+                fill = width - len(seq)
+                if self.padding_side == "left":
+                    seq[:0] = [self.pad_token_id] * fill
+                    mask[:0] = [0] * fill
+                else:
+                    seq.extend([self.pad_token_id] * fill)
+                    mask.extend([0] * fill)
+        
+        if not batched and return_tensors is None:
+            ids, masks = ids[0], masks[0]
+        
+        return BatchEncoding(
+            {"input_ids": ids, "attention_mask": masks},
+            tensor_type=return_tensors
+        )
 
 class ModelManager:
     """Manages LLM models and their configurations."""
     
-    def __init__(self, model_dir: str = "models"):
+    def __init__(
+        self,
+        model_dir: str = "models",
+        weight_cache_bytes: int = 8 << 30,
+        prefix_cache_size: int = 32
+    ):
         """
         Initialize the model manager.
         
         Args:
             model_dir: Directory to store model files
+            weight_cache_bytes: Host memory budget for unloaded models kept
+                for fast reloading (0 disables the cache)
+            prefix_cache_size: Number of system-prompt KV caches to keep
         """
         self.logger = logging.getLogger(__name__)
         self.model_dir = Path(model_dir)
@@ -26,12 +138,27 @@ class ModelManager:
         self.models = {}
         self.tokenizers = {}
         self.configs = {}
+        
+        # Unloaded models kept in shared host memory, keyed by model ID
+        self.weight_cache_bytes = weight_cache_bytes
+        self._weight_cache: "OrderedDict[str, torch.nn.Module]" = OrderedDict()
+        self._weight_cache_sizes: Dict[str, int] = {}
+        
+        # Names of models whose forward pass is compiled
+        self._compiled: Set[str] = set()
+        
+        # (model name, prompt prefix hash) -> (prefix token ids, past_key_values)
+        self.prefix_cache_size = prefix_cache_size
+        self._prefix_cache: "OrderedDict[Tuple[str, bytes], Tuple[torch.Tensor, Any]]" = OrderedDict()
+        # Generation runs in worker threads; guards _prefix_cache
+        self._prefix_lock = threading.Lock()
     
     def load_model(
         self,
         model_name: str,
         model_id: str,
-        device: str = "cuda" if torch.cuda.is_available() else "cpu"
+        device: str = "cuda" if torch.cuda.is_available() else "cpu",
+        quantization: Optional[str] = None
     ) -> None:
         """
         Load a model and its tokenizer.
@@ -40,37 +167,54 @@ class ModelManager:
             model_name: Name to identify the model
             model_id: HuggingFace model ID
             device: Device to load the model on
+            quantization: "none", "int8" or "nf4"; defaults to the scheme
+                saved in the model's config, or "none"
         """
         try:
             self.logger.info(f"Loading model {model_name} ({model_id})")
             
-            # Load tokenizer
-            tokenizer = AutoTokenizer.from_pretrained(model_id)
-            self.tokenizers[model_name] = tokenizer
+            quantization = self._resolve_quantization(model_name, quantization)
+            tokenizer = self._load_tokenizer(model_id)
+            model = self._load_weights(model_name, model_id, device, quantization)
+            self._maybe_compile(model_name, model, device)
+            self._register_model(model_name, model_id, device, tokenizer, model, quantization)
             
-            # Load model
-            model = AutoModelForCausalLM.from_pretrained(
-                model_id,
-                torch_dtype=torch.float16 if device == "cuda" else torch.float32,
-                device_map="auto" if device == "cuda" else None
-            )
-            self.models[model_name] = model
+            self.logger.info(f"Model {model_name} loaded successfully")
             
-            # Load or create config
-            config_path = self.model_dir / f"{model_name}_config.json"
-            if config_path.exists():
-                with open(config_path, "r") as f:
-                    self.configs[model_name] = json.load(f)
-            else:
-                self.configs[model_name] = {
-                    "model_id": model_id,
-                    "device": device,
-                    "max_length": 2048,
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "top_k": 50
-                }
-                self._save_config(model_name)
+        except Exception as e:
+            self.logger.error(f"Failed to load model {model_name}: {e}")
+            raise
+    
+    async def load_model_async(
+        self,
+        model_name: str,
+        model_id: str,
+        device: str = "cuda" if torch.cuda.is_available() else "cpu",
+        quantization: Optional[str] = None
+    ) -> None:
+        """
+        Load a model and its tokenizer without blocking the event loop.
+        
+        The tokenizer and the weights are downloaded and loaded concurrently
+        in worker threads.
+        
+        Args:
+            model_name: Name to identify the model
+            model_id: HuggingFace model ID
+            device: Device to load the model on
+            quantization: "none", "int8" or "nf4"; defaults to the scheme
+                saved in the model's config, or "none"
+        """
+        try:
+            self.logger.info(f"Loading model {model_name} ({model_id})")
+            
+            quantization = self._resolve_quantization(model_name, quantization)
+            tokenizer, model = await asyncio.gather(
+                asyncio.to_thread(self._load_tokenizer, model_id),
+                asyncio.to_thread(self._load_weights, model_name, model_id, device, quantization)
+            )
+            self._maybe_compile(model_name, model, device)
+            self._register_model(model_name, model_id, device, tokenizer, model, quantization)
             
             self.logger.info(f"Model {model_name} loaded successfully")
             
@@ -78,6 +222,351 @@ class ModelManager:
             self.logger.error(f"Failed to load model {model_name}: {e}")
             raise
     
+    def _load_weights(
+        self,
+        model_name: str,
+        model_id: str,
+        device: str,
+        quantization: str = "none"
+    ) -> AutoModelForCausalLM:
+        """
+        Load model weights from the warm cache, a local snapshot or the hub.
+        
+        Args:
+            model_name: Name to identify the model
+            model_id: HuggingFace model ID
+            device: Device to load the model on
+            quantization: "none", "int8" or "nf4"
+            
+        Returns:
+            The loaded model
+        """
+        placement = (
+            self._multi_gpu_placement(model_name)
+            if self._is_multi_gpu(device) else {}
+        )
+        
+        quantization_config = self._quantization_config(quantization, device)
+        if quantization_config is not None:
+            # bitsandbytes quantizes while loading and places the weights itself
+            return AutoModelForCausalLM.from_pretrained(
+                model_id,
+                quantization_config=quantization_config,
+                low_cpu_mem_usage=True,
+                **(placement or {"device_map": {"": torch.cuda.current_device()}})
+            )
+        
+        # Load model: warm cache first, then local weights, then the hub
+        model = None
+        if model_id in self._weight_cache and not self._is_multi_gpu(device):
+            model = self._weight_cache.pop(model_id).to(device)
+            self._weight_cache_sizes.pop(model_id)
+            self.logger.info(f"Reusing cached weights for {model_id}")
+        
+        checkpoint_files = [] if model is not None else self._find_local_checkpoint(model_id)
+        if checkpoint_files and not self._is_multi_gpu(device):
+            model = self._load_local_checkpoint(model_id, checkpoint_files, device)
+        
+        if model is None:
+            # On GPU keep the checkpoint's dtype instead of materializing FP32
+            # first; many CPU kernels need FP32, so CPU loads stay FP32
+            model = AutoModelForCausalLM.from_pretrained(
+                model_id,
+                torch_dtype=torch.float32 if device == "cpu" else "auto",
+                low_cpu_mem_usage=True,
+                **placement
+            )
+            if not self._is_multi_gpu(device):
+                model = model.to(device)
+        return model
+    
+    def _register_model(
+        self,
+        model_name: str,
+        model_id: str,
+        device: str,
+        tokenizer: Any,
+        model: AutoModelForCausalLM,
+        quantization: str = "none"
+    ) -> None:
+        """
+        Register a loaded model and load or create its config.
+        
+        Args:
+            model_name: Name to identify the model
+            model_id: HuggingFace model ID
+            device: Device the model was loaded on
+            tokenizer: The model's tokenizer
+            model: The loaded model
+            quantization: Quantization scheme to record in the config
+        """
+        self.tokenizers[model_name] = tokenizer
+        self.models[model_name] = model
+        
+        # Load or create config
+        config_path = self.model_dir / f"{model_name}_config.json"
+        if config_path.exists():
+            with open(config_path, "r") as f:
+                self.configs[model_name] = json.load(f)
+        else:
+            self.configs[model_name] = {
+                "model_id": model_id,
+                "device": device,
+                "max_length": 2048,
+                "temperature": 0.7,
+                "top_p": 0.9,
+                "top_k": 50,
+                "device_map": "balanced_low_0",
+                "gpu_memory_reserve": 0.1,
+                "compile": False
+            }
+        
+        # Record the scheme so reloads use the same one
+        self.configs[model_name]["quantization"] = quantization
+        self._save_config(model_name)
+    
+    def _saved_config(self, model_name: str) -> Dict[str, Any]:
+        """
+        Read a model's config file without registering it.
+        
+        Args:
+            model_name: Name to identify the model
+            
+        Returns:
+            The saved config, or an empty dict if there is none
+        """
+        config_path = self.model_dir / f"{model_name}_config.json"
+        if not config_path.exists():
+            return {}
+        with open(config_path, "r") as f:
+            return json.load(f)
+    
+    def _multi_gpu_placement(self, model_name: str) -> Dict[str, Any]:
+        """
+        Build from_pretrained placement arguments for sharding across GPUs.
+        
+        Each GPU's budget is its currently free memory minus a reserve kept
+        for activations and the KV cache. The default "balanced_low_0" map
+        keeps GPU 0, where generation runs, the least loaded.
+        
+        Args:
+            model_name: Name to identify the model
+            
+        Returns:
+            device_map and max_memory keyword arguments
+        """
+        saved = self._saved_config(model_name)
+        reserve = saved.get("gpu_memory_reserve", 0.1)
+        max_memory = {
+            i: int(torch.cuda.mem_get_info(i)[0] * (1 - reserve))
+            for i in range(torch.cuda.device_count())
+        }
+        return {
+            "device_map": saved.get("device_map", "balanced_low_0"),
+            "max_memory": max_memory
+        }
+    
+    def _maybe_compile(self, model_name: str, model: AutoModelForCausalLM, device: str) -> None:
+        """
+        Compile the model's forward pass if its config sets "compile".
+        
+        The KV cache grows by one token per decode step, so the graph is
+        compiled with dynamic shapes; static shapes would recompile on every
+        step. CUDA graphs (mode="reduce-overhead") need static shapes too, so
+        the default mode is used. Compiled artifacts are cached under the
+        model directory so restarts reuse them. Only forward is compiled, so
+        generate() keeps working unchanged.
+        
+        Args:
+            model_name: Name to identify the model
+            model: The loaded model
+            device: Device the model was loaded on
+        """
+        self._compiled.discard(model_name)
+        if not self._saved_config(model_name).get("compile", False):
+            return
+        if device != "cuda" or not torch.cuda.is_available():
+            self.logger.warning("torch.compile is only enabled on CUDA, using eager mode")
+            return
+        
+        try:
+            os.environ.setdefault(
+                "TORCHINDUCTOR_CACHE_DIR",
+                str(self.model_dir / "inductor_cache")
+            )
+            model.forward = torch.compile(
+                model.forward,
+                fullgraph=False,
+                dynamic=True
+            )
+            self._compiled.add(model_name)
+        except Exception as e:
+            self.logger.warning(f"torch.compile failed for {model_name}, using eager mode: {e}")
+    
+    def _resolve_quantization(self, model_name: str, quantization: Optional[str]) -> str:
+        """
+        Pick the quantization scheme for a load.
+        
+        Args:
+            model_name: Name to identify the model
+            quantization: Requested scheme, or None to use the saved one
+            
+        Returns:
+            "none", "int8" or "nf4"
+        """
+        if quantization is None:
+            quantization = self._saved_config(model_name).get("quantization")
+        
+        quantization = quantization or "none"
+        if quantization not in ("none", "int8", "nf4"):
+            raise ValueError(f"Unknown quantization scheme: {quantization}")
+        return quantization
+    
+    def _quantization_config(
+        self,
+        quantization: str,
+        device: str
+    ) -> Optional[BitsAndBytesConfig]:
+        """
+        Build the bitsandbytes config for a quantization scheme.
+        
+        Args:
+            quantization: "none", "int8" or "nf4"
+            device: Device to load the model on
+            
+        Returns:
+            The config, or None to load unquantized weights
+        """
+        if quantization == "none":
+            return None
+        
+        if device != "cuda" or not torch.cuda.is_available():
+            self.logger.warning("Quantized loading requires CUDA, loading unquantized weights")
+            return None
+        
+        try:
+            import bitsandbytes  # noqa: F401
+        except ImportError:
+            self.logger.warning("bitsandbytes is not installed, loading unquantized weights")
+            return None
+        
+        if quantization == "int8":
+            return BitsAndBytesConfig(load_in_8bit=True)
+        return BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_quant_type="nf4",
+            bnb_4bit_compute_dtype=torch.bfloat16
+        )
+    
+    def _load_tokenizer(self, model_id: str) -> Any:
+        """
+        Load the tokenizer for a model, preferring tiktoken when it is exact.
+        
+        Args:
+            model_id: HuggingFace model ID
+            
+        Returns:
+            A TiktokenTokenizer or a HuggingFace tokenizer
+        """
+        encoding_name = _TIKTOKEN_ENCODINGS.get(model_id)
+        if encoding_name is not None and tiktoken is not None:
+            try:
+                return TiktokenTokenizer(encoding_name)
+            except Exception as e:
+                self.logger.warning(f"tiktoken encoding {encoding_name} unavailable: {e}")
+        
+        return AutoTokenizer.from_pretrained(model_id)
+    
+    @staticmethod
+    def _is_multi_gpu(device: str) -> bool:
+        """Whether the model should be sharded across several GPUs."""
+        return device == "cuda" and torch.cuda.device_count() > 1
+    
+    @staticmethod
+    def _find_local_checkpoint(model_id: str) -> List[Path]:
+        """
+        Find the weight files of a local model snapshot.
+        
+        Args:
+            model_id: HuggingFace model ID or local path
+            
+        Returns:
+            Safetensors or PyTorch weight files, empty if model_id is not local
+        """
+        path = Path(model_id)
+        if not path.is_dir():
+            return []
+        return (
+            sorted(path.glob("*.safetensors"))
+            or sorted(path.glob("pytorch_model*.bin"))
+        )
+    
+    def _load_local_checkpoint(
+        self,
+        model_id: str,
+        checkpoint_files: List[Path],
+        device: str
+    ) -> Optional[AutoModelForCausalLM]:
+        """
+        Build a model with parameters on the meta device and assign the
+        checkpoint's tensors to them.
+        
+        Skips random initialization and the FP32 staging copy entirely.
+        Buffers are created normally, so non-persistent ones (e.g. rotary
+        inv_freq), which checkpoints never contain, keep their computed
+        values.
+        
+        Args:
+            model_id: Local model path
+            checkpoint_files: Weight files found in the snapshot
+            device: Device to load the model on
+            
+        Returns:
+            The loaded model, or None if the checkpoint does not cover every
+            parameter (callers then use from_pretrained)
+        """
+        try:
+            from accelerate import init_empty_weights
+            
+            config = AutoConfig.from_pretrained(model_id)
+            with init_empty_weights(include_buffers=False):
+                model = AutoModelForCausalLM.from_config(config)
+            
+            # safetensors files are read in full; .bin files are memory-mapped
+            # and paged in as their tensors are assigned
+            state_dict = {}
+            for checkpoint in checkpoint_files:
+                if checkpoint.suffix == ".safetensors":
+                    from safetensors.torch import load_file
+                    state_dict.update(load_file(str(checkpoint)))
+                else:
+                    state_dict.update(torch.load(
+                        checkpoint,
+                        map_location="cpu",
+                        mmap=True,
+                        weights_only=True
+                    ))
+            
+            model.load_state_dict(state_dict, strict=False, assign=True)
+            model.tie_weights()
+            
+            # Parameters missing from the checkpoint are still on meta
+            if any(t.is_meta for t in model.parameters()):
+                self.logger.info(
+                    f"Checkpoint in {model_id} does not cover all parameters, "
+                    "using from_pretrained"
+                )
+                return None
+            
+            # Many CPU kernels need FP32; GPU loads keep the checkpoint's dtype
+            if device == "cpu":
+                model = model.float()
+            return model.to(device).eval()
+            
+        except Exception as e:
+            self.logger.warning(f"Fast checkpoint load failed for {model_id}: {e}")
+            return None
+    
     def unload_model(self, model_name: str) -> None:
         """
         Unload a model and its tokenizer.
@@ -86,8 +575,17 @@ class ModelManager:
             model_name: Name of the model to unload
         """
         try:
+            with self._prefix_lock:
+                self._prefix_cache = OrderedDict(
+                    (key, value) for key, value in self._prefix_cache.items()
+                    if key[0] != model_name
+                )
+            self._compiled.discard(model_name)
             if model_name in self.models:
-                del self.models[model_name]
+                model = self.models.pop(model_name)
+                model_id = self.configs.get(model_name, {}).get("model_id")
+                if model_id is not None:
+                    self._cache_weights(model_id, model)
             if model_name in self.tokenizers:
                 del self.tokenizers[model_name]
             if model_name in self.configs:
@@ -99,6 +597,179 @@ class ModelManager:
             self.logger.error(f"Failed to unload model {model_name}: {e}")
             raise
     
+    def _cache_weights(self, model_id: str, model: torch.nn.Module) -> None:
+        """
+        Keep an unloaded model in shared host memory for fast reloading.
+        
+        The least recently unloaded models are evicted once the cache exceeds
+        weight_cache_bytes. Models sharded across devices or
+        quantized with bitsandbytes are not cached.
+        
+        Args:
+            model_id: Model ID the weights were loaded from
+            model: The model being unloaded
+        """
+        if self.weight_cache_bytes <= 0:
+            return
+        if getattr(model, "is_loaded_in_8bit", False) or getattr(model, "is_loaded_in_4bit", False):
+            # bitsandbytes weights cannot be moved off the GPU
+            return
+        if len(set((getattr(model, "hf_device_map", None) or {}).values())) > 1:
+            return
+        
+        size = sum(
+            t.numel() * t.element_size()
+            for t in (*model.parameters(), *model.buffers())
+        )
+        if size > self.weight_cache_bytes:
+            return
+        
+        # Shared memory lets torch.multiprocessing workers map the same pages
+        self._weight_cache[model_id] = model.to("cpu").share_memory()
+        self._weight_cache_sizes[model_id] = size
+        self._weight_cache.move_to_end(model_id)
+        
+        while sum(self._weight_cache_sizes.values()) > self.weight_cache_bytes:
+            evicted, _ = self._weight_cache.popitem(last=False)
+            self._weight_cache_sizes.pop(evicted)
+            self.logger.info(f"Evicted cached weights for {evicted}")
+    
+    def clear_weight_cache(self) -> None:
+        """Drop all cached weights of unloaded models."""
+        self._weight_cache.clear()
+        self._weight_cache_sizes.clear()
+    
+    async def generate_response(
+        self,
+        input_text: str,
+        context: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        model_name: Optional[str] = None
+    ) -> str:
+        """
+        Generate a response with a loaded model.
+        
+        The KV cache of the system prompt is kept keyed by a hash of its text,
+        so requests sharing a system prompt only prefill their own tokens.
+        
+        Args:
+            input_text: The user input
+            context: Optional context to include in the prompt
+            system_prompt: Optional rendered system prompt
+            model_name: Model to use; defaults to the first loaded model
+            
+        Returns:
+            Generated response text
+        """
+        try:
+            if model_name is None:
+                if not self.models:
+                    raise ValueError("No model loaded")
+                model_name = next(iter(self.models))
+            if model_name not in self.models:
+                raise ValueError(f"Model {model_name} not loaded")
+            
+            return await asyncio.to_thread(
+                self._generate,
+                model_name,
+                f"{system_prompt}\n\n" if system_prompt else "",
+                (f"Context:\n{context}\n\n" if context else "")
+                + f"User: {input_text}\nAssistant:"
+            )
+            
+        except Exception as e:
+            self.logger.error(f"Failed to generate response with model {model_name}: {e}")
+            raise
+    
+    def _generate(self, model_name: str, prefix: str, suffix: str) -> str:
+        """
+        Generate a completion of prefix + suffix, reusing the prefix KV cache.
+        
+        Args:
+            model_name: Name of the model to use
+            prefix: Shared prompt prefix (system prompt)
+            suffix: Per-request part of the prompt
+            
+        Returns:
+            Decoded completion
+        """
+        model = self.models[model_name]
+        tokenizer = self.tokenizers[model_name]
+        config = self.configs[model_name]
+        device = model.device
+        
+        with torch.inference_mode():
+            # Special tokens (BOS) belong at the start of the prefix only
+            suffix_ids = tokenizer(
+                suffix,
+                return_tensors="pt",
+                add_special_tokens=not prefix
+            ).input_ids.to(device)
+            
+            past_key_values = None
+            if prefix:
+                prefix_ids, prefix_cache = self._get_prefix_cache(model_name, prefix)
+                input_ids = torch.cat([prefix_ids, suffix_ids], dim=1)
+                attention_mask = torch.ones_like(input_ids)
+                # generate() extends the cache, so each call gets its own copy
+                past_key_values = copy.deepcopy(prefix_cache)
+            else:
+                input_ids = suffix_ids
+                attention_mask = torch.ones_like(input_ids)
+            
+            outputs = model.generate(
+                input_ids,
+                attention_mask=attention_mask,
+                past_key_values=past_key_values,
+                max_new_tokens=config.get("max_new_tokens", 512),
+                do_sample=True,
+                temperature=config.get("temperature", 0.7),
+                top_p=config.get("top_p", 0.9),
+                top_k=config.get("top_k", 50),
+                pad_token_id=tokenizer.eos_token_id,
+                use_cache=True
+            )
+        
+        return tokenizer.decode(
+            outputs[0, input_ids.shape[1]:],
+            skip_special_tokens=True
+        ).strip()
+    
+    def _get_prefix_cache(self, model_name: str, prefix: str) -> Tuple[torch.Tensor, Any]:
+        """
+        Get the token ids and KV cache of a prompt prefix, prefilling on a miss.
+        
+        Args:
+            model_name: Name of the model to use
+            prefix: Prompt prefix text
+            
+        Returns:
+            Tuple of (prefix token ids, past_key_values)
+        """
+        key = (model_name, hashlib.blake2b(prefix.encode(), digest_size=16).digest())
+        with self._prefix_lock:
+            cached = self._prefix_cache.get(key)
+            if cached is not None:
+                self._prefix_cache.move_to_end(key)
+                return cached
+        
+        # Prefill outside the lock; a concurrent miss on the same prefix
+        # just computes it twice
+        model = self.models[model_name]
+        prefix_ids = self.tokenizers[model_name](
+            prefix,
+            return_tensors="pt"
+        ).input_ids.to(model.device)
+        past_key_values = model(prefix_ids, use_cache=True).past_key_values
+        
+        cached = (prefix_ids, past_key_values)
+        if self.prefix_cache_size > 0:
+            with self._prefix_lock:
+                self._prefix_cache[key] = cached
+                if len(self._prefix_cache) > self.prefix_cache_size:
+                    self._prefix_cache.popitem(last=False)
+        return cached
+    
     def get_model(self, model_name: str) -> Optional[AutoModelForCausalLM]:
         """
         Get a loaded model.
@@ -151,7 +822,14 @@ class ModelManager:
             if model_name not in self.configs:
                 raise ValueError(f"Model {model_name} not loaded")
             
-            self.configs[model_name].update(config_updates)
+            config = self.configs[model_name]
+            if all(
+                key in config and config[key] == value
+                for key, value in config_updates.items()
+            ):
+                return
+            
+            config.update(config_updates)
             self._save_config(model_name)
             
             self.logger.info(f"Updated config for model {model_name}")
@@ -169,8 +847,16 @@ class ModelManager:
         """
         try:
             config_path = self.model_dir / f"{model_name}_config.json"
-            with open(config_path, "w") as f:
-                json.dump(self.configs[model_name], f, indent=2)
+            data = json.dumps(self.configs[model_name], indent=2).encode()
+            
+            # Skip the write when the file already holds these bytes
+            try:
+                if config_path.stat().st_size == len(data) and config_path.read_bytes() == data:
+                    return
+            except FileNotFoundError:
+                pass
+            
+            config_path.write_bytes(data)
             
         except Exception as e:
             self.logger.error(f"Failed to save config for model {model_name}: {e}")
@@ -3,41 +3,63 @@ Prompt templates for LLM interactions.
 """
 
 import logging
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, Optional, Tuple
 import json
+import re
 from pathlib import Path
 import jinja2
 
+# First Jinja2 construct in a template source: expression, statement or comment
+_JINJA_TAG_RE = re.compile(r'\{[{%#]')
+
 class PromptTemplates:
     """Manages prompt templates for LLM interactions."""
     
-    def __init__(self, templates_dir: str = "config/prompts"):
+    def __init__(
+        self,
+        templates_dir: str = "config/prompts",
+        render_cache_size: int = 1024
+    ):
         """
         Initialize prompt templates.
         
         Args:
             templates_dir: Directory containing prompt templates
+            render_cache_size: Number of rendered prompts to memoize
         """
         self.logger = logging.getLogger(__name__)
         self.templates_dir = Path(templates_dir)
         self.templates_dir.mkdir(parents=True, exist_ok=True)
         
-        # Initialize Jinja2 environment
+        # Initialize Jinja2 environment; prompts are plain text, not HTML
         self.env = jinja2.Environment(
             loader=jinja2.FileSystemLoader(str(self.templates_dir)),
-            autoescape=True
+            autoescape=jinja2.select_autoescape(
+                enabled_extensions=(),
+                default_for_string=False
+            )
         )
         
-        # Load templates
+        # Load templates and their source text
         self.templates = {}
+        self._sources: Dict[str, str] = {}
+        self._split_cache: Dict[str, Tuple[str, jinja2.Template]] = {}
+        
+        # (template name, sorted kwargs) -> rendered prompt
+        self.render_cache_size = render_cache_size
+        self._render_cache: "OrderedDict[Tuple[str, Hashable], str]" = OrderedDict()
         self._load_templates()
     
     def _load_templates(self) -> None:
         """Load all prompt templates from the templates directory."""
         try:
+            self._split_cache.clear()
+            self._render_cache.clear()
             for template_file in self.templates_dir.glob("*.j2"):
                 template_name = template_file.stem
                 self.templates[template_name] = self.env.get_template(template_file.name)
+                self._sources[template_name] = template_file.read_text(encoding="utf-8")
             
             self.logger.info(f"Loaded {len(self.templates)} prompt templates")
             
@@ -73,16 +95,85 @@ class PromptTemplates:
             Rendered prompt text
         """
         try:
+            # Identical variables render identically; hashable ones are memoized
+            key = (template_name, tuple(sorted(kwargs.items())))
+            try:
+                cached = self._render_cache.get(key)
+            except TypeError:
+                key = None
+                cached = None
+            if cached is not None:
+                self._render_cache.move_to_end(key)
+                return cached
+            
             template = self.get_template(template_name)
             if not template:
                 raise ValueError(f"Template not found: {template_name}")
             
-            return template.render(**kwargs)
+            rendered = template.render(**kwargs)
+            
+            if key is not None and self.render_cache_size > 0:
+                self._render_cache[key] = rendered
+                if len(self._render_cache) > self.render_cache_size:
+                    self._render_cache.popitem(last=False)
+            
+            return rendered
             
         except Exception as e:
             self.logger.error(f"Failed to render template {template_name}: {e}")
             raise
     
+    def get_prompt(self, template_name: str, **kwargs: Any) -> str:
+        """
+        Render a prompt template; alias of render_template used by the agents.
+        
+        Args:
+            template_name: Name of the template to render
+            **kwargs: Variables to pass to the template
+            
+        Returns:
+            Rendered prompt text
+        """
+        return self.render_template(template_name, **kwargs)
+    
+    def split_template(self, template_name: str) -> Tuple[str, jinja2.Template]:
+        """
+        Split a template into its static prefix and a template for the rest.
+        
+        The prefix is the literal text before the first Jinja2 construct, so
+        callers can keep it as a plain string and only render the variable
+        tail per call: ``prefix + body.render(**kwargs)``.
+        
+        Args:
+            template_name: Name of the template to split
+            
+        Returns:
+            Tuple of (static prefix, body template)
+        """
+        try:
+            if template_name in self._split_cache:
+                return self._split_cache[template_name]
+            
+            if template_name not in self.templates:
+                raise ValueError(f"Template not found: {template_name}")
+            
+            source = self._sources[template_name]
+            match = _JINJA_TAG_RE.search(source)
+            split_at = match.start() if match else len(source)
+            prefix, rest = source[:split_at], source[split_at:]
+            
+            # "{{-" / "{%-" strip the whitespace before the tag
+            if rest[2:3] == '-':
+                prefix = prefix.rstrip()
+            
+            parts = (prefix, self.env.from_string(rest))
+            self._split_cache[template_name] = parts
+            return parts
+            
+        except Exception as e:
+            self.logger.error(f"Failed to split template {template_name}: {e}")
+            raise
+    
     def create_template(
         self,
         template_name: str,
@@ -101,8 +192,10 @@ class PromptTemplates:
             with open(template_path, "w") as f:
                 f.write(template_content)
             
-            # Reload templates
-            self._load_templates()
+            # Load the new template, replacing any cached renders of an old one
+            self._evict_template(template_name)
+            self.templates[template_name] = self.env.get_template(template_path.name)
+            self._sources[template_name] = template_content
             
             self.logger.info(f"Created new template: {template_name}")
             
@@ -123,9 +216,11 @@ class PromptTemplates:
             if template_path.exists():
                 template_path.unlink()
                 
-                # Remove from loaded templates
+                # Remove from loaded templates and caches
                 if template_name in self.templates:
                     del self.templates[template_name]
+                self._sources.pop(template_name, None)
+                self._evict_template(template_name)
                 
                 self.logger.info(f"Deleted template: {template_name}")
             else:
@@ -135,19 +230,22 @@ class PromptTemplates:
             self.logger.error(f"Failed to delete template {template_name}: {e}")
             raise
     
+    def _evict_template(self, template_name: str) -> None:
+        """
+        Drop cached splits and renders of a template.
+        
+        Args:
+            template_name: Name of the template to evict
+        """
+        self._split_cache.pop(template_name, None)
+        for key in [key for key in self._render_cache if key[0] == template_name]:
+            del self._render_cache[key]
+    
     def list_templates(self) -> Dict[str, str]:
         """
         List all available prompt templates.
         
         Returns:
-            Dictionary mapping template names to their content
+            Dictionary mapping template names to their source text
         """
-        try:
-            templates = {}
-            for template_name, template in self.templates.items():
-                templates[template_name] = template.render()
-            return templates
-            
-        except Exception as e:
-            self.logger.error(f"Failed to list templates: {e}")
-            raise 
\ No newline at end of file
+        return dict(self._sources)
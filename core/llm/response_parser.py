@@ -3,12 +3,51 @@ Response parser for handling LLM outputs.
 """
 
 import logging
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Set, Union
 import json
 import re
 from dataclasses import dataclass
 from enum import Enum
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+def _dumps(obj: Any) -> str:
+    """Serialize an object as indented JSON."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                obj,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+            ).decode()
+        except TypeError:
+            # Types orjson rejects, e.g. integers wider than 64 bits
+            pass
+    return json.dumps(obj, indent=2)
+
+# RE2 matches in linear time; the lazy DOTALL block patterns use it if available
+try:
+    import re2 as _block_re
+except ImportError:
+    _block_re = re
+
+# Regular expressions for parsing, compiled once
+_CODE_BLOCK_RE = _block_re.compile(r'(?s)```(?:(\w+)\n)?(.*?)```')
+_JSON_BLOCK_RE = _block_re.compile(r'(?s)```json\n(.*?)```')
+_LIST_ITEM_RE = re.compile(r'^\s*[-*]\s+(.+)$', re.MULTILINE)
+_TABLE_ROW_RE = re.compile(r'^\s*\|(.+)\|\s*$', re.MULTILINE)
+
+_PATTERNS = {
+    'code_block': _CODE_BLOCK_RE,
+    'json_block': _JSON_BLOCK_RE,
+    'list_item': _LIST_ITEM_RE,
+    'table_row': _TABLE_ROW_RE
+}
+
 class ResponseType(Enum):
     """Types of responses that can be parsed."""
     TEXT = "text"
@@ -24,6 +63,109 @@ class ParsedResponse:
     content: Any
     metadata: Dict[str, Any]
 
+# Closing bracket expected for each JSON opening character
+_JSON_BRACKETS = {'{': '}', '[': ']'}
+
+def _sniff(response: str) -> Set[ResponseType]:
+    """
+    Determine which response types the text could possibly be.
+    
+    Uses only C-level character checks, so the parsers (and the exception
+    path of a failed JSON parse) run only for plausible types.
+    
+    Args:
+        response: The response text
+        
+    Returns:
+        Set of candidate response types; TEXT is always included
+    """
+    candidates = {ResponseType.TEXT}
+    
+    stripped = response.strip()
+    if stripped and _JSON_BRACKETS.get(stripped[0]) == stripped[-1]:
+        candidates.add(ResponseType.JSON)
+    if '```' in response:
+        candidates.add(ResponseType.CODE)
+    if '-' in response or '*' in response:
+        candidates.add(ResponseType.LIST)
+    if '|' in response:
+        candidates.add(ResponseType.TABLE)
+    
+    return candidates
+
+def _parse(response: str) -> ParsedResponse:
+    """Parse a response, trying only the types it could be."""
+    candidates = _sniff(response)
+    
+    # Try to parse as JSON first, if it looks like an object or array
+    if ResponseType.JSON in candidates:
+        try:
+            content = _json_loads(response)
+            return ParsedResponse(
+                type=ResponseType.JSON,
+                content=content,
+                metadata={'format': 'json'}
+            )
+        except json.JSONDecodeError:
+            pass
+    
+    # Check for code blocks
+    code_blocks = _CODE_BLOCK_RE.findall(response) if ResponseType.CODE in candidates else []
+    if code_blocks:
+        # If there's only one code block, return it
+        if len(code_blocks) == 1:
+            lang, code = code_blocks[0]
+            return ParsedResponse(
+                type=ResponseType.CODE,
+                content=code.strip(),
+                metadata={'language': lang or 'text'}
+            )
+        # Otherwise, return all code blocks
+        return ParsedResponse(
+            type=ResponseType.CODE,
+            content=[code.strip() for _, code in code_blocks],
+            metadata={'languages': [lang or 'text' for lang, _ in code_blocks]}
+        )
+    
+    # Check for list items
+    list_items = _LIST_ITEM_RE.findall(response) if ResponseType.LIST in candidates else []
+    if list_items:
+        return ParsedResponse(
+            type=ResponseType.LIST,
+            content=list_items,
+            metadata={'format': 'markdown'}
+        )
+    
+    # Check for table: lines of the form "| ... |", cells stripped once
+    table_rows = []
+    for line in response.splitlines() if ResponseType.TABLE in candidates else ():
+        line = line.strip()
+        if len(line) > 2 and line[0] == '|' and line[-1] == '|':
+            cells = [cell.strip() for cell in line[1:-1].split('|')]
+            table_rows.append([cell for cell in cells if cell])
+    
+    if table_rows:
+        # Parse table headers and rows
+        headers = table_rows[0]
+        rows = [
+            dict(zip(headers, cells))
+            for cells in table_rows[1:]
+            if len(cells) == len(headers)
+        ]
+        
+        return ParsedResponse(
+            type=ResponseType.TABLE,
+            content=rows,
+            metadata={'headers': headers}
+        )
+    
+    # Default to plain text
+    return ParsedResponse(
+        type=ResponseType.TEXT,
+        content=response.strip(),
+        metadata={'format': 'text'}
+    )
+
 class ResponseParser:
     """Parses and validates LLM responses."""
     
@@ -32,12 +174,7 @@ class ResponseParser:
         self.logger = logging.getLogger(__name__)
         
         # Regular expressions for parsing
-        self.patterns = {
-            'code_block': re.compile(r'```(?:(\w+)\n)?(.*?)```', re.DOTALL),
-            'json_block': re.compile(r'```json\n(.*?)```', re.DOTALL),
-            'list_item': re.compile(r'^\s*[-*]\s+(.+)$', re.MULTILINE),
-            'table_row': re.compile(r'^\s*\|(.+)\|\s*$', re.MULTILINE)
-        }
+        self.patterns = _PATTERNS
     
     def parse(self, response: str) -> ParsedResponse:
         """
@@ -50,67 +187,7 @@ class ResponseParser:
             ParsedResponse object containing the parsed content
         """
         try:
-            # Try to parse as JSON first
-            try:
-                content = json.loads(response)
-                return ParsedResponse(
-                    type=ResponseType.JSON,
-                    content=content,
-                    metadata={'format': 'json'}
-                )
-            except json.JSONDecodeError:
-                pass
-            
-            # Check for code blocks
-            code_blocks = self.patterns['code_block'].findall(response)
-            if code_blocks:
-                # If there's only one code block, return it
-                if len(code_blocks) == 1:
-                    lang, code = code_blocks[0]
-                    return ParsedResponse(
-                        type=ResponseType.CODE,
-                        content=code.strip(),
-                        metadata={'language': lang or 'text'}
-                    )
-                # Otherwise, return all code blocks
-                return ParsedResponse(
-                    type=ResponseType.CODE,
-                    content=[code.strip() for _, code in code_blocks],
-                    metadata={'languages': [lang or 'text' for lang, _ in code_blocks]}
-                )
-            
-            # Check for list items
-            list_items = self.patterns['list_item'].findall(response)
-            if list_items:
-                return ParsedResponse(
-                    type=ResponseType.LIST,
-                    content=list_items,
-                    metadata={'format': 'markdown'}
-                )
-            
-            # Check for table
-            table_rows = self.patterns['table_row'].findall(response)
-            if table_rows:
-                # Parse table headers and rows
-                headers = [h.strip() for h in table_rows[0].split('|') if h.strip()]
-                rows = []
-                for row in table_rows[1:]:
-                    cells = [cell.strip() for cell in row.split('|') if cell.strip()]
-                    if len(cells) == len(headers):
-                        rows.append(dict(zip(headers, cells)))
-                
-                return ParsedResponse(
-                    type=ResponseType.TABLE,
-                    content=rows,
-                    metadata={'headers': headers}
-                )
-            
-            # Default to plain text
-            return ParsedResponse(
-                type=ResponseType.TEXT,
-                content=response.strip(),
-                metadata={'format': 'text'}
-            )
+            return _parse(response)
             
         except Exception as e:
             self.logger.error(f"Failed to parse response: {e}")
@@ -167,7 +244,7 @@ class ResponseParser:
         """
         try:
             if response.type == ResponseType.JSON:
-                return json.dumps(response.content, indent=2)
+                return _dumps(response.content)
             
             elif response.type == ResponseType.CODE:
                 if isinstance(response.content, list):
@@ -181,24 +258,23 @@ class ResponseParser:
                 return '\n'.join(f"- {item}" for item in response.content)
             
             elif response.type == ResponseType.TABLE:
-                # Format table with headers
+                # Format table with headers, stringifying each cell once
                 headers = response.metadata['headers']
-                rows = [headers] + [[row[h] for h in headers] for row in response.content]
+                rows = [[str(h) for h in headers]]
+                rows += [[str(row[h]) for h in headers] for row in response.content]
                 
-                # Calculate column widths
-                col_widths = [
-                    max(len(str(cell)) for cell in col)
-                    for col in zip(*rows)
-                ]
-                
-                # Format table
-                lines = []
+                # Calculate column widths in a single pass
+                col_widths = [0] * len(headers)
                 for row in rows:
-                    line = '| ' + ' | '.join(
-                        str(cell).ljust(width)
-                        for cell, width in zip(row, col_widths)
-                    ) + ' |'
-                    lines.append(line)
+                    for j, cell in enumerate(row):
+                        if len(cell) > col_widths[j]:
+                            col_widths[j] = len(cell)
+                
+                # Format table with one row template; padding happens in str.format
+                row_template = '| ' + ' | '.join([
+                    f"{{{j}:<{width}}}" for j, width in enumerate(col_widths)
+                ]) + ' |'
+                lines = [row_template.format(*row) for row in rows]
                 
                 return '\n'.join(lines)
             
@@ -4,9 +4,11 @@ Main FastAPI application for Jarvis.
 
 import asyncio
 import logging
-from typing import Optional
+import os
+from typing import List, Optional
 import uvicorn
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from core.brain import JarvisBrain
@@ -27,6 +29,9 @@ brain = None
 class InputRequest(BaseModel):
     text: str
 
+class BatchInputRequest(BaseModel):
+    texts: List[str]
+
 class DocumentRequest(BaseModel):
     path: str
 
@@ -55,6 +60,39 @@ async def process_input(request: InputRequest):
         logger.error(f"Error processing input: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _sse_event(data: str) -> str:
+    """Format a chunk of text as a server-sent event."""
+    return "".join(f"data: {line}\n" for line in data.split("\n")) + "\n"
+
+@app.post("/process/stream")
+async def process_input_stream(request: InputRequest):
+    """Process user input and stream the response as server-sent events."""
+    if not brain:
+        raise HTTPException(status_code=500, detail="Jarvis brain not initialized")
+    
+    async def events():
+        try:
+            async for chunk in brain.generate_stream(request.text):
+                yield _sse_event(chunk)
+        except Exception as e:
+            logger.error(f"Error streaming input: {str(e)}")
+            yield f"event: error\n{_sse_event(str(e))}"
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@app.post("/process/batch")
+async def process_batch(request: BatchInputRequest):
+    """Process several user inputs as one batch in one request."""
+    if not brain:
+        raise HTTPException(status_code=500, detail="Jarvis brain not initialized")
+    
+    try:
+        responses = await brain.process_batch(request.texts)
+        return {"responses": responses}
+    except Exception as e:
+        logger.error(f"Error processing batch input: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/learn")
 async def learn_from_document(request: DocumentRequest):
     """Process and learn from a new document."""
@@ -81,20 +119,33 @@ async def get_memory_summary():
         logger.error(f"Error getting memory summary: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _server_options() -> dict:
+    """Uvicorn options; reload is for development only (JARVIS_DEV=1)."""
+    return {
+        "host": "0.0.0.0",
+        "port": 8000,
+        # "auto" selects uvloop and httptools when they are installed
+        "loop": "auto",
+        "http": "auto",
+        "reload": os.getenv("JARVIS_DEV") == "1",
+        "workers": int(os.getenv("JARVIS_WORKERS", "1"))
+    }
+
 async def start_server():
-    """Start the FastAPI server."""
-    config = uvicorn.Config(
-        "core.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True
-    )
+    """Start the FastAPI server in the running event loop."""
+    options = _server_options()
+    # Reload and multiple workers need uvicorn's supervisor, see main()
+    options.pop("reload")
+    options.pop("workers")
+    config = uvicorn.Config("core.main:app", **options)
     server = uvicorn.Server(config)
     await server.serve()
 
 def main():
     """Main entry point for the Jarvis core system."""
-    asyncio.run(start_server())
+    # uvicorn.run creates the event loop itself, so uvloop is used when
+    # available, and it supervises reload and worker processes
+    uvicorn.run("core.main:app", **_server_options())
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -3,13 +3,166 @@ Long-term memory for persistent storage.
 """
 
 import logging
-from typing import Dict, Any, List, Optional, Union
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Tuple, Union
 import json
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass
 import sqlite3
 import hashlib
+import threading
+import itertools
+import queue
+import re
+import time
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+def _json_dumpb(obj: Any) -> bytes:
+    """Serialize an object as compact JSON bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # Types orjson rejects, e.g. integers wider than 64 bits
+            pass
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+# Per-connection settings: WAL makes commits a single append and lets readers
+# run during writes; NORMAL sync is durable across application crashes in WAL
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA journal_size_limit=6144000"
+)
+
+# Maximum number of queued writes committed together by the writer thread
+_WRITE_BATCH_SIZE = 64
+
+# Rows encoded and inserted per executemany call during bulk_load
+_BULK_LOAD_BATCH_SIZE = 10000
+
+# Schema version stored in PRAGMA user_version
+#   1: created_at/updated_at as INTEGER unix milliseconds
+#   2: content/metadata as BLOB holding UTF-8 JSON bytes
+_SCHEMA_VERSION = 2
+
+_SQL_CREATE_MEMORIES = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id TEXT PRIMARY KEY,
+        content BLOB NOT NULL,
+        metadata BLOB NOT NULL,
+        created_at INTEGER NOT NULL,
+        updated_at INTEGER NOT NULL
+    )
+"""
+
+# Secondary indexes; lookups by memory_id already use the tags primary key,
+# so only the tag column needs its own
+_SQL_CREATE_INDEXES = {
+    'idx_tags_tag': "CREATE INDEX IF NOT EXISTS idx_tags_tag ON tags(tag)",
+    'idx_memories_created_at': (
+        "CREATE INDEX IF NOT EXISTS idx_memories_created_at ON memories(created_at)"
+    ),
+    'idx_memories_updated_at': (
+        "CREATE INDEX IF NOT EXISTS idx_memories_updated_at ON memories(updated_at)"
+    )
+}
+
+# Statements are kept as constants so the connection's statement cache
+# reuses the compiled form instead of re-parsing on every call
+_SQL_INSERT_MEMORY = """
+    INSERT INTO memories (id, content, metadata, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_TAG = """
+    INSERT INTO tags (memory_id, tag)
+    VALUES (?, ?)
+"""
+# Tags are aggregated in the same query, joined with the unit separator
+_TAG_SEPARATOR = "\x1f"
+_SQL_SELECT_ENTRY = """
+    SELECT m.id, m.content, m.metadata, m.created_at, m.updated_at,
+           GROUP_CONCAT(t.tag, char(31)) AS tags
+    FROM memories m
+    LEFT JOIN tags t ON t.memory_id = m.id
+"""
+_SQL_SELECT_MEMORY = _SQL_SELECT_ENTRY + """
+    WHERE m.id = ?
+    GROUP BY m.id
+"""
+_SQL_SELECT_METADATA = """
+    SELECT metadata
+    FROM memories
+    WHERE id = ?
+"""
+# NULL keeps the stored value, so unchanged fields are never re-encoded
+_SQL_UPDATE_MEMORY = """
+    UPDATE memories
+    SET content = COALESCE(?, content),
+        metadata = COALESCE(?, metadata),
+        updated_at = ?
+    WHERE id = ?
+"""
+_SQL_DELETE_TAGS = """
+    DELETE FROM tags
+    WHERE memory_id = ?
+"""
+_SQL_DELETE_MEMORY = """
+    DELETE FROM memories
+    WHERE id = ?
+"""
+_SQL_COUNT_MEMORIES = "SELECT COUNT(*) FROM memories"
+_SQL_COUNT_TAGS = "SELECT COUNT(*) FROM tags"
+_SQL_COUNT_UNIQUE_TAGS = "SELECT COUNT(DISTINCT tag) FROM tags"
+
+# Full-text index over content and metadata, kept in sync by triggers. It
+# references the implicit rowid of memories, which VACUUM may renumber; run
+# a 'rebuild' after vacuuming.
+_SQL_CREATE_FTS = """
+    CREATE VIRTUAL TABLE memories_fts USING fts5(
+        content, metadata,
+        content='memories', content_rowid='rowid'
+    )
+"""
+_SQL_CREATE_FTS_TRIGGERS = {
+    'memories_fts_insert': """
+        CREATE TRIGGER IF NOT EXISTS memories_fts_insert AFTER INSERT ON memories BEGIN
+            INSERT INTO memories_fts (rowid, content, metadata)
+            VALUES (new.rowid, new.content, new.metadata);
+        END
+    """,
+    'memories_fts_delete': """
+        CREATE TRIGGER IF NOT EXISTS memories_fts_delete AFTER DELETE ON memories BEGIN
+            INSERT INTO memories_fts (memories_fts, rowid, content, metadata)
+            VALUES ('delete', old.rowid, old.content, old.metadata);
+        END
+    """,
+    'memories_fts_update': """
+        CREATE TRIGGER IF NOT EXISTS memories_fts_update AFTER UPDATE ON memories BEGIN
+            INSERT INTO memories_fts (memories_fts, rowid, content, metadata)
+            VALUES ('delete', old.rowid, old.content, old.metadata);
+            INSERT INTO memories_fts (rowid, content, metadata)
+            VALUES (new.rowid, new.content, new.metadata);
+        END
+    """
+}
+_SQL_REBUILD_FTS = "INSERT INTO memories_fts (memories_fts) VALUES ('rebuild')"
+_FTS_TOKEN_RE = re.compile(r"\w+")
 
 @dataclass
 class MemoryEntry:
@@ -35,25 +188,176 @@ class LongTermMemory:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
+        # One long-lived connection shared across threads; the lock
+        # serializes access and transactions are managed explicitly
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._fts_enabled = False
+        
         # Initialize database
         self._init_db()
+        
+        # Writes are funneled through one writer thread, which commits
+        # whatever has queued up as a single transaction
+        self._write_queue: "queue.Queue[Optional[Tuple[Callable[..., Any], tuple, Future]]]" = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(
+            target=self._write_loop,
+            name="long-term-memory-writer",
+            daemon=True
+        )
+        self._writer.start()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a connection with the per-connection pragmas applied.
+        
+        Returns:
+            SQLite connection in autocommit mode
+        """
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            isolation_level=None
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Cursor]:
+        """
+        Run statements in a single transaction on the shared connection.
+        
+        Yields:
+            Cursor on the shared connection
+        """
+        with self._lock:
+            cursor = self._conn.cursor()
+            # IMMEDIATE takes the write lock up front so the whole
+            # transaction shares a single commit
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+    
+    def _submit_write(self, op: Callable[..., Any], *args: Any) -> Future:
+        """
+        Queue a write for the writer thread.
+        
+        Args:
+            op: Callable taking a cursor followed by args
+            *args: Arguments for op
+            
+        Returns:
+            Future resolved with the result of op once it is committed
+        """
+        if self._closed:
+            raise RuntimeError("Long-term memory is closed")
+        
+        future: Future = Future()
+        self._write_queue.put((op, args, future))
+        return future
+    
+    def _write_loop(self) -> None:
+        """Commit queued writes in batches until close() is called."""
+        running = True
+        while running:
+            batch = [self._write_queue.get()]
+            
+            # Take whatever else is already waiting, up to the batch size
+            while len(batch) < _WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            if None in batch:
+                running = False
+                batch = [write for write in batch if write is not None]
+            
+            if batch:
+                self._commit_batch(batch)
+    
+    def _commit_batch(self, batch: List[Tuple[Callable[..., Any], tuple, Future]]) -> None:
+        """
+        Run a batch of writes in one transaction.
+        
+        Each write runs in its own savepoint, so a failing write is rolled
+        back and reported on its own future without affecting the others.
+        
+        Args:
+            batch: Queued (op, args, future) writes
+        """
+        outcomes = []
+        try:
+            with self._transaction() as cursor:
+                for op, args, future in batch:
+                    cursor.execute("SAVEPOINT write_op")
+                    try:
+                        result = op(cursor, *args)
+                    except Exception as e:
+                        cursor.execute("ROLLBACK TO write_op")
+                        outcomes.append((future, None, e))
+                    else:
+                        outcomes.append((future, result, None))
+                    cursor.execute("RELEASE write_op")
+            
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        
+        # Resolve only after the commit so results are durable
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+    
+    def close(self) -> None:
+        """Flush pending writes and close the database connection."""
+        try:
+            if not self._closed:
+                self._closed = True
+                self._write_queue.put(None)
+                self._writer.join()
+            
+            with self._lock:
+                self._conn.close()
+            
+        except Exception as e:
+            self.logger.error(f"Failed to close database: {e}")
+            raise
     
     def _init_db(self) -> None:
         """Initialize SQLite database."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self._conn.cursor()
+                
+                # WAL mode is persistent, so it only needs setting once
+                cursor.execute("PRAGMA journal_mode=WAL")
+                
+                cursor.execute("BEGIN IMMEDIATE")
+                
+                # Migrate databases created by older versions
+                cursor.execute("PRAGMA user_version")
+                version = cursor.fetchone()[0]
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memories'"
+                )
+                migrated = False
+                if cursor.fetchone() is not None and version < _SCHEMA_VERSION:
+                    self._migrate_memories(cursor)
+                    migrated = True
                 
                 # Create memories table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS memories (
-                        id TEXT PRIMARY KEY,
-                        content TEXT NOT NULL,
-                        metadata TEXT NOT NULL,
-                        created_at TEXT NOT NULL,
-                        updated_at TEXT NOT NULL
-                    )
-                """)
+                cursor.execute(_SQL_CREATE_MEMORIES.format(table='memories'))
                 
                 # Create tags table
                 cursor.execute("""
@@ -65,12 +369,106 @@ class LongTermMemory:
                     )
                 """)
                 
-                conn.commit()
+                # Create indexes
+                for sql in _SQL_CREATE_INDEXES.values():
+                    cursor.execute(sql)
+                
+                # Create full-text index, populating it from existing rows
+                # the first time or after a migration renumbered them; plain
+                # LIKE search is used without FTS5
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'memories_fts'"
+                )
+                fts_exists = cursor.fetchone() is not None
+                try:
+                    if not fts_exists:
+                        cursor.execute(_SQL_CREATE_FTS)
+                    for sql in _SQL_CREATE_FTS_TRIGGERS.values():
+                        cursor.execute(sql)
+                    if not fts_exists or migrated:
+                        cursor.execute(_SQL_REBUILD_FTS)
+                    self._fts_enabled = True
+                except sqlite3.OperationalError as e:
+                    self.logger.warning(f"Full-text search unavailable: {e}")
+                
+                # Refresh planner statistics so the indexes get picked
+                cursor.execute("ANALYZE")
+                
+                cursor.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+                cursor.execute("COMMIT")
             
         except Exception as e:
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
             self.logger.error(f"Failed to initialize database: {e}")
             raise
     
+    def _migrate_memories(self, cursor: sqlite3.Cursor) -> None:
+        """
+        Rebuild the memories table in the current schema.
+        
+        Timestamps are converted to unix milliseconds and JSON text to
+        BLOB bytes.
+        
+        Args:
+            cursor: Cursor inside the initialization transaction
+        """
+        self.logger.info("Migrating memories table to the current schema")
+        
+        cursor.execute(_SQL_CREATE_MEMORIES.format(table='memories_new'))
+        cursor.execute(
+            "SELECT id, content, metadata, created_at, updated_at FROM memories"
+        )
+        rows = cursor.fetchall()
+        cursor.executemany("""
+            INSERT INTO memories_new (id, content, metadata, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, [
+            (
+                row['id'],
+                self._to_bytes(row['content']),
+                self._to_bytes(row['metadata']),
+                self._to_millis(row['created_at']),
+                self._to_millis(row['updated_at'])
+            )
+            for row in rows
+        ])
+        
+        # Dropping the table also drops its indexes and triggers, which
+        # are recreated afterwards
+        cursor.execute("DROP TABLE memories")
+        cursor.execute("ALTER TABLE memories_new RENAME TO memories")
+    
+    @staticmethod
+    def _to_millis(value: Union[str, int]) -> int:
+        """
+        Convert a stored timestamp to unix milliseconds.
+        
+        Args:
+            value: ISO-format string or unix milliseconds
+            
+        Returns:
+            Unix milliseconds
+        """
+        if isinstance(value, str):
+            return int(datetime.fromisoformat(value).timestamp() * 1000)
+        return int(value)
+    
+    @staticmethod
+    def _to_bytes(value: Union[str, bytes]) -> bytes:
+        """
+        Convert a stored JSON value to BLOB bytes.
+        
+        Args:
+            value: JSON text or bytes
+            
+        Returns:
+            UTF-8 JSON bytes
+        """
+        if isinstance(value, str):
+            return value.encode()
+        return value
+    
     def add(
         self,
         content: Any,
@@ -93,33 +491,17 @@ class LongTermMemory:
             entry_id = self._generate_entry_id(content, metadata)
             
             # Prepare data
-            now = datetime.now().isoformat()
-            metadata = metadata or {}
-            tags = tags or []
+            now = int(time.time() * 1000)
+            row = (
+                entry_id,
+                _json_dumpb(content),
+                _json_dumpb(metadata or {}),
+                now,
+                now
+            )
+            tag_rows = [(entry_id, tag) for tag in tags or []]
             
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Insert memory
-                cursor.execute("""
-                    INSERT INTO memories (id, content, metadata, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    entry_id,
-                    json.dumps(content),
-                    json.dumps(metadata),
-                    now,
-                    now
-                ))
-                
-                # Insert tags
-                for tag in tags:
-                    cursor.execute("""
-                        INSERT INTO tags (memory_id, tag)
-                        VALUES (?, ?)
-                    """, (entry_id, tag))
-                
-                conn.commit()
+            self._submit_write(self._write_entries, [row], tag_rows).result()
             
             return entry_id
             
@@ -127,6 +509,55 @@ class LongTermMemory:
             self.logger.error(f"Failed to add memory entry: {e}")
             raise
     
+    def add_many(
+        self,
+        entries: List[Tuple[Any, Optional[Dict[str, Any]], Optional[List[str]]]]
+    ) -> List[str]:
+        """
+        Add several memory entries in one transaction.
+        
+        Args:
+            entries: (content, metadata, tags) tuples
+            
+        Returns:
+            Entry IDs, in the order given
+        """
+        try:
+            entry_ids, rows, tag_rows = self._encode_entries(entries)
+            
+            if rows:
+                self._submit_write(self._write_entries, rows, tag_rows).result()
+            
+            return entry_ids
+            
+        except Exception as e:
+            self.logger.error(f"Failed to add memory entries: {e}")
+            raise
+    
+    def bulk_load(
+        self,
+        entries: Iterable[Tuple[Any, Optional[Dict[str, Any]], Optional[List[str]]]]
+    ) -> List[str]:
+        """
+        Import a large number of memory entries in one transaction.
+        
+        Secondary indexes and full-text triggers are dropped for the import
+        and rebuilt once at the end, instead of being maintained per row.
+        Entries are encoded and inserted in batches, so any iterable works.
+        
+        Args:
+            entries: (content, metadata, tags) tuples
+            
+        Returns:
+            Entry IDs, in the order given
+        """
+        try:
+            return self._submit_write(self._write_bulk_load, iter(entries)).result()
+            
+        except Exception as e:
+            self.logger.error(f"Failed to bulk load memory entries: {e}")
+            raise
+    
     def get(self, entry_id: str) -> Optional[MemoryEntry]:
         """
         Get a memory entry.
@@ -138,39 +569,17 @@ class LongTermMemory:
             Memory entry if found, None otherwise
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self._conn.cursor()
                 
-                # Get memory
-                cursor.execute("""
-                    SELECT content, metadata, created_at, updated_at
-                    FROM memories
-                    WHERE id = ?
-                """, (entry_id,))
+                # Get memory with its tags
+                cursor.execute(_SQL_SELECT_MEMORY, (entry_id,))
                 
                 row = cursor.fetchone()
                 if not row:
                     return None
                 
-                content, metadata, created_at, updated_at = row
-                
-                # Get tags
-                cursor.execute("""
-                    SELECT tag
-                    FROM tags
-                    WHERE memory_id = ?
-                """, (entry_id,))
-                
-                tags = [row[0] for row in cursor.fetchall()]
-                
-                return MemoryEntry(
-                    id=entry_id,
-                    content=json.loads(content),
-                    metadata=json.loads(metadata),
-                    created_at=datetime.fromisoformat(created_at),
-                    updated_at=datetime.fromisoformat(updated_at),
-                    tags=tags
-                )
+                return self._row_to_entry(row)
             
         except Exception as e:
             self.logger.error(f"Failed to get memory entry: {e}")
@@ -193,58 +602,13 @@ class LongTermMemory:
             tags: Optional new tags
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Get current entry
-                cursor.execute("""
-                    SELECT content, metadata
-                    FROM memories
-                    WHERE id = ?
-                """, (entry_id,))
-                
-                row = cursor.fetchone()
-                if not row:
-                    raise ValueError(f"Memory entry not found: {entry_id}")
-                
-                current_content, current_metadata = row
-                current_content = json.loads(current_content)
-                current_metadata = json.loads(current_metadata)
-                
-                # Update content and metadata
-                if content is not None:
-                    current_content = content
-                if metadata is not None:
-                    current_metadata.update(metadata)
-                
-                # Update memory
-                cursor.execute("""
-                    UPDATE memories
-                    SET content = ?, metadata = ?, updated_at = ?
-                    WHERE id = ?
-                """, (
-                    json.dumps(current_content),
-                    json.dumps(current_metadata),
-                    datetime.now().isoformat(),
-                    entry_id
-                ))
-                
-                # Update tags if provided
-                if tags is not None:
-                    # Remove old tags
-                    cursor.execute("""
-                        DELETE FROM tags
-                        WHERE memory_id = ?
-                    """, (entry_id,))
-                    
-                    # Add new tags
-                    for tag in tags:
-                        cursor.execute("""
-                            INSERT INTO tags (memory_id, tag)
-                            VALUES (?, ?)
-                        """, (entry_id, tag))
-                
-                conn.commit()
+            self._submit_write(
+                self._write_update,
+                entry_id,
+                _json_dumpb(content) if content is not None else None,
+                metadata,
+                tags
+            ).result()
             
         except Exception as e:
             self.logger.error(f"Failed to update memory entry: {e}")
@@ -258,27 +622,141 @@ class LongTermMemory:
             entry_id: Entry ID
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Delete tags first
-                cursor.execute("""
-                    DELETE FROM tags
-                    WHERE memory_id = ?
-                """, (entry_id,))
-                
-                # Delete memory
-                cursor.execute("""
-                    DELETE FROM memories
-                    WHERE id = ?
-                """, (entry_id,))
-                
-                conn.commit()
+            self._submit_write(self._write_delete, entry_id).result()
             
         except Exception as e:
             self.logger.error(f"Failed to delete memory entry: {e}")
             raise
     
+    def _write_entries(
+        self,
+        cursor: sqlite3.Cursor,
+        rows: List[tuple],
+        tag_rows: List[Tuple[str, str]]
+    ) -> None:
+        """
+        Insert memories and their tags; runs on the writer thread.
+        
+        Args:
+            cursor: Cursor inside the batch transaction
+            rows: Encoded memories rows
+            tag_rows: (memory_id, tag) rows
+        """
+        # Insert memories
+        cursor.executemany(_SQL_INSERT_MEMORY, rows)
+        
+        # Insert tags
+        cursor.executemany(_SQL_INSERT_TAG, tag_rows)
+    
+    def _write_bulk_load(
+        self,
+        cursor: sqlite3.Cursor,
+        entries: Iterator[Tuple[Any, Optional[Dict[str, Any]], Optional[List[str]]]]
+    ) -> List[str]:
+        """
+        Insert entries with index maintenance deferred; runs on the writer thread.
+        
+        Args:
+            cursor: Cursor inside the batch transaction
+            entries: (content, metadata, tags) tuples
+            
+        Returns:
+            Entry IDs, in the order given
+        """
+        # Drop secondary indexes and full-text triggers
+        for name in _SQL_CREATE_INDEXES:
+            cursor.execute(f"DROP INDEX IF EXISTS {name}")
+        if self._fts_enabled:
+            for name in _SQL_CREATE_FTS_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        
+        # Insert in batches
+        entry_ids = []
+        while True:
+            batch = list(itertools.islice(entries, _BULK_LOAD_BATCH_SIZE))
+            if not batch:
+                break
+            batch_ids, rows, tag_rows = self._encode_entries(batch)
+            self._write_entries(cursor, rows, tag_rows)
+            entry_ids.extend(batch_ids)
+        
+        # Rebuild indexes once
+        for sql in _SQL_CREATE_INDEXES.values():
+            cursor.execute(sql)
+        if self._fts_enabled:
+            for sql in _SQL_CREATE_FTS_TRIGGERS.values():
+                cursor.execute(sql)
+            cursor.execute(_SQL_REBUILD_FTS)
+        
+        # Refresh planner statistics where the import changed them
+        cursor.execute("PRAGMA optimize")
+        
+        return entry_ids
+    
+    def _write_update(
+        self,
+        cursor: sqlite3.Cursor,
+        entry_id: str,
+        content: Optional[str],
+        metadata: Optional[Dict[str, Any]],
+        tags: Optional[List[str]]
+    ) -> None:
+        """
+        Update a memory and optionally replace its tags; runs on the writer thread.
+        
+        Args:
+            cursor: Cursor inside the batch transaction
+            entry_id: Entry ID
+            content: Encoded new content, or None to keep it
+            metadata: Metadata to merge, or None to keep it
+            tags: New tags, or None to keep them
+        """
+        # Merge metadata; only decoded when the caller changes it
+        new_metadata = None
+        if metadata is not None:
+            cursor.execute(_SQL_SELECT_METADATA, (entry_id,))
+            
+            row = cursor.fetchone()
+            if not row:
+                raise ValueError(f"Memory entry not found: {entry_id}")
+            
+            current_metadata = _json_loads(row[0])
+            current_metadata.update(metadata)
+            new_metadata = _json_dumpb(current_metadata)
+        
+        # Update memory
+        cursor.execute(_SQL_UPDATE_MEMORY, (
+            content,
+            new_metadata,
+            int(time.time() * 1000),
+            entry_id
+        ))
+        
+        if cursor.rowcount == 0:
+            raise ValueError(f"Memory entry not found: {entry_id}")
+        
+        # Update tags if provided
+        if tags is not None:
+            # Remove old tags
+            cursor.execute(_SQL_DELETE_TAGS, (entry_id,))
+            
+            # Add new tags
+            cursor.executemany(_SQL_INSERT_TAG, [(entry_id, tag) for tag in tags])
+    
+    def _write_delete(self, cursor: sqlite3.Cursor, entry_id: str) -> None:
+        """
+        Delete a memory and its tags; runs on the writer thread.
+        
+        Args:
+            cursor: Cursor inside the batch transaction
+            entry_id: Entry ID
+        """
+        # Delete tags first
+        cursor.execute(_SQL_DELETE_TAGS, (entry_id,))
+        
+        # Delete memory
+        cursor.execute(_SQL_DELETE_MEMORY, (entry_id,))
+    
     def search(
         self,
         query: str,
@@ -297,69 +775,56 @@ class LongTermMemory:
             List of matching memory entries
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Build query
-                sql = """
-                    SELECT DISTINCT m.id, m.content, m.metadata, m.created_at, m.updated_at
-                    FROM memories m
-                """
-                
-                params = []
-                
-                # Add tag filter if provided
-                if tags:
-                    sql += """
-                        INNER JOIN tags t ON m.id = t.memory_id
-                        WHERE t.tag IN ({})
-                    """.format(','.join(['?'] * len(tags)))
-                    params.extend(tags)
-                    
-                    # Add content search
-                    sql += " AND (m.content LIKE ? OR m.metadata LIKE ?)"
-                    params.extend([f'%{query}%', f'%{query}%'])
-                else:
-                    # Just content search
-                    sql += " WHERE m.content LIKE ? OR m.metadata LIKE ?"
-                    params.extend([f'%{query}%', f'%{query}%'])
-                
-                # Add limit if provided
-                if limit:
-                    sql += f" LIMIT {limit}"
+            sql, params = self._build_search_query(query, tags, limit)
+            
+            with self._lock:
+                cursor = self._conn.cursor()
                 
-                # Execute query
+                # Execute query and process results
                 cursor.execute(sql, params)
                 
-                # Process results
-                entries = []
-                for row in cursor.fetchall():
-                    entry_id, content, metadata, created_at, updated_at = row
-                    
-                    # Get tags
-                    cursor.execute("""
-                        SELECT tag
-                        FROM tags
-                        WHERE memory_id = ?
-                    """, (entry_id,))
-                    
-                    tags = [row[0] for row in cursor.fetchall()]
-                    
-                    entries.append(MemoryEntry(
-                        id=entry_id,
-                        content=json.loads(content),
-                        metadata=json.loads(metadata),
-                        created_at=datetime.fromisoformat(created_at),
-                        updated_at=datetime.fromisoformat(updated_at),
-                        tags=tags
-                    ))
-                
-                return entries
+                return [self._row_to_entry(row) for row in cursor.fetchall()]
             
         except Exception as e:
             self.logger.error(f"Failed to search memory entries: {e}")
             raise
     
+    def iter_search(
+        self,
+        query: str,
+        tags: Optional[List[str]] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[MemoryEntry]:
+        """
+        Search memory entries, yielding them as the cursor produces them.
+        
+        The scan runs on its own connection, so a partially consumed
+        iterator never holds the shared lock; under WAL it reads a stable
+        snapshot while writes continue.
+        
+        Args:
+            query: Search query
+            tags: Optional list of tags to filter by
+            limit: Optional maximum number of results
+            
+        Yields:
+            Matching memory entries
+        """
+        conn = None
+        try:
+            sql, params = self._build_search_query(query, tags, limit)
+            
+            conn = self._connect()
+            for row in conn.execute(sql, params):
+                yield self._row_to_entry(row)
+            
+        except Exception as e:
+            self.logger.error(f"Failed to search memory entries: {e}")
+            raise
+        finally:
+            if conn is not None:
+                conn.close()
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         Get statistics about the memory.
@@ -368,19 +833,19 @@ class LongTermMemory:
             Dictionary containing memory statistics
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self._conn.cursor()
                 
                 # Get total entries
-                cursor.execute("SELECT COUNT(*) FROM memories")
+                cursor.execute(_SQL_COUNT_MEMORIES)
                 total_entries = cursor.fetchone()[0]
                 
                 # Get total tags
-                cursor.execute("SELECT COUNT(*) FROM tags")
+                cursor.execute(_SQL_COUNT_TAGS)
                 total_tags = cursor.fetchone()[0]
                 
                 # Get unique tags
-                cursor.execute("SELECT COUNT(DISTINCT tag) FROM tags")
+                cursor.execute(_SQL_COUNT_UNIQUE_TAGS)
                 unique_tags = cursor.fetchone()[0]
                 
                 return {
@@ -394,6 +859,129 @@ class LongTermMemory:
             self.logger.error(f"Failed to get memory stats: {e}")
             raise
     
+    def _build_search_query(
+        self,
+        query: str,
+        tags: Optional[List[str]],
+        limit: Optional[int]
+    ) -> Tuple[str, List[Any]]:
+        """
+        Build the SQL and parameters for a search.
+        
+        Args:
+            query: Search query
+            tags: Optional list of tags to filter by
+            limit: Optional maximum number of results
+            
+        Returns:
+            SQL statement and its parameters
+        """
+        sql = _SQL_SELECT_ENTRY
+        conditions = []
+        params = []
+        
+        # Add content search
+        if self._fts_enabled:
+            match = self._fts_query(query)
+            if match:
+                conditions.append(
+                    "m.rowid IN (SELECT rowid FROM memories_fts "
+                    "WHERE memories_fts MATCH ?)"
+                )
+                params.append(match)
+        else:
+            conditions.append(
+                "(CAST(m.content AS TEXT) LIKE ? OR CAST(m.metadata AS TEXT) LIKE ?)"
+            )
+            params.extend([f'%{query}%', f'%{query}%'])
+        
+        # Add tag filter if provided; kept out of the join so the
+        # aggregated tags still list every tag of the entry
+        if tags:
+            conditions.append(
+                "m.id IN (SELECT memory_id FROM tags WHERE tag IN ({}))"
+                .format(','.join(['?'] * len(tags)))
+            )
+            params.extend(tags)
+        
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " GROUP BY m.id"
+        
+        # Add limit if provided, bound so the statement text stays the same
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        
+        return sql, params
+    
+    def _fts_query(self, query: str) -> str:
+        """
+        Turn free text into an FTS5 match expression.
+        
+        Each word becomes a quoted prefix term and all terms must match, so
+        user input cannot inject FTS5 operators.
+        
+        Args:
+            query: Search query
+            
+        Returns:
+            Match expression, empty if the query has no words
+        """
+        return ' '.join(f'"{token}"*' for token in _FTS_TOKEN_RE.findall(query))
+    
+    def _row_to_entry(self, row: sqlite3.Row) -> MemoryEntry:
+        """
+        Build a memory entry from a row of the entry select.
+        
+        Args:
+            row: Row with id, content, metadata, timestamps and joined tags
+            
+        Returns:
+            Memory entry
+        """
+        tags = row['tags']
+        
+        return MemoryEntry(
+            id=row['id'],
+            content=_json_loads(row['content']),
+            metadata=_json_loads(row['metadata']),
+            created_at=datetime.fromtimestamp(row['created_at'] / 1000),
+            updated_at=datetime.fromtimestamp(row['updated_at'] / 1000),
+            tags=tags.split(_TAG_SEPARATOR) if tags is not None else []
+        )
+    
+    def _encode_entries(
+        self,
+        entries: Iterable[Tuple[Any, Optional[Dict[str, Any]], Optional[List[str]]]]
+    ) -> Tuple[List[str], List[tuple], List[Tuple[str, str]]]:
+        """
+        Generate IDs and encode rows for new entries.
+        
+        Args:
+            entries: (content, metadata, tags) tuples
+            
+        Returns:
+            Entry IDs, memories rows and (memory_id, tag) rows
+        """
+        now = int(time.time() * 1000)
+        entry_ids = []
+        rows = []
+        tag_rows = []
+        for content, metadata, tags in entries:
+            entry_id = self._generate_entry_id(content, metadata)
+            entry_ids.append(entry_id)
+            rows.append((
+                entry_id,
+                _json_dumpb(content),
+                _json_dumpb(metadata or {}),
+                now,
+                now
+            ))
+            tag_rows.extend((entry_id, tag) for tag in tags or [])
+        
+        return entry_ids, rows, tag_rows
+    
     def _generate_entry_id(
         self,
         content: Any,
@@ -411,12 +999,15 @@ class LongTermMemory:
         """
         try:
             # Create hash input
-            hash_input = json.dumps(content)
+            hash_input = _json_dumpb(content)
             if metadata:
-                hash_input += json.dumps(metadata)
+                hash_input += _json_dumpb(metadata)
             
             # Generate hash
-            hash_value = hashlib.md5(hash_input.encode()).hexdigest()
+            if xxhash is not None:
+                hash_value = xxhash.xxh3_64_hexdigest(hash_input)
+            else:
+                hash_value = hashlib.blake2b(hash_input, digest_size=8).hexdigest()
             
             # Add timestamp
             timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
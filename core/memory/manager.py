@@ -2,10 +2,14 @@
 Memory Manager for handling conversation history and long-term memory.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, List
+import os
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+from core.memory.long_term import LongTermMemory
+
 class MemoryManager:
     """Manages conversation history and long-term memory."""
     
@@ -15,17 +19,76 @@ class MemoryManager:
         self.logger = logging.getLogger(__name__)
         self.conversation_history = []
         
+        # Interactions waiting to be written to long-term memory in one batch
+        self.long_term: Optional[LongTermMemory] = None
+        self._pending: List[Dict[str, Any]] = []
+        self._flush_size = config.get("flush_size", 32)
+        self._flush_interval = config.get("flush_interval", 5.0)
+        self._flush_task: Optional[asyncio.Task] = None
+        
     async def initialize(self):
         """Initialize the memory system."""
         self.logger.info("Initializing memory manager...")
         
+        # Persist interactions only when SQLite storage is configured
+        if self.config.get("storage_type") == "sqlite":
+            long_term_config = self.config.get("long_term", {})
+            db_path = long_term_config.get("db_path") or os.path.join(
+                long_term_config.get("storage_path", "data"),
+                "memory.db"
+            )
+            self.long_term = await asyncio.to_thread(LongTermMemory, db_path)
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+        
     async def add_interaction(self, text: str, role: str = "user"):
         """Add a new interaction to the conversation history."""
-        self.conversation_history.append({
+        interaction = {
             "text": text,
             "role": role,
             "timestamp": datetime.now().isoformat()
-        })
+        }
+        self.conversation_history.append(interaction)
+        
+        if self.long_term is not None:
+            self._pending.append(interaction)
+            if len(self._pending) >= self._flush_size:
+                try:
+                    await self.flush()
+                except Exception:
+                    # Already logged; the batch is retried on the next flush
+                    pass
+    
+    async def flush(self):
+        """Write pending interactions to long-term memory in one transaction."""
+        if self.long_term is None or not self._pending:
+            return
+        
+        pending, self._pending = self._pending, []
+        entries = [
+            (
+                interaction["text"],
+                {"role": interaction["role"], "timestamp": interaction["timestamp"]},
+                [interaction["role"]]
+            )
+            for interaction in pending
+        ]
+        try:
+            await asyncio.to_thread(self.long_term.add_many, entries)
+        except Exception as e:
+            # Put the batch back in front of anything queued meanwhile
+            self._pending[:0] = pending
+            self.logger.error(f"Failed to flush interactions: {e}")
+            raise
+    
+    async def _flush_periodically(self):
+        """Flush pending interactions every flush_interval seconds."""
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                # Already logged; keep flushing on later ticks
+                pass
         
     def get_summary(self) -> Dict[str, Any]:
         """Get a summary of the current memory state."""
@@ -36,4 +99,15 @@ class MemoryManager:
     
     async def shutdown(self):
         """Clean up resources."""
-        self.logger.info("Shutting down memory manager...") 
\ No newline at end of file
+        self.logger.info("Shutting down memory manager...")
+        
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        
+        if self.long_term is not None:
+            try:
+                await self.flush()
+            finally:
+                await asyncio.to_thread(self.long_term.close)
+                self.long_term = None
@@ -3,11 +3,16 @@ Short-term memory for conversation context.
 """
 
 import logging
-from typing import Dict, Any, List, Optional, Union
+import heapq
+import re
+import secrets
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple, Union
 import json
 from pathlib import Path
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 @dataclass
 class MemoryItem:
@@ -17,6 +22,10 @@ class MemoryItem:
     metadata: Dict[str, Any]
     timestamp: datetime
     expires_at: Optional[datetime] = None
+    # Expiry on the monotonic clock, used for all expiry comparisons
+    _expires_mono: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+    # Lowercased searchable text, computed once when the item is added
+    _search_blob: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
 class ShortTermMemory:
     """Manages short-term memory for conversation context."""
@@ -37,8 +46,12 @@ class ShortTermMemory:
         self.max_items = max_items
         self.default_ttl = default_ttl
         
-        # Initialize memory store
-        self.items: List[MemoryItem] = []
+        # Initialize memory store, keyed by ID in insertion order
+        self.items: "OrderedDict[str, MemoryItem]" = OrderedDict()
+        
+        # Min-heap of (monotonic expiry, item_id); entries for items that
+        # were already removed are skipped when popped
+        self._exp_heap: List[Tuple[float, str]] = []
     
     def add(
         self,
@@ -62,27 +75,44 @@ class ShortTermMemory:
             item_id = self._generate_item_id()
             
             # Set expiration time
+            now = datetime.now()
+            if ttl is None:
+                ttl = self.default_ttl
             expires_at = None
             if ttl is not None:
-                expires_at = datetime.now() + timedelta(seconds=ttl)
-            elif self.default_ttl is not None:
-                expires_at = datetime.now() + timedelta(seconds=self.default_ttl)
+                expires_at = now + timedelta(seconds=ttl)
             
             # Create memory item
             item = MemoryItem(
                 id=item_id,
                 content=content,
                 metadata=metadata or {},
-                timestamp=datetime.now(),
+                timestamp=now,
                 expires_at=expires_at
             )
+            if ttl is not None:
+                item._expires_mono = time.monotonic() + ttl
+            item._search_blob = self._build_search_blob(item)
             
             # Add to memory
-            self.items.append(item)
+            self.items[item_id] = item
+            
+            # Track expiration
+            if item._expires_mono is not None:
+                heapq.heappush(self._exp_heap, (item._expires_mono, item_id))
+                
+                # Drop stale heap entries once they outnumber live items
+                if len(self._exp_heap) > 2 * max(len(self.items), self.max_items):
+                    self._exp_heap = [
+                        (item._expires_mono, item.id) for item in self.items.values()
+                        if item._expires_mono is not None
+                    ]
+                    heapq.heapify(self._exp_heap)
             
-            # Enforce maximum items
-            if len(self.items) > self.max_items:
-                self.items.pop(0)
+            # Enforce maximum items; popping the oldest entry is O(1), and
+            # looping also applies a max_items lowered at runtime
+            while len(self.items) > self.max_items:
+                self.items.popitem(last=False)
             
             return item_id
             
@@ -102,14 +132,15 @@ class ShortTermMemory:
         """
         try:
             # Find item
-            for item in self.items:
-                if item.id == item_id:
-                    # Check if expired
-                    if item.expires_at and item.expires_at < datetime.now():
-                        self.items.remove(item)
-                        return None
-                    return item
-            return None
+            item = self.items.get(item_id)
+            if item is None:
+                return None
+            
+            # Check if expired
+            if item._expires_mono is not None and item._expires_mono < time.monotonic():
+                del self.items[item_id]
+                return None
+            return item
             
         except Exception as e:
             self.logger.error(f"Failed to get item from memory: {e}")
@@ -123,7 +154,7 @@ class ShortTermMemory:
             item_id: Item ID
         """
         try:
-            self.items = [item for item in self.items if item.id != item_id]
+            self.items.pop(item_id, None)
             
         except Exception as e:
             self.logger.error(f"Failed to remove item from memory: {e}")
@@ -133,6 +164,7 @@ class ShortTermMemory:
         """Clear all items from memory."""
         try:
             self.items.clear()
+            self._exp_heap.clear()
             
         except Exception as e:
             self.logger.error(f"Failed to clear memory: {e}")
@@ -141,11 +173,12 @@ class ShortTermMemory:
     def cleanup(self) -> None:
         """Remove expired items from memory."""
         try:
-            now = datetime.now()
-            self.items = [
-                item for item in self.items
-                if not item.expires_at or item.expires_at > now
-            ]
+            now = time.monotonic()
+            while self._exp_heap and self._exp_heap[0][0] <= now:
+                _, item_id = heapq.heappop(self._exp_heap)
+                item = self.items.get(item_id)
+                if item is not None and item._expires_mono <= now:
+                    del self.items[item_id]
             
         except Exception as e:
             self.logger.error(f"Failed to cleanup memory: {e}")
@@ -162,7 +195,7 @@ class ShortTermMemory:
             # Cleanup expired items
             self.cleanup()
             
-            return self.items.copy()
+            return list(self.items.values())
             
         except Exception as e:
             self.logger.error(f"Failed to get all items from memory: {e}")
@@ -170,14 +203,14 @@ class ShortTermMemory:
     
     def search(
         self,
-        query: str,
+        query: Union[str, List[str]],
         max_results: Optional[int] = None
     ) -> List[MemoryItem]:
         """
         Search memory items.
         
         Args:
-            query: Search query
+            query: Search query, or a list of terms of which any must match
             max_results: Optional maximum number of results
             
         Returns:
@@ -187,19 +220,21 @@ class ShortTermMemory:
             # Cleanup expired items
             self.cleanup()
             
-            # Simple text search
-            results = []
-            for item in self.items:
-                # Search in content
-                if isinstance(item.content, str) and query.lower() in item.content.lower():
-                    results.append(item)
-                    continue
-                
-                # Search in metadata
-                for value in item.metadata.values():
-                    if isinstance(value, str) and query.lower() in value.lower():
-                        results.append(item)
-                        break
+            # Simple text search over the precomputed content and metadata
+            # text; several terms are fused into one pattern so each item is
+            # scanned once
+            items = [
+                item for item in self.items.values()
+                if item._search_blob is not None
+            ]
+            if isinstance(query, str):
+                query = query.lower()
+                results = [item for item in items if query in item._search_blob]
+            elif query:
+                pattern = re.compile('|'.join(re.escape(term.lower()) for term in query))
+                results = [item for item in items if pattern.search(item._search_blob)]
+            else:
+                results = []
             
             # Limit results
             if max_results is not None:
@@ -232,6 +267,24 @@ class ShortTermMemory:
             self.logger.error(f"Failed to get memory stats: {e}")
             raise
     
+    def _build_search_blob(self, item: MemoryItem) -> Optional[str]:
+        """
+        Build the lowercased text searched for an item.
+        
+        Args:
+            item: Memory item
+            
+        Returns:
+            String content and metadata values joined by NUL, or None if
+            the item has no string fields
+        """
+        parts = [item.content] if isinstance(item.content, str) else []
+        parts.extend(value for value in item.metadata.values() if isinstance(value, str))
+        
+        if not parts:
+            return None
+        return '\x00'.join(parts).lower()
+    
     def _generate_item_id(self) -> str:
         """
         Generate a unique item ID.
@@ -240,12 +293,8 @@ class ShortTermMemory:
             Unique item ID
         """
         try:
-            # Use timestamp and random string
-            timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-            import random
-            import string
-            random_str = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
-            return f"item_{timestamp}_{random_str}"
+            # Use millisecond timestamp and random hex string
+            return f"item_{int(time.time() * 1000):013d}_{secrets.token_hex(4)}"
             
         except Exception as e:
             self.logger.error(f"Failed to generate item ID: {e}")
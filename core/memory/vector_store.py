@@ -3,7 +3,7 @@ Vector store for memory system.
 """
 
 import logging
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Tuple, Union
 import json
 from pathlib import Path
 import numpy as np
@@ -11,6 +11,23 @@ from datetime import datetime
 import faiss
 import pickle
 
+# FAISS warns below roughly 39 training points per cluster
+_TRAIN_POINTS_PER_CENTROID = 39
+
+def _as_float32(vectors: Union[List, np.ndarray]) -> np.ndarray:
+    """
+    Convert vectors to the C-contiguous float32 array FAISS expects.
+    
+    Arrays that already match are returned as-is, without a copy.
+    
+    Args:
+        vectors: Vector(s) as nested lists or an array
+        
+    Returns:
+        float32 C-contiguous array
+    """
+    return np.ascontiguousarray(vectors, dtype=np.float32)
+
 class VectorStore:
     """Manages vector storage for memory system."""
     
@@ -18,52 +35,149 @@ class VectorStore:
         self,
         dimension: int = 768,
         index_type: str = "L2",
-        store_path: str = "data/vector_store"
+        store_path: str = "data/vector_store",
+        nlist: int = 1024,
+        pq_m: int = 32,
+        nprobe: int = 16
     ):
         """
         Initialize vector store.
         
         Args:
             dimension: Dimension of vectors
-            index_type: Type of FAISS index
+            index_type: Type of FAISS index: "L2" or "IP" for exact search,
+                "SQfp16" or "SQ8" for exhaustive search over float16 or
+                8-bit quantized vectors, "IVFFlat", "IVFPQ" or "IVFSQ8"
+                for inverted-file search
             store_path: Path to store index and metadata
+            nlist: Number of inverted lists for IVF indexes
+            pq_m: Number of product-quantizer subvectors for IVFPQ; must
+                divide dimension
+            nprobe: Number of inverted lists visited per IVF search
         """
         self.logger = logging.getLogger(__name__)
         self.dimension = dimension
         self.index_type = index_type
         self.store_path = Path(store_path)
         self.store_path.mkdir(parents=True, exist_ok=True)
+        self.nlist = nlist
+        self.pq_m = pq_m
+        self._nprobe = nprobe
         
         # Initialize FAISS index
         self._init_index()
         
-        # Initialize metadata storage
-        self.metadata: List[Dict[str, Any]] = []
+        # Initialize metadata storage, keyed by vector ID
+        self.metadata: Dict[int, Dict[str, Any]] = {}
+        
+        # IDs come from a counter rather than the index size, so deleting a
+        # vector leaves the others intact
+        self._next_id = 0
     
     def _init_index(self) -> None:
         """Initialize FAISS index."""
         try:
             if self.index_type == "L2":
-                self.index = faiss.IndexFlatL2(self.dimension)
+                self.index = faiss.IndexIDMap2(faiss.IndexFlatL2(self.dimension))
             elif self.index_type == "IP":
-                self.index = faiss.IndexFlatIP(self.dimension)
+                self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(self.dimension))
+            elif self.index_type == "IVFFlat":
+                self.index = faiss.index_factory(
+                    self.dimension, f"IVF{self.nlist},Flat", faiss.METRIC_L2
+                )
+            elif self.index_type == "IVFPQ":
+                if self.dimension % self.pq_m:
+                    raise ValueError(
+                        f"pq_m ({self.pq_m}) must divide dimension ({self.dimension})"
+                    )
+                self.index = faiss.index_factory(
+                    self.dimension, f"IVF{self.nlist},PQ{self.pq_m}x8", faiss.METRIC_L2
+                )
+            elif self.index_type in ("SQfp16", "SQ8"):
+                self.index = faiss.IndexIDMap2(
+                    faiss.index_factory(self.dimension, self.index_type, faiss.METRIC_L2)
+                )
+            elif self.index_type == "IVFSQ8":
+                self.index = faiss.index_factory(
+                    self.dimension, f"IVF{self.nlist},SQ8", faiss.METRIC_L2
+                )
             else:
                 raise ValueError(f"Unsupported index type: {self.index_type}")
             
+            # IVF indexes store IDs in their inverted lists; a hashtable
+            # direct map makes them reconstructable and removable by ID
+            if self.index_type.startswith("IVF"):
+                self.index.set_direct_map_type(faiss.DirectMap.Hashtable)
+            
+            # Vectors added before the index is trained are held in an
+            # exact index, which is searched until training and then
+            # supplies the training sample
+            self._pending = faiss.IndexIDMap2(faiss.IndexFlatL2(self.dimension))
+            self.nprobe = self._nprobe
+            
         except Exception as e:
             self.logger.error(f"Failed to initialize index: {e}")
             raise
     
+    @property
+    def nprobe(self) -> int:
+        """Number of inverted lists visited per IVF search."""
+        return self._nprobe
+    
+    @nprobe.setter
+    def nprobe(self, value: int) -> None:
+        self._nprobe = value
+        if self.index_type.startswith("IVF"):
+            faiss.ParameterSpace().set_index_parameter(self.index, "nprobe", value)
+    
+    @property
+    def train_size(self) -> int:
+        """Number of buffered vectors that triggers training of the index."""
+        if self.index_type == "SQ8":
+            # Only per-dimension value ranges are learned, over 2^8 levels
+            return _TRAIN_POINTS_PER_CENTROID * 256
+        
+        centroids = self.nlist
+        if self.index_type == "IVFPQ":
+            # Each PQ sub-quantizer has 2^8 centroids
+            centroids = max(centroids, 256)
+        return _TRAIN_POINTS_PER_CENTROID * centroids
+    
+    def train(self, vectors: Optional[Union[List[List[float]], np.ndarray]] = None) -> None:
+        """
+        Train the index and move buffered vectors into it.
+        
+        Args:
+            vectors: Optional training sample; defaults to the buffered
+                vectors
+        """
+        try:
+            if self.index.is_trained:
+                return
+            
+            buffered_ids, buffered = self._pending_vectors()
+            sample = buffered if vectors is None else _as_float32(vectors)
+            self.index.train(sample)
+            
+            if len(buffered):
+                self.index.add_with_ids(buffered, buffered_ids)
+            self._pending.reset()
+            
+        except Exception as e:
+            self.logger.error(f"Failed to train index: {e}")
+            raise
+    
     def add_vectors(
         self,
-        vectors: List[List[float]],
+        vectors: Union[List[List[float]], np.ndarray],
         metadata: Optional[List[Dict[str, Any]]] = None
     ) -> List[int]:
         """
         Add vectors to the store.
         
         Args:
-            vectors: List of vectors to add
+            vectors: List of vectors to add, or a 2D array; float32
+                C-contiguous arrays are used without copying
             metadata: Optional list of metadata for vectors
             
         Returns:
@@ -71,27 +185,28 @@ class VectorStore:
         """
         try:
             # Convert vectors to numpy array
-            vectors = np.array(vectors).astype('float32')
-            
-            # Add to index
-            start_id = self.index.ntotal
-            self.index.add(vectors)
+            vectors = _as_float32(vectors)
             
             # Generate IDs
+            start_id = self._next_id
             vector_ids = list(range(start_id, start_id + len(vectors)))
+            self._next_id += len(vectors)
+            
+            # Add to index, or buffer until there is enough to train on
+            self._add_with_ids(vectors, np.array(vector_ids, dtype='int64'))
             
             # Add metadata
             if metadata:
                 for i, meta in enumerate(metadata):
                     meta['vector_id'] = vector_ids[i]
                     meta['added_at'] = datetime.now().isoformat()
-                    self.metadata.append(meta)
+                    self.metadata[vector_ids[i]] = meta
             else:
                 for vector_id in vector_ids:
-                    self.metadata.append({
+                    self.metadata[vector_id] = {
                         'vector_id': vector_id,
                         'added_at': datetime.now().isoformat()
-                    })
+                    }
             
             return vector_ids
             
@@ -101,7 +216,7 @@ class VectorStore:
     
     def search(
         self,
-        query_vector: List[float],
+        query_vector: Union[List[float], np.ndarray],
         k: int = 5,
         filter_func: Optional[callable] = None
     ) -> List[Dict[str, Any]]:
@@ -118,10 +233,13 @@ class VectorStore:
         """
         try:
             # Convert query to numpy array
-            query = np.array([query_vector]).astype('float32')
+            query = _as_float32(query_vector).reshape(1, -1)
             
-            # Search index
-            distances, indices = self.index.search(query, k)
+            # Search index; an untrained index has everything buffered
+            if self.index.is_trained:
+                distances, indices = self.index.search(query, k)
+            else:
+                distances, indices = self._pending.search(query, k)
             
             # Get results
             results = []
@@ -130,10 +248,8 @@ class VectorStore:
                     continue
                 
                 # Get metadata
-                meta = next(
-                    (m for m in self.metadata if m['vector_id'] == idx),
-                    None
-                )
+                idx = int(idx)
+                meta = self.metadata.get(idx)
                 
                 if meta and (filter_func is None or filter_func(meta)):
                     results.append({
@@ -159,13 +275,11 @@ class VectorStore:
             Vector if found, None otherwise
         """
         try:
-            if vector_id >= self.index.ntotal:
+            if vector_id not in self.metadata:
                 return None
             
-            # Get vector from index
-            vector = faiss.vector_to_array(
-                self.index.reconstruct(vector_id)
-            ).tolist()
+            # Get vector from index or the pre-training buffer
+            vector = self._active_index().reconstruct(vector_id).tolist()
             
             return vector
             
@@ -187,11 +301,10 @@ class VectorStore:
         """
         try:
             # Find and update metadata
-            for meta in self.metadata:
-                if meta['vector_id'] == vector_id:
-                    meta.update(metadata)
-                    meta['updated_at'] = datetime.now().isoformat()
-                    break
+            meta = self.metadata.get(vector_id)
+            if meta is not None:
+                meta.update(metadata)
+                meta['updated_at'] = datetime.now().isoformat()
             
         except Exception as e:
             self.logger.error(f"Failed to update metadata: {e}")
@@ -206,14 +319,11 @@ class VectorStore:
         """
         try:
             # Remove from metadata
-            self.metadata = [
-                meta for meta in self.metadata
-                if meta['vector_id'] != vector_id
-            ]
+            if self.metadata.pop(vector_id, None) is None:
+                return
             
-            # Note: FAISS doesn't support direct deletion
-            # We'll need to rebuild the index
-            self._rebuild_index()
+            # Remove from the index in place; other IDs are unaffected
+            self._active_index().remove_ids(np.array([vector_id], dtype='int64'))
             
         except Exception as e:
             self.logger.error(f"Failed to delete vector: {e}")
@@ -222,20 +332,51 @@ class VectorStore:
     def _rebuild_index(self) -> None:
         """Rebuild the FAISS index from metadata."""
         try:
+            # Read the kept vectors in one batch before replacing the index
+            vector_ids = np.array(sorted(self.metadata), dtype='int64')
+            vectors = self._active_index().reconstruct_batch(vector_ids)
+            
             # Create new index
             self._init_index()
             
-            # Add vectors back
-            for meta in self.metadata:
-                vector_id = meta['vector_id']
-                vector = self.get_vector(vector_id)
-                if vector:
-                    self.index.add(np.array([vector]).astype('float32'))
+            # Add vectors back under their existing IDs with a single call
+            self._add_with_ids(vectors, vector_ids)
             
         except Exception as e:
             self.logger.error(f"Failed to rebuild index: {e}")
             raise
     
+    def _active_index(self):
+        """Return the index holding the vectors: the buffer until training."""
+        return self.index if self.index.is_trained else self._pending
+    
+    def _add_with_ids(self, vectors: np.ndarray, vector_ids: np.ndarray) -> None:
+        """
+        Add vectors under the given IDs, training the index once enough
+        vectors are buffered.
+        
+        Args:
+            vectors: Array of shape (n, dimension)
+            vector_ids: Array of n int64 IDs
+        """
+        if self.index.is_trained:
+            self.index.add_with_ids(vectors, vector_ids)
+        else:
+            self._pending.add_with_ids(vectors, vector_ids)
+            if self._pending.ntotal >= self.train_size:
+                self.train()
+    
+    def _pending_vectors(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Read the vectors buffered before training.
+        
+        Returns:
+            Tuple of (IDs, vectors of shape (n, dimension))
+        """
+        ids = faiss.vector_to_array(self._pending.id_map).astype('int64')
+        vectors = self._pending.index.reconstruct_n(0, self._pending.ntotal)
+        return ids, vectors
+    
     def save(self) -> None:
         """Save the vector store to disk."""
         try:
@@ -243,6 +384,13 @@ class VectorStore:
             index_path = self.store_path / "index.faiss"
             faiss.write_index(self.index, str(index_path))
             
+            # Save vectors still waiting for training
+            pending_path = self.store_path / "pending.faiss"
+            if self._pending.ntotal:
+                faiss.write_index(self._pending, str(pending_path))
+            elif pending_path.exists():
+                pending_path.unlink()
+            
             # Save metadata
             metadata_path = self.store_path / "metadata.pkl"
             with open(metadata_path, 'wb') as f:
@@ -259,17 +407,51 @@ class VectorStore:
             index_path = self.store_path / "index.faiss"
             if index_path.exists():
                 self.index = faiss.read_index(str(index_path))
+                if self.index_type.startswith("IVF"):
+                    self.index.set_direct_map_type(faiss.DirectMap.Hashtable)
+                    self.nprobe = self._nprobe
+                elif not isinstance(self.index, faiss.IndexIDMap2):
+                    # Stores saved by older versions numbered vectors by position
+                    self.index = self._with_sequential_ids(self.index)
+            
+            # Load vectors still waiting for training
+            pending_path = self.store_path / "pending.faiss"
+            if pending_path.exists():
+                self._pending = faiss.read_index(str(pending_path))
+                if not isinstance(self._pending, faiss.IndexIDMap2):
+                    self._pending = self._with_sequential_ids(self._pending)
             
             # Load metadata
             metadata_path = self.store_path / "metadata.pkl"
             if metadata_path.exists():
                 with open(metadata_path, 'rb') as f:
-                    self.metadata = pickle.load(f)
+                    metadata = pickle.load(f)
+                
+                # Stores saved by older versions hold a list
+                if isinstance(metadata, list):
+                    metadata = {meta['vector_id']: meta for meta in metadata}
+                self.metadata = metadata
+                self._next_id = max(self.metadata, default=-1) + 1
             
         except Exception as e:
             self.logger.error(f"Failed to load vector store: {e}")
             raise
     
+    def _with_sequential_ids(self, index):
+        """
+        Wrap a flat index in an IDMap2, keeping positions as IDs.
+        
+        Args:
+            index: Flat index without an ID map
+            
+        Returns:
+            IndexIDMap2 holding the same vectors
+        """
+        vectors = index.reconstruct_n(0, index.ntotal)
+        wrapped = faiss.IndexIDMap2(faiss.IndexFlat(index.d, index.metric_type))
+        wrapped.add_with_ids(vectors, np.arange(index.ntotal, dtype='int64'))
+        return wrapped
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         Get statistics about the vector store.
@@ -279,9 +461,10 @@ class VectorStore:
         """
         try:
             return {
-                'num_vectors': self.index.ntotal,
+                'num_vectors': self.index.ntotal + self._pending.ntotal,
                 'dimension': self.dimension,
                 'index_type': self.index_type,
+                'is_trained': self.index.is_trained,
                 'store_path': str(self.store_path)
             }
             
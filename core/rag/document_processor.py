@@ -2,8 +2,9 @@
 Document processor for RAG system.
 """
 
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, Generator, List, Optional, Union
 import json
 from pathlib import Path
 import re
@@ -17,6 +18,11 @@ import html2text
 import chardet
 import tiktoken
 
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
 @dataclass
 class Document:
     """Container for document data."""
@@ -30,17 +36,17 @@ class DocumentProcessor:
     
     def __init__(
         self,
-        chunk_size: int = 1000,
-        chunk_overlap: int = 200,
-        min_chunk_size: int = 100
+        chunk_size: int = 256,
+        chunk_overlap: int = 50,
+        min_chunk_size: int = 20
     ):
         """
         Initialize document processor.
         
         Args:
-            chunk_size: Maximum size of text chunks
-            chunk_overlap: Overlap between chunks
-            min_chunk_size: Minimum size of a chunk
+            chunk_size: Maximum size of text chunks, in tokens
+            chunk_overlap: Overlap between chunks, in tokens
+            min_chunk_size: Minimum size of a chunk, in tokens
         """
         self.logger = logging.getLogger(__name__)
         self.chunk_size = chunk_size
@@ -122,16 +128,9 @@ class DocumentProcessor:
             Cleaned text
         """
         try:
-            # Replace multiple whitespace with single space
-            text = self.patterns['whitespace'].sub(' ', text)
-            
-            # Normalize line endings
-            text = text.replace('\r\n', '\n').replace('\r', '\n')
-            
-            # Remove empty lines
-            text = '\n'.join(line for line in text.split('\n') if line.strip())
-            
-            return text.strip()
+            # Collapse every whitespace run, line breaks included, to one
+            # space; this also drops empty lines
+            return self.patterns['whitespace'].sub(' ', text).strip()
             
         except Exception as e:
             self.logger.error(f"Failed to clean text: {e}")
@@ -139,7 +138,7 @@ class DocumentProcessor:
     
     def _split_into_chunks(self, text: str) -> List[str]:
         """
-        Split text into overlapping chunks.
+        Split text into overlapping chunks of tokens.
         
         Args:
             text: Text to split
@@ -148,32 +147,23 @@ class DocumentProcessor:
             List of text chunks
         """
         try:
-            chunks = []
-            start = 0
+            step = self.chunk_size - self.chunk_overlap
+            if step <= 0:
+                raise ValueError("chunk_overlap must be smaller than chunk_size")
             
-            while start < len(text):
-                # Find chunk end
-                end = start + self.chunk_size
-                
-                if end >= len(text):
-                    # Last chunk
-                    chunk = text[start:].strip()
-                    if len(chunk) >= self.min_chunk_size:
-                        chunks.append(chunk)
-                    break
-                
-                # Try to find sentence boundary
-                next_sentence = self.patterns['sentence'].search(text, end - 100, end + 100)
-                if next_sentence:
-                    end = next_sentence.end()
+            # Tokenize once and slice the token IDs
+            tokens = self.tokenizer.encode(text)
+            
+            chunks = []
+            # Stop once the remaining tokens are all overlap with the last chunk
+            for start in range(0, max(len(tokens) - self.chunk_overlap, 1), step):
+                chunk_tokens = tokens[start:start + self.chunk_size]
+                if len(chunk_tokens) < self.min_chunk_size:
+                    continue
                 
-                # Extract chunk
-                chunk = text[start:end].strip()
-                if len(chunk) >= self.min_chunk_size:
+                chunk = self.tokenizer.decode(chunk_tokens).strip()
+                if chunk:
                     chunks.append(chunk)
-                
-                # Move start position for next chunk
-                start = end - self.chunk_overlap
             
             return chunks
             
@@ -202,13 +192,15 @@ class DocumentProcessor:
                 return str(metadata['id'])
             
             # Generate ID from content hash
-            import hashlib
-            content_hash = hashlib.md5(content.encode()).hexdigest()
+            if blake3 is not None:
+                content_hash = blake3.blake3(content.encode()).hexdigest(length=4)
+            else:
+                content_hash = hashlib.blake2b(content.encode(), digest_size=4).hexdigest()
             
             # Add timestamp
             timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
             
-            return f"doc_{timestamp}_{content_hash[:8]}"
+            return f"doc_{timestamp}_{content_hash}"
             
         except Exception as e:
             self.logger.error(f"Failed to generate document ID: {e}")
@@ -245,6 +237,9 @@ class DocumentProcessor:
         """
         Find the length of overlapping content between two texts.
         
+        Only the first chunk_overlap tokens of text2 can overlap text1, so
+        the search is limited to that many characters.
+        
         Args:
             text1: First text
             text2: Second text
@@ -253,10 +248,21 @@ class DocumentProcessor:
             Length of overlap
         """
         try:
-            # Try different overlap sizes
-            for size in range(min(len(text1), len(text2)), 0, -1):
-                if text1[-size:] == text2[:size]:
-                    return size
+            overlap_text = self.tokenizer.decode(
+                self.tokenizer.encode(text2)[:self.chunk_overlap]
+            )
+            max_overlap = min(len(overlap_text), len(text1), len(text2))
+            if max_overlap <= 0:
+                return 0
+            
+            # Try suffixes of text1 from longest to shortest, starting only
+            # where text2's first character occurs
+            tail = text1[-max_overlap:]
+            start = tail.find(text2[0])
+            while start != -1:
+                if text2.startswith(tail[start:]):
+                    return len(tail) - start
+                start = tail.find(text2[0], start + 1)
             return 0
             
         except Exception as e:
@@ -52,7 +52,8 @@ class EmbeddingGenerator:
             metadata: Optional metadata for the texts
             
         Returns:
-            Dictionary containing embeddings and metadata
+            Dictionary containing embeddings (a float32 array of shape
+            (num_texts, dimension)) and metadata
         """
         try:
             # Convert single text to list
@@ -64,12 +65,13 @@ class EmbeddingGenerator:
                 texts,
                 batch_size=self.batch_size,
                 show_progress_bar=True,
-                convert_to_numpy=True
+                convert_to_numpy=True,
+                normalize_embeddings=True
             )
             
             # Create result dictionary
             result = {
-                'embeddings': embeddings.tolist(),
+                'embeddings': embeddings,
                 'metadata': metadata or {},
                 'model': self.model_name,
                 'dimension': self.embedding_dim
@@ -89,6 +91,9 @@ class EmbeddingGenerator:
         """
         Compute similarity between query and document embeddings.
         
+        Embeddings must be L2-normalized, as generate_embeddings returns
+        them, so the dot product is the cosine similarity.
+        
         Args:
             query_embedding: Query embedding
             document_embeddings: List of document embeddings
@@ -97,21 +102,24 @@ class EmbeddingGenerator:
             List of similarity scores
         """
         try:
-            # Convert to numpy arrays
-            query = np.array(query_embedding)
-            documents = np.array(document_embeddings)
-            
-            # Compute cosine similarity
-            similarities = np.dot(documents, query) / (
-                np.linalg.norm(documents, axis=1) * np.linalg.norm(query)
-            )
-            
-            return similarities.tolist()
+            return self._similarities(query_embedding, document_embeddings).tolist()
             
         except Exception as e:
             self.logger.error(f"Failed to compute similarity: {e}")
             raise
     
+    def _similarities(
+        self,
+        query_embedding: Union[List[float], np.ndarray],
+        document_embeddings: Union[List[List[float]], np.ndarray]
+    ) -> np.ndarray:
+        """Cosine similarities of unit-norm embeddings as a single matrix product."""
+        # Convert to numpy arrays
+        query = np.asarray(query_embedding, dtype=np.float32)
+        documents = np.asarray(document_embeddings, dtype=np.float32)
+        
+        return documents @ query
+    
     def find_most_similar(
         self,
         query_embedding: List[float],
@@ -131,10 +139,14 @@ class EmbeddingGenerator:
         """
         try:
             # Compute similarities
-            similarities = self.compute_similarity(query_embedding, document_embeddings)
+            similarities = self._similarities(query_embedding, document_embeddings)
             
-            # Get top-k indices
-            top_indices = np.argsort(similarities)[-top_k:][::-1]
+            # Select the top-k without sorting everything, then order them
+            top_k = min(top_k, len(similarities))
+            if top_k <= 0:
+                return []
+            top_indices = np.argpartition(similarities, -top_k)[-top_k:]
+            top_indices = top_indices[np.argsort(similarities[top_indices])[::-1]]
             
             return top_indices.tolist()
             
@@ -150,17 +162,28 @@ class EmbeddingGenerator:
         """
         Save embeddings to file.
         
+        The array is written next to the JSON file as a .npy file; the JSON
+        file holds the remaining fields.
+        
         Args:
             embeddings: Embeddings to save
             filepath: Path to save file
         """
         try:
             # Create directory if it doesn't exist
-            Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+            filepath = Path(filepath)
+            filepath.parent.mkdir(parents=True, exist_ok=True)
             
             # Save embeddings
+            np.save(
+                filepath.with_suffix('.npy'),
+                np.asarray(embeddings['embeddings'], dtype=np.float32)
+            )
+            
+            # Save metadata
+            fields = {k: v for k, v in embeddings.items() if k != 'embeddings'}
             with open(filepath, 'w') as f:
-                json.dump(embeddings, f, indent=2)
+                json.dump(fields, f, indent=2)
             
         except Exception as e:
             self.logger.error(f"Failed to save embeddings: {e}")
@@ -174,12 +197,24 @@ class EmbeddingGenerator:
             filepath: Path to embeddings file
             
         Returns:
-            Loaded embeddings
+            Loaded embeddings; the array is memory-mapped read-only
         """
         try:
+            filepath = Path(filepath)
             with open(filepath, 'r') as f:
                 embeddings = json.load(f)
             
+            # Files written by older versions hold the embeddings inline,
+            # not yet L2-normalized
+            if 'embeddings' in embeddings:
+                vectors = np.asarray(embeddings['embeddings'], dtype=np.float32)
+                norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+                embeddings['embeddings'] = vectors / np.where(norms > 0, norms, 1)
+            else:
+                embeddings['embeddings'] = np.load(
+                    filepath.with_suffix('.npy'), mmap_mode='r'
+                )
+            
             return embeddings
             
         except Exception as e:
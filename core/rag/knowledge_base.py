@@ -17,8 +17,8 @@ class KnowledgeBase:
     def __init__(
         self,
         base_dir: str = "data/knowledge_base",
-        chunk_size: int = 1000,
-        chunk_overlap: int = 200,
+        chunk_size: int = 256,
+        chunk_overlap: int = 50,
         top_k: int = 5,
         similarity_threshold: float = 0.7
     ):
@@ -27,8 +27,8 @@ class KnowledgeBase:
         
         Args:
             base_dir: Base directory for knowledge base files
-            chunk_size: Maximum size of text chunks
-            chunk_overlap: Overlap between chunks
+            chunk_size: Maximum size of text chunks, in tokens
+            chunk_overlap: Overlap between chunks, in tokens
             top_k: Number of results to return
             similarity_threshold: Minimum similarity score
         """
@@ -7,7 +7,7 @@ from typing import Any, Dict, Optional
 import logging
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True)
 class ToolResult:
     """Result of a tool execution."""
     success: bool
@@ -49,7 +49,7 @@ def main():
         logger = logging.getLogger("jarvis.launch")
         
         # Import and run Jarvis
-        from main import Jarvis
+        from main import Jarvis, install_uvloop
         import asyncio
         
         print("\nStarting Jarvis...")
@@ -59,6 +59,7 @@ def main():
         
         # Run Jarvis
         jarvis = Jarvis()
+        install_uvloop()
         asyncio.run(jarvis.run())
         
     except KeyboardInterrupt:
@@ -16,6 +16,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def install_uvloop() -> bool:
+    """Use uvloop as the asyncio event loop policy when it is installed.
+    
+    Must be called before asyncio.run() so the loop is created by uvloop.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    uvloop.install()
+    return True
+
 class Jarvis:
     """Main Jarvis system class."""
     
@@ -89,4 +101,5 @@ async def main():
     await jarvis.run()
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
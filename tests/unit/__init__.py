@@ -2,8 +2,32 @@
 Unit tests for Jarvis.
 """
 
+import importlib.util
+import os
+import sys
+import types
 import unittest
 
+# Project root, for loading modules by path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def load_module(name: str) -> types.ModuleType:
+    """
+    Load a single module by its dotted name without importing its packages.
+    
+    Package __init__ files pull in heavy dependencies (torch, faiss), so
+    modules that only use the standard library are loaded from their file.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    
+    path = os.path.join(project_root, *name.split('.')) + '.py'
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
 def run_tests():
     """Run all unit tests."""
     loader = unittest.TestLoader()
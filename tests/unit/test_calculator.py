@@ -0,0 +1,72 @@
+"""
+Tests for the calculator tool.
+"""
+
+import logging
+import unittest
+
+from tests.unit import load_module
+
+calculator = load_module('core.agent.tools.calculator')
+
+class TestCalculatorTool(unittest.TestCase):
+    """Tests for CalculatorTool expression evaluation."""
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.calculator = calculator.CalculatorTool()
+    
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+    
+    def test_arithmetic(self):
+        self.assertEqual(self.calculator.calculate("1 + 2 * 3"), 7)
+        self.assertEqual(self.calculator.calculate("(1 + 2) * 3"), 9)
+        self.assertEqual(self.calculator.calculate("-7 // 2"), -4)
+        self.assertEqual(self.calculator.calculate("7 % 4"), 3)
+        self.assertEqual(self.calculator.calculate("2 ** 10"), 1024)
+    
+    def test_functions(self):
+        self.assertEqual(self.calculator.calculate("sqrt(16)"), 4)
+        self.assertAlmostEqual(self.calculator.calculate("sin(0) + cos(0)"), 1)
+        self.assertAlmostEqual(self.calculator.calculate("log(exp(2))"), 2)
+    
+    def test_results_are_floats(self):
+        result = self.calculator.calculate("3 * 4")
+        self.assertIsInstance(result, float)
+    
+    def test_huge_power_overflows(self):
+        with self.assertRaises(OverflowError):
+            self.calculator.calculate("9 ** 9 ** 9 ** 9")
+    
+    def test_rejects_names(self):
+        for expression in ("__import__('os')", "x + 1", "open", "pi"):
+            with self.subTest(expression=expression):
+                with self.assertRaises(ValueError):
+                    self.calculator.calculate(expression)
+    
+    def test_rejects_non_arithmetic(self):
+        for expression in ("(1).real", "'a' * 3", "[1, 2]", "True + 1", "1 < 2", "sqrt(x=4)"):
+            with self.subTest(expression=expression):
+                with self.assertRaises(ValueError):
+                    self.calculator.calculate(expression)
+    
+    def test_rejects_invalid_syntax(self):
+        with self.assertRaises(SyntaxError):
+            self.calculator.calculate("1 +")
+    
+    def test_evaluate_function(self):
+        self.assertEqual(self.calculator.evaluate_function('sqrt', 9), 3)
+        self.assertEqual(self.calculator.evaluate_function('+', 2, 3), 5)
+        self.assertAlmostEqual(self.calculator.evaluate_function('log10', 1000), 3)
+        with self.assertRaises(ValueError):
+            self.calculator.evaluate_function('eval', '1')
+    
+    def test_math_errors_propagate(self):
+        with self.assertRaises(ZeroDivisionError):
+            self.calculator.calculate("1 / 0")
+        with self.assertRaises(ValueError):
+            self.calculator.calculate("sqrt(-1)")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Tests for document chunking.
+"""
+
+import logging
+import unittest
+
+try:
+    from core.rag.document_processor import DocumentProcessor
+except ImportError:
+    DocumentProcessor = None
+
+class CharTokenizer:
+    """Tokenizer with one token per character, so sizes are easy to read."""
+    
+    def encode(self, text):
+        return [ord(c) for c in text]
+    
+    def decode(self, tokens):
+        return ''.join(map(chr, tokens))
+
+@unittest.skipUnless(DocumentProcessor is not None, "document dependencies are not installed")
+class TestDocumentChunking(unittest.TestCase):
+    """Tests for token chunking and chunk merging."""
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.processor = DocumentProcessor(chunk_size=10, chunk_overlap=3, min_chunk_size=2)
+        self.processor.tokenizer = CharTokenizer()
+    
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+    
+    def test_chunks_overlap(self):
+        chunks = self.processor._split_into_chunks("abcdefghijklmnopqrstuvwxyz")
+        self.assertEqual(chunks, ["abcdefghij", "hijklmnopq", "opqrstuvwx", "vwxyz"])
+    
+    def test_short_text_is_one_chunk(self):
+        self.assertEqual(self.processor._split_into_chunks("abcdefghij"), ["abcdefghij"])
+        self.assertEqual(self.processor._split_into_chunks("abc"), ["abc"])
+        self.assertEqual(self.processor._split_into_chunks(""), [])
+    
+    def test_no_chunk_of_only_overlap(self):
+        # The last 3 tokens are already covered by the first chunk
+        self.assertEqual(self.processor._split_into_chunks("abcdefghijk"), ["abcdefghij", "hijk"])
+        self.assertEqual(self.processor._split_into_chunks("abcdefghijklmnopq"),
+                         ["abcdefghij", "hijklmnopq"])
+    
+    def test_min_chunk_size(self):
+        self.processor.min_chunk_size = 5
+        self.assertEqual(self.processor._split_into_chunks("abcdefghijk"), ["abcdefghij"])
+    
+    def test_overlap_must_be_smaller_than_chunk_size(self):
+        self.processor.chunk_overlap = 10
+        with self.assertRaises(ValueError):
+            self.processor._split_into_chunks("abc")
+    
+    def test_find_overlap(self):
+        self.assertEqual(self.processor._find_overlap("abcdefghij", "hijklmnopq"), 3)
+        self.assertEqual(self.processor._find_overlap("abcdefghij", "jklm"), 1)
+        self.assertEqual(self.processor._find_overlap("abcdefghij", "xyz"), 0)
+        self.assertEqual(self.processor._find_overlap("abc", ""), 0)
+        self.assertEqual(self.processor._find_overlap("", "abc"), 0)
+    
+    def test_find_overlap_is_bounded_by_chunk_overlap(self):
+        # "defghij" overlaps fully, but only chunk_overlap tokens can
+        self.assertEqual(self.processor._find_overlap("abcdefghij", "defghijxyz"), 0)
+        self.assertEqual(self.processor._find_overlap("aaaaaa", "aaaaaa"), 3)
+    
+    def test_merge_chunks_round_trip(self):
+        text = "abcdefghijklmnopqrstuvwxyz"
+        chunks = self.processor._split_into_chunks(text)
+        self.assertEqual(self.processor.merge_chunks(chunks).replace(' ', ''), text)
+        self.assertEqual(self.processor.merge_chunks([]), '')
+
+if __name__ == '__main__':
+    unittest.main()
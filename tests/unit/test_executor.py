@@ -0,0 +1,86 @@
+"""
+Tests for the action executor.
+"""
+
+import asyncio
+import logging
+import sys
+import types
+import unittest
+
+from tests.unit import load_module
+
+executor = load_module('core.agent.executor')
+
+def _make_tool_module(calls):
+    """Build a tool module with a batch-capable fetch and a plain echo."""
+    module = types.ModuleType('core.agent.tools.fake_batch')
+    
+    async def fetch(url):
+        calls.append(url)
+        return {'content': url}
+    
+    async def fetch_batch(params_list, context=None):
+        calls.append([params['url'] for params in params_list])
+        return [
+            ValueError("bad url") if params['url'] == 'bad' else {'content': params['url']}
+            for params in params_list
+        ]
+    
+    def echo(text, context=None):
+        return {'text': text, 'context': {'echoed': text}}
+    
+    fetch.execute_batch = fetch_batch
+    module.fetch = fetch
+    module.echo = echo
+    return module
+
+class TestActionExecutorBatching(unittest.TestCase):
+    """Tests for grouping same-action steps into execute_batch calls."""
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.calls = []
+        sys.modules['core.agent.tools.fake_batch'] = _make_tool_module(self.calls)
+        executor._TOOL_FN_CACHE.pop('fake_batch', None)
+        executor._MODULE_CACHE.pop('core.agent.tools.fake_batch', None)
+        self.executor = executor.ActionExecutor(['fake_batch'], batch_size=2)
+    
+    def tearDown(self):
+        sys.modules.pop('core.agent.tools.fake_batch', None)
+        logging.disable(logging.NOTSET)
+    
+    def run_plan(self, steps):
+        return asyncio.run(self.executor.execute_plan({'steps': steps, 'dependencies': {'0': []}}))
+    
+    def test_same_action_steps_are_batched(self):
+        results = self.run_plan([
+            'fetch url: a', 'echo text: hi', 'fetch url: b', 'fetch url: c'
+        ])
+        
+        self.assertTrue(results['success'])
+        self.assertEqual(self.calls, [['a', 'b'], ['c']])
+        self.assertEqual(
+            [step['result'] for step in results['steps']],
+            [{'content': 'a'}, {'text': 'hi', 'context': {'echoed': 'hi'}},
+             {'content': 'b'}, {'content': 'c'}]
+        )
+        self.assertEqual(results['context'], {'echoed': 'hi'})
+    
+    def test_batch_failures_are_per_step(self):
+        results = self.run_plan(['fetch url: a', 'fetch url: bad', 'nope x: 1'])
+        
+        self.assertFalse(results['success'])
+        self.assertEqual([step['success'] for step in results['steps']], [True, False, False])
+        self.assertEqual(results['errors'], ['bad url', 'Unknown action: nope'])
+    
+    def test_without_dependencies_steps_run_one_by_one(self):
+        results = asyncio.run(self.executor.execute_plan({
+            'steps': ['fetch url: a', 'fetch url: b']
+        }))
+        
+        self.assertTrue(results['success'])
+        self.assertEqual(self.calls, [['a'], ['b']])
+
+if __name__ == '__main__':
+    unittest.main()
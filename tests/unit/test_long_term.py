@@ -0,0 +1,132 @@
+"""
+Tests for long-term memory.
+"""
+
+import logging
+import os
+import tempfile
+import unittest
+
+from tests.unit import load_module
+
+long_term = load_module('core.memory.long_term')
+
+class TestLongTermMemory(unittest.TestCase):
+    """Tests for LongTermMemory storage, search and the writer thread."""
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "memory.db")
+        self.memory = long_term.LongTermMemory(self.db_path)
+    
+    def tearDown(self):
+        self.memory.close()
+        self.tmp.cleanup()
+        logging.disable(logging.NOTSET)
+    
+    def test_wal_mode(self):
+        with self.memory._lock:
+            mode = self.memory._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+    
+    def test_add_and_get(self):
+        entry_id = self.memory.add({'text': 'hello'}, {'role': 'user'}, ['chat', 'greeting'])
+        entry = self.memory.get(entry_id)
+        self.assertEqual(entry.content, {'text': 'hello'})
+        self.assertEqual(entry.metadata, {'role': 'user'})
+        self.assertEqual(sorted(entry.tags), ['chat', 'greeting'])
+        self.assertIsNone(self.memory.get("missing"))
+    
+    def test_add_many_keeps_order(self):
+        entries = [(f"note {i}", {'i': i}, ['note']) for i in range(5)]
+        entry_ids = self.memory.add_many(entries)
+        self.assertEqual(len(entry_ids), 5)
+        self.assertEqual([self.memory.get(i).content for i in entry_ids],
+                         [f"note {i}" for i in range(5)])
+        self.assertEqual(self.memory.add_many([]), [])
+    
+    def test_search_matches_word_prefixes(self):
+        self.memory.add("the quick brown fox", None, ['animal'])
+        self.memory.add("a lazy dog", None, ['animal'])
+        self.memory.add("quicksort in python", None, ['code'])
+        
+        results = {entry.content for entry in self.memory.search("quick")}
+        self.assertEqual(results, {"the quick brown fox", "quicksort in python"})
+        
+        results = [entry.content for entry in self.memory.search("quick", tags=['code'])]
+        self.assertEqual(results, ["quicksort in python"])
+        
+        self.assertEqual(len(self.memory.search("quick", limit=1)), 1)
+    
+    def test_search_keeps_all_tags_with_tag_filter(self):
+        self.memory.add("tagged twice", None, ['a', 'b'])
+        [entry] = self.memory.search("tagged", tags=['a'])
+        self.assertEqual(sorted(entry.tags), ['a', 'b'])
+    
+    def test_search_ignores_fts_operators(self):
+        self.memory.add("rock and roll")
+        for query in ('rock AND', '"roll', '(rock', 'roll*', '-rock'):
+            with self.subTest(query=query):
+                self.assertEqual(len(self.memory.search(query)), 1)
+    
+    def test_iter_search(self):
+        self.memory.add_many([(f"item {i}", None, None) for i in range(3)])
+        results = list(self.memory.iter_search("item"))
+        self.assertEqual(len(results), 3)
+    
+    def test_update_and_delete(self):
+        entry_id = self.memory.add("draft", {'v': 1}, ['old'])
+        self.memory.update(entry_id, content="final", metadata={'w': 2}, tags=['new'])
+        entry = self.memory.get(entry_id)
+        self.assertEqual(entry.content, "final")
+        self.assertEqual(entry.metadata, {'v': 1, 'w': 2})
+        self.assertEqual(entry.tags, ['new'])
+        
+        self.memory.delete(entry_id)
+        self.assertIsNone(self.memory.get(entry_id))
+        self.assertEqual(self.memory.search("final"), [])
+    
+    def test_failed_write_does_not_affect_others(self):
+        with self.assertRaises(ValueError):
+            self.memory.update("missing", content="x")
+        entry_id = self.memory.add("still works")
+        self.assertEqual(self.memory.get(entry_id).content, "still works")
+    
+    def test_bulk_load(self):
+        entries = ((f"bulk {i}", {'i': i}, ['bulk']) for i in range(250))
+        entry_ids = self.memory.bulk_load(entries)
+        self.assertEqual(len(entry_ids), 250)
+        
+        # Indexes and full-text triggers are restored afterwards
+        with self.memory._lock:
+            names = {row[0] for row in self.memory._conn.execute(
+                "SELECT name FROM sqlite_master WHERE type IN ('index', 'trigger')"
+            )}
+        self.assertTrue(set(long_term._SQL_CREATE_INDEXES) <= names)
+        if self.memory._fts_enabled:
+            self.assertTrue(set(long_term._SQL_CREATE_FTS_TRIGGERS) <= names)
+        
+        self.assertEqual(len(self.memory.search("bulk", tags=['bulk'])), 250)
+        self.memory.add("after bulk load")
+        self.assertEqual(len(self.memory.search("after")), 1)
+        
+        stats = self.memory.get_stats()
+        self.assertEqual(stats['total_entries'], 251)
+        self.assertEqual(stats['unique_tags'], 1)
+    
+    def test_persists_across_reopen(self):
+        entry_id = self.memory.add("durable", None, ['keep'])
+        self.memory.close()
+        self.memory = long_term.LongTermMemory(self.db_path)
+        self.assertEqual(self.memory.get(entry_id).content, "durable")
+        self.assertEqual(len(self.memory.search("durable")), 1)
+    
+    def test_write_after_close_raises(self):
+        self.memory.close()
+        with self.assertRaises(RuntimeError):
+            self.memory.add("too late")
+        self.memory = long_term.LongTermMemory(self.db_path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Tests for task plan parsing.
+"""
+
+import json
+import logging
+import unittest
+from unittest import mock
+
+try:
+    from core.agent.planner import TaskPlanner
+except ImportError:
+    TaskPlanner = None
+
+VALID_PLAN = {
+    'task': 'Write a report',
+    'steps': ['Collect data', 'Draft'],
+    'constraints': {'length': 'short'},
+    'expected_outcome': 'A report'
+}
+
+TEXT_PLAN = """Task: Write a report
+Steps:
+- Collect data
+- Draft
+Constraints:
+length: short
+Expected outcome: A report
+"""
+
+@unittest.skipUnless(TaskPlanner is not None, "model dependencies are not installed")
+class TestTaskPlannerParsing(unittest.TestCase):
+    """Tests for TaskPlanner's memoized parse and validation."""
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.planner = TaskPlanner(model_manager=None, prompt_templates=None, plan_cache_size=2)
+    
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+    
+    def test_parses_json_fenced_json_and_text(self):
+        responses = [
+            json.dumps(VALID_PLAN),
+            "Plan:\n```json\n" + json.dumps(VALID_PLAN) + "\n```",
+            TEXT_PLAN
+        ]
+        for response in responses:
+            with self.subTest(response=response):
+                self.assertEqual(self.planner._parse_and_validate(response), VALID_PLAN)
+    
+    def test_cached_plan_is_copied(self):
+        response = json.dumps(VALID_PLAN)
+        first = self.planner._parse_and_validate(response)
+        first['steps'].append('Publish')
+        
+        second = self.planner._parse_and_validate(response)
+        self.assertEqual(second, VALID_PLAN)
+        self.assertEqual(len(self.planner._plan_cache), 1)
+    
+    def test_invalid_plan_raises_every_time(self):
+        response = json.dumps(dict(VALID_PLAN, steps=[]))
+        for _ in range(2):
+            with self.assertRaisesRegex(ValueError, "at least one step"):
+                self.planner._parse_and_validate(response)
+        self.assertEqual(len(self.planner._plan_cache), 1)
+    
+    def test_cache_evicts_least_recently_used(self):
+        plans = [json.dumps(dict(VALID_PLAN, task=f"Task {i}")) for i in range(3)]
+        self.planner._parse_and_validate(plans[0])
+        self.planner._parse_and_validate(plans[1])
+        self.planner._parse_and_validate(plans[0])
+        self.planner._parse_and_validate(plans[2])
+        
+        self.assertEqual(len(self.planner._plan_cache), 2)
+        with mock.patch.object(self.planner, '_parse_plan', wraps=self.planner._parse_plan) as parse:
+            self.assertEqual(self.planner._parse_and_validate(plans[0])['task'], "Task 0")
+            parse.assert_not_called()
+            self.assertEqual(self.planner._parse_and_validate(plans[1])['task'], "Task 1")
+            parse.assert_called_once_with(plans[1])
+
+if __name__ == '__main__':
+    unittest.main()
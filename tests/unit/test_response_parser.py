@@ -0,0 +1,69 @@
+"""
+Tests for the LLM response parser.
+"""
+
+import unittest
+
+from tests.unit import load_module
+
+response_parser = load_module('core.llm.response_parser')
+ResponseType = response_parser.ResponseType
+
+class TestResponseParser(unittest.TestCase):
+    """Tests for ResponseParser.parse."""
+    
+    def setUp(self):
+        self.parser = response_parser.ResponseParser()
+    
+    def test_json(self):
+        parsed = self.parser.parse('{"a": [1, 2], "b": null}')
+        self.assertEqual(parsed.type, ResponseType.JSON)
+        self.assertEqual(parsed.content, {"a": [1, 2], "b": None})
+    
+    def test_invalid_json_falls_back_to_text(self):
+        parsed = self.parser.parse('{not json}')
+        self.assertEqual(parsed.type, ResponseType.TEXT)
+        self.assertEqual(parsed.content, '{not json}')
+    
+    def test_single_code_block(self):
+        parsed = self.parser.parse("Here:\n```python\nprint(1)\n```")
+        self.assertEqual(parsed.type, ResponseType.CODE)
+        self.assertEqual(parsed.content, "print(1)")
+        self.assertEqual(parsed.metadata, {'language': 'python'})
+    
+    def test_multiple_code_blocks(self):
+        parsed = self.parser.parse("```python\na\n```\n```\nb\n```")
+        self.assertEqual(parsed.content, ["a", "b"])
+        self.assertEqual(parsed.metadata, {'languages': ['python', 'text']})
+    
+    def test_list(self):
+        parsed = self.parser.parse("Steps:\n- first\n* second\n")
+        self.assertEqual(parsed.type, ResponseType.LIST)
+        self.assertEqual(parsed.content, ["first", "second"])
+    
+    def test_table(self):
+        parsed = self.parser.parse("| name | age |\n| ann | 3 |\n| bob |\n| cy | 5 |")
+        self.assertEqual(parsed.type, ResponseType.TABLE)
+        self.assertEqual(parsed.metadata, {'headers': ['name', 'age']})
+        self.assertEqual(parsed.content, [
+            {'name': 'ann', 'age': '3'},
+            {'name': 'cy', 'age': '5'}
+        ])
+    
+    def test_text(self):
+        parsed = self.parser.parse("  just words  ")
+        self.assertEqual(parsed.type, ResponseType.TEXT)
+        self.assertEqual(parsed.content, "just words")
+    
+    def test_results_are_independent(self):
+        response = '{"items": [1, 2]}'
+        first = self.parser.parse(response)
+        first.content['items'].append(3)
+        first.metadata['format'] = 'changed'
+        
+        second = self.parser.parse(response)
+        self.assertEqual(second.content, {"items": [1, 2]})
+        self.assertEqual(second.metadata, {'format': 'json'})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Tests for short-term memory.
+"""
+
+import unittest
+from unittest import mock
+
+from tests.unit import load_module
+
+short_term = load_module('core.memory.short_term')
+
+class TestShortTermMemory(unittest.TestCase):
+    """Tests for ShortTermMemory storage, eviction and expiry."""
+    
+    def setUp(self):
+        self.clock = 1000.0
+        patcher = mock.patch.object(short_term.time, 'monotonic', lambda: self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.memory = short_term.ShortTermMemory(max_items=3, default_ttl=60)
+    
+    def test_add_and_get(self):
+        item_id = self.memory.add("hello", metadata={'role': 'user'})
+        item = self.memory.get(item_id)
+        self.assertEqual(item.content, "hello")
+        self.assertEqual(item.metadata, {'role': 'user'})
+        self.assertIsNone(self.memory.get("missing"))
+    
+    def test_ids_are_unique(self):
+        ids = {self.memory.add(i) for i in range(3)}
+        self.assertEqual(len(ids), 3)
+    
+    def test_evicts_oldest_beyond_max_items(self):
+        ids = [self.memory.add(f"item {i}") for i in range(5)]
+        self.assertEqual([item.id for item in self.memory.get_all()], ids[2:])
+        self.assertIsNone(self.memory.get(ids[0]))
+    
+    def test_lowered_max_items_applies_on_next_add(self):
+        for i in range(3):
+            self.memory.add(i)
+        self.memory.max_items = 1
+        last = self.memory.add("last")
+        self.assertEqual([item.id for item in self.memory.get_all()], [last])
+    
+    def test_get_drops_expired_item(self):
+        item_id = self.memory.add("short", ttl=10)
+        self.clock += 11
+        self.assertIsNone(self.memory.get(item_id))
+        self.assertNotIn(item_id, self.memory.items)
+    
+    def test_cleanup_removes_only_expired_items(self):
+        short_id = self.memory.add("short", ttl=10)
+        long_id = self.memory.add("long", ttl=100)
+        self.clock += 50
+        self.memory.cleanup()
+        self.assertEqual(list(self.memory.items), [long_id])
+        self.assertNotIn(short_id, self.memory.items)
+    
+    def test_cleanup_skips_removed_items(self):
+        item_id = self.memory.add("gone", ttl=10)
+        self.memory.remove(item_id)
+        kept = self.memory.add("kept", ttl=100)
+        self.clock += 20
+        self.memory.cleanup()
+        self.assertEqual(list(self.memory.items), [kept])
+        self.assertFalse(any(entry[1] == item_id for entry in self.memory._exp_heap))
+    
+    def test_stale_heap_entries_are_compacted(self):
+        for i in range(20):
+            self.memory.add(i)
+        self.assertLessEqual(len(self.memory._exp_heap), 2 * self.memory.max_items + 1)
+    
+    def test_search(self):
+        self.memory.add("The Weather is sunny")
+        self.memory.add("lunch plans", metadata={'topic': 'Food'})
+        self.memory.add({'not': 'text'})
+        
+        self.assertEqual([item.content for item in self.memory.search("weather")],
+                         ["The Weather is sunny"])
+        self.assertEqual([item.content for item in self.memory.search("food")],
+                         ["lunch plans"])
+        self.assertEqual(len(self.memory.search("", max_results=1)), 1)
+    
+    def test_search_any_term(self):
+        self.memory.add("The Weather is sunny")
+        self.memory.add("lunch plans", metadata={'topic': 'Food'})
+        self.memory.add("unrelated")
+        
+        self.assertEqual(len(self.memory.search(["sunny", "LUNCH"])), 2)
+        self.assertEqual(len(self.memory.search(["sunny", "food"], max_results=1)), 1)
+        self.assertEqual(self.memory.search([]), [])
+    
+    def test_search_escapes_terms(self):
+        self.memory.add("cost is $5 (approx)")
+        self.assertEqual(len(self.memory.search(["$5 (approx)", "a.b"])), 1)
+    
+    def test_clear_and_stats(self):
+        self.memory.add("a")
+        self.memory.add("b")
+        self.assertEqual(self.memory.get_stats()['total_items'], 2)
+        self.memory.clear()
+        self.assertEqual(self.memory.get_stats(), {
+            'total_items': 0,
+            'max_items': 3,
+            'default_ttl': 60
+        })
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+Tests for the vector store.
+"""
+
+import logging
+import tempfile
+import unittest
+
+try:
+    import faiss
+    import numpy as np
+except ImportError:
+    faiss = None
+
+from tests.unit import load_module
+
+vector_store = load_module('core.memory.vector_store') if faiss is not None else None
+
+@unittest.skipUnless(faiss is not None, "faiss is not installed")
+class TestVectorStore(unittest.TestCase):
+    """Tests for VectorStore IDs, deletion and IVF training."""
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.rng = np.random.default_rng(0)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+        logging.disable(logging.NOTSET)
+    
+    def make_store(self, **kwargs):
+        return vector_store.VectorStore(dimension=8, store_path=self.tmp.name, **kwargs)
+    
+    def test_search_returns_nearest(self):
+        store = self.make_store()
+        vectors = self.rng.random((10, 8), dtype=np.float32)
+        ids = store.add_vectors(vectors, [{'n': i} for i in range(10)])
+        self.assertEqual(ids, list(range(10)))
+        
+        [best] = store.search(vectors[4], k=1)
+        self.assertEqual(best['vector_id'], 4)
+        self.assertEqual(best['metadata']['n'], 4)
+        self.assertAlmostEqual(best['distance'], 0.0, places=5)
+    
+    def test_search_filter(self):
+        store = self.make_store()
+        vectors = self.rng.random((6, 8), dtype=np.float32)
+        store.add_vectors(vectors, [{'even': i % 2 == 0} for i in range(6)])
+        results = store.search(vectors[1], k=6, filter_func=lambda meta: meta['even'])
+        self.assertEqual({r['vector_id'] for r in results}, {0, 2, 4})
+    
+    def test_delete_keeps_other_ids(self):
+        store = self.make_store()
+        vectors = self.rng.random((5, 8), dtype=np.float32)
+        store.add_vectors(vectors)
+        store.delete_vector(2)
+        store.delete_vector(2)
+        
+        self.assertIsNone(store.get_vector(2))
+        np.testing.assert_allclose(store.get_vector(3), vectors[3], rtol=1e-6)
+        [best] = store.search(vectors[3], k=1)
+        self.assertEqual(best['vector_id'], 3)
+        self.assertNotIn(2, [r['vector_id'] for r in store.search(vectors[2], k=5)])
+        
+        # IDs are never reused after a delete
+        self.assertEqual(store.add_vectors(vectors[:1]), [5])
+    
+    def test_ivf_buffers_until_trained(self):
+        store = self.make_store(index_type="IVFFlat", nlist=2)
+        self.assertEqual(store.train_size, 78)
+        vectors = self.rng.random((100, 8), dtype=np.float32)
+        
+        store.add_vectors(vectors[:50])
+        self.assertFalse(store.index.is_trained)
+        [best] = store.search(vectors[7], k=1)
+        self.assertEqual(best['vector_id'], 7)
+        
+        store.add_vectors(vectors[50:])
+        self.assertTrue(store.index.is_trained)
+        self.assertEqual(store.index.ntotal, 100)
+        self.assertEqual(store._pending.ntotal, 0)
+        
+        store.nprobe = 2
+        [best] = store.search(vectors[60], k=1)
+        self.assertEqual(best['vector_id'], 60)
+    
+    def test_ivf_delete_and_reconstruct(self):
+        store = self.make_store(index_type="IVFFlat", nlist=2)
+        vectors = self.rng.random((80, 8), dtype=np.float32)
+        store.add_vectors(vectors)
+        self.assertTrue(store.index.is_trained)
+        
+        store.delete_vector(10)
+        self.assertEqual(store.index.ntotal, 79)
+        self.assertIsNone(store.get_vector(10))
+        np.testing.assert_allclose(store.get_vector(11), vectors[11], rtol=1e-6)
+    
+    def test_explicit_train(self):
+        store = self.make_store(index_type="IVFFlat", nlist=2)
+        vectors = self.rng.random((10, 8), dtype=np.float32)
+        store.add_vectors(vectors)
+        store.train(self.rng.random((100, 8), dtype=np.float32))
+        self.assertTrue(store.index.is_trained)
+        self.assertEqual(store.index.ntotal, 10)
+        np.testing.assert_allclose(store.get_vector(3), vectors[3], rtol=1e-6)
+    
+    def test_rebuild_index(self):
+        store = self.make_store()
+        vectors = self.rng.random((4, 8), dtype=np.float32)
+        store.add_vectors(vectors)
+        store.metadata.pop(1)
+        store._rebuild_index()
+        self.assertEqual(store.index.ntotal, 3)
+        np.testing.assert_allclose(store.get_vector(3), vectors[3], rtol=1e-6)
+    
+    def test_save_and_load(self):
+        store = self.make_store()
+        vectors = self.rng.random((4, 8), dtype=np.float32)
+        store.add_vectors(vectors, [{'n': i} for i in range(4)])
+        store.delete_vector(0)
+        store.save()
+        
+        loaded = self.make_store()
+        loaded.load()
+        self.assertEqual(sorted(loaded.metadata), [1, 2, 3])
+        [best] = loaded.search(vectors[2], k=1)
+        self.assertEqual(best['vector_id'], 2)
+        self.assertEqual(loaded.add_vectors(vectors[:1]), [4])
+
+if __name__ == '__main__':
+    unittest.main()